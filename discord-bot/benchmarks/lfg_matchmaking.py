@@ -0,0 +1,88 @@
+"""
+Time LFG matchmaking as the queue grows.
+
+Run from the bot directory:
+
+    python -m benchmarks.lfg_matchmaking [max_queue]
+
+The queue is filled with players who joined over the last half hour
+(ratings ~ N(1500, 200)); then a stream of arrivals is matched against it,
+each one either pairing off with a queued player or joining the queue. The
+table shows the average time per arrival for the matchmaker and for a
+linear scan over the queue, and how far apart paired ratings were.
+"""
+
+import random
+import sys
+import time
+
+from utils.matchmaking import Matchmaker
+
+ARRIVALS = 2000
+
+
+def linear_match(queue: dict, matchmaker: Matchmaker, rating, now):
+    """Reference: check every queued player (what a dict scan would do)."""
+    best, best_gap = None, None
+    for user_id, (other, joined) in queue.items():
+        gap = abs(other - rating)
+        if gap <= matchmaker.window(now - joined) and (best is None or gap < best_gap):
+            best, best_gap = user_id, gap
+    return best
+
+
+def simulate(queue_size: int, seed: int = 0):
+    rng = random.Random(seed)
+    now = 1_000_000.0
+    matchmaker = Matchmaker()
+    queue = {}
+    for user_id in range(queue_size):
+        rating = rng.gauss(1500, 200)
+        joined = now - rng.uniform(0, 1800)
+        matchmaker.add(user_id, rating, joined)
+        queue[user_id] = (rating, joined)
+
+    arrivals = [(queue_size + i, rng.gauss(1500, 200)) for i in range(ARRIVALS)]
+
+    ratings = {user_id: rating for user_id, (rating, _) in queue.items()}
+    ratings.update(arrivals)
+    gaps = []
+    start = time.perf_counter()
+    for user_id, rating in arrivals:
+        now += 0.5
+        match = matchmaker.best_match(rating, now=now)
+        if match is None:
+            matchmaker.add(user_id, rating, now)
+        else:
+            gaps.append(abs(ratings[match] - rating))
+            matchmaker.discard(match)
+    fast = (time.perf_counter() - start) / ARRIVALS
+
+    # Same workload with a linear scan, on a fresh copy of the queue
+    now = 1_000_000.0
+    start = time.perf_counter()
+    for user_id, rating in arrivals[: ARRIVALS // 10]:
+        now += 0.5
+        match = linear_match(queue, matchmaker, rating, now)
+        if match is None:
+            queue[user_id] = (rating, now)
+        else:
+            del queue[match]
+    slow = (time.perf_counter() - start) / (ARRIVALS // 10)
+
+    return fast, slow, sum(gaps) / len(gaps) if gaps else 0.0
+
+
+def main(max_queue: int = 32000):
+    print(f"{'queued':>8} {'us/arrival':>11} {'scan us':>9} {'avg gap':>8}")
+    queue_size = 500
+    while queue_size <= max_queue:
+        fast, slow, gap = simulate(queue_size)
+        print(
+            f"{queue_size:>8} {1e6 * fast:>11.1f} {1e6 * slow:>9.1f} {gap:>8.1f}"
+        )
+        queue_size *= 2
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 32000)
@@ -0,0 +1,50 @@
+"""
+Time Swiss round generation as the field grows.
+
+Run from the bot directory:
+
+    python -m benchmarks.swiss_pairing [max_players]
+
+Each field plays a full event (ceil(log2 n) rounds, random winners); the
+table shows the slowest and average time to pair one round.
+"""
+
+import random
+import sys
+import time
+
+from utils.swiss import BYE, pair_round, swiss_rounds
+
+
+def simulate(player_count: int, seed: int = 0) -> list[float]:
+    rng = random.Random(seed)
+    players = list(range(1, player_count + 1))
+    results = []
+    timings = []
+    for _ in range(swiss_rounds(player_count)):
+        start = time.perf_counter()
+        pairs, bye = pair_round(players, results)
+        timings.append(time.perf_counter() - start)
+        results.extend((a, b, rng.choice((a, b))) for a, b in pairs)
+        if bye is not None:
+            results.append((bye, BYE, bye))
+    return timings
+
+
+def main(max_players: int = 256):
+    print(f"{'players':>8} {'rounds':>7} {'avg ms':>9} {'max ms':>9}")
+    player_count = 8
+    while player_count <= max_players:
+        # Odd sizes exercise the bye path too
+        for count in (player_count, player_count + 1):
+            timings = simulate(count)
+            print(
+                f"{count:>8} {len(timings):>7} "
+                f"{1000 * sum(timings) / len(timings):>9.1f} "
+                f"{1000 * max(timings):>9.1f}"
+            )
+        player_count *= 2
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 256)
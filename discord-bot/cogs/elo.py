@@ -1,11 +1,13 @@
 import datetime
 import discord
 from discord.ext import commands
-import sqlite3
 import json
 import logging
 
 from cogs.lfg import LFGReportButtons
+from utils.database import DatabaseConnection, DatabaseError
+from utils.ranking import elo_ranks
+from utils.users import get_user_resolver
 
 logger = logging.getLogger("discord_bot")
 
@@ -13,20 +15,14 @@ logger = logging.getLogger("discord_bot")
 class EloCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.users = get_user_resolver(bot)
 
     @commands.command()
     async def rank(self, ctx):
         """Check your current Elo ranking."""
-        conn = sqlite3.connect("elo.db")
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT elo FROM overall_standings WHERE user_id=?", (ctx.author.id,)
-        )
-        row = cur.fetchone()
-        if row:
-            elo = row[0]
-            cur.execute("SELECT COUNT(*) FROM overall_standings WHERE elo > ?", (elo,))
-            rank = cur.fetchone()[0] + 1
+        elo = elo_ranks.score_of(ctx.author.id)
+        if elo is not None:
+            rank = elo_ranks.rank_of(ctx.author.id)
             await ctx.send(
                 f"{ctx.author.mention}, your current Elo rating is {elo} and your rank is #{rank}."
             )
@@ -35,60 +31,53 @@ class EloCog(commands.Cog):
                 f"{ctx.author.mention}, you don't have an Elo rating yet. "
                 "Play some matches to get started!"
             )
-        conn.close()
 
     @commands.command()
     async def leaderboard(self, ctx):
         """Check the top 10 Elo rankings."""
-        conn = sqlite3.connect("elo.db")
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT user_display_name, elo FROM overall_standings ORDER BY elo DESC LIMIT 10"
-        )
-        rows = cur.fetchall()
+        rows = elo_ranks.top_n(10)
         if rows:
             leaderboard = "🏆 **Elo Leaderboard** 🏆\n"
-            for i, (user_display_name, elo) in enumerate(rows, start=1):
-                leaderboard += f"#{i}: {user_display_name} - {elo} Elo\n"
+            for i, (user_id, elo) in enumerate(rows, start=1):
+                leaderboard += f"#{i}: {elo_ranks.name_of(user_id)} - {elo} Elo\n"
             await ctx.send(leaderboard)
         else:
             await ctx.send("No Elo ratings found. Play some matches to get started!")
-        conn.close()
 
     @commands.command()
     async def mystats(self, ctx):
         """Check your match statistics. Includes win rate, first player win rate,
         avatar performance, and Elo."""
         try:
-            conn = sqlite3.connect("match_records.db")
-            cur = conn.cursor()
-
             # Query both tables with UNION ALL
-            cur.execute(
+            async with DatabaseConnection("match_records.db") as cur:
+                await cur.execute(
                 """
-                SELECT did_win, first_player, json_deck_data, match_time
-                FROM match_records 
-                WHERE reporter_id = ?
-                UNION ALL
-                SELECT 
-                    is_winner as did_win,
-                    first_player,
-                    json_deck_data,
-                    match_time
-                FROM solo_match_reports
-                WHERE reporter_id = ?
-            """,
-                (ctx.author.id, ctx.author.id),
-            )
+                    SELECT m.did_win, m.first_player,
+                           COALESCE(m.json_deck_data, d.json_deck_data), m.match_time
+                    FROM match_records m
+                    LEFT JOIN deck_cache d ON d.deck_id = m.deck_id
+                    WHERE m.reporter_id = ?
+                    UNION ALL
+                    SELECT 
+                        s.is_winner as did_win,
+                        s.first_player,
+                        COALESCE(s.json_deck_data, d.json_deck_data),
+                        s.match_time
+                    FROM solo_match_reports s
+                    LEFT JOIN deck_cache d ON d.deck_id = s.deck_id
+                    WHERE s.reporter_id = ?
+                """,
+                    (ctx.author.id, ctx.author.id),
+                )
 
-            rows = cur.fetchall()
+                rows = await cur.fetchall()
 
             if not rows:
                 await ctx.send(
                     f"{ctx.author.mention}, you don't have any match records yet. "
                     "Play some matches to get started!"
                 )
-                conn.close()
                 return
 
             # General stats
@@ -179,41 +168,12 @@ class EloCog(commands.Cog):
                 response += f"\nNo avatar data found in your match records."
 
             # Get the user's elo
-            try:
-                conn_elo = sqlite3.connect("elo.db")
-                cur_elo = conn_elo.cursor()
-
-                # Verify the table exists
-                cur_elo.execute(
-                    "SELECT name FROM sqlite_master WHERE type='table' AND name='overall_standings'"
-                )
-                if not cur_elo.fetchone():
-                    logger.error("Table 'overall_standings' not found in elo.db")
-                    response += (
-                        f"\nError accessing Elo data. Please contact an administrator."
-                    )
-                else:
-                    cur_elo.execute(
-                        "SELECT elo FROM overall_standings WHERE user_id=?",
-                        (ctx.author.id,),
-                    )
-                    elo_row = cur_elo.fetchone()
-                    if elo_row:
-                        elo = elo_row[0]
-                        cur_elo.execute(
-                            "SELECT COUNT(*) FROM overall_standings WHERE elo > ?",
-                            (elo,),
-                        )
-                        rank = cur_elo.fetchone()[0] + 1
-                        response += f"\n**Your Elo:** {elo} (Rank #{rank})"
-                    else:
-                        response += f"\nYou don't have an Elo rating yet."
-
-            except sqlite3.Error as e:
-                logger.error(f"Database error accessing elo.db: {e}")
-                response += (
-                    f"\nError accessing Elo data. Please contact an administrator."
-                )
+            elo = elo_ranks.score_of(ctx.author.id)
+            if elo is not None:
+                rank = elo_ranks.rank_of(ctx.author.id)
+                response += f"\n**Your Elo:** {elo} (Rank #{rank})"
+            else:
+                response += f"\nYou don't have an Elo rating yet."
 
             await ctx.send(response)
 
@@ -223,23 +183,16 @@ class EloCog(commands.Cog):
                 "An error occurred while retrieving your stats. Please try again later."
             )
 
-        finally:
-            if "conn" in locals():
-                conn.close()
-            if "conn_elo" in locals():
-                conn_elo.close()
-
     @commands.command()
     async def replay(self, ctx):
         """Replay your last match."""
-        conn = sqlite3.connect("match_records.db")
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT winner_id, winner_display_name, losser_id, losser_display_name "
-            "FROM match_records WHERE winner_id=? OR losser_id=? ORDER BY timestamp DESC LIMIT 1",
-            (ctx.author.id, ctx.author.id),
-        )
-        row = cur.fetchone()
+        async with DatabaseConnection("match_records.db") as cur:
+            await cur.execute(
+                "SELECT winner_id, winner_display_name, losser_id, losser_display_name "
+                "FROM match_records WHERE winner_id=? OR losser_id=? ORDER BY timestamp DESC LIMIT 1",
+                (ctx.author.id, ctx.author.id),
+            )
+            row = await cur.fetchone()
         if row:
             winner_id, winner_display_name, losser_id, losser_display_name = row
             if ctx.author.id == winner_id:
@@ -249,7 +202,7 @@ class EloCog(commands.Cog):
                 opponent_id = winner_id
                 opponent_display_name = winner_display_name
 
-            opponent = await self.bot.fetch_user(opponent_id)
+            opponent = await self.users.resolve(opponent_id, ctx.guild)
             view_ctx = LFGReportButtons(
                 ctx.author.id,
                 ctx.author.id,
@@ -267,57 +220,54 @@ class EloCog(commands.Cog):
                 f"{ctx.author.mention}, you have not played any matches yet. "
                 "Use the `!lfg` command to find a match!"
             )
-        conn.close()
 
     @commands.command()
     async def mygames(self, ctx):
         """View your match history with details for games you reported."""
         try:
-            conn = sqlite3.connect("match_records.db")
-            cur = conn.cursor()
-
             try:
                 # Query both tables with appropriate field mappings
-                cur.execute(
-                    """
-                    SELECT 
-                        winner_display_name as winner,
-                        losser_display_name as loser,
-                        did_win,
-                        first_player,
-                        match_time,
-                        curiosa_url as replay_url,
-                        match_comment,
-                        timestamp as match_date,
-                        'match_records' as source
-                    FROM match_records 
-                    WHERE reporter_id = ?
-                    UNION ALL
-                    SELECT 
-                        CASE 
-                            WHEN is_winner = 1 THEN reporter_name 
-                            ELSE opponent_name 
-                        END as winner,
-                        CASE 
-                            WHEN is_winner = 1 THEN opponent_name 
-                            ELSE reporter_name 
-                        END as loser,
-                        is_winner as did_win,
-                        first_player,
-                        match_time,
-                        curiosa_link as replay_url,
-                        match_comment,
-                        report_date as match_date,
-                        'solo_reports' as source
-                    FROM solo_match_reports
-                    WHERE reporter_id = ?
-                    ORDER BY match_date DESC
-                    LIMIT 10
-                    """,
-                    (ctx.author.id, ctx.author.id),
-                )
+                async with DatabaseConnection("match_records.db") as cur:
+                    await cur.execute(
+                        """
+                        SELECT 
+                            winner_display_name as winner,
+                            losser_display_name as loser,
+                            did_win,
+                            first_player,
+                            match_time,
+                            curiosa_url as replay_url,
+                            match_comment,
+                            timestamp as match_date,
+                            'match_records' as source
+                        FROM match_records 
+                        WHERE reporter_id = ?
+                        UNION ALL
+                        SELECT 
+                            CASE 
+                                WHEN is_winner = 1 THEN reporter_name 
+                                ELSE opponent_name 
+                            END as winner,
+                            CASE 
+                                WHEN is_winner = 1 THEN opponent_name 
+                                ELSE reporter_name 
+                            END as loser,
+                            is_winner as did_win,
+                            first_player,
+                            match_time,
+                            curiosa_link as replay_url,
+                            match_comment,
+                            report_date as match_date,
+                            'solo_reports' as source
+                        FROM solo_match_reports
+                        WHERE reporter_id = ?
+                        ORDER BY match_date DESC
+                        LIMIT 10
+                        """,
+                        (ctx.author.id, ctx.author.id),
+                    )
 
-                rows = cur.fetchall()
+                    rows = await cur.fetchall()
 
                 if not rows:
                     await ctx.send(
@@ -388,7 +338,7 @@ class EloCog(commands.Cog):
 
                 await ctx.send(embed=embed)
 
-            except sqlite3.Error as e:
+            except DatabaseError as e:
                 logger.error(f"Database error in mygames command: {e}")
                 await ctx.send(
                     "There was an error retrieving your game history. Please try again later."
@@ -398,10 +348,6 @@ class EloCog(commands.Cog):
             logger.error(f"Unexpected error in mygames command: {e}")
             await ctx.send("An unexpected error occurred. Please try again later.")
 
-        finally:
-            if "conn" in locals():
-                conn.close()
-
 
 async def setup(bot):
     await bot.add_cog(EloCog(bot))
@@ -1,17 +1,18 @@
 import discord
 from discord.ext import commands
 import datetime
-import sqlite3
 import logging
 from random import randrange
-from openai import OpenAI
 
 import config
+from utils.database import DatabaseConnection, DatabaseError
+from utils.flavor import QUIP_PLACEHOLDER, flavor
+from utils.ranking import fart_ranks
+from utils.role_sync import LeaderRoleSync
+from utils.users import get_user_resolver
 
 logger = logging.getLogger("discord_bot")
 
-openai = OpenAI(api_key=config.OPENAI_API_KEY)
-
 # Track active syphons: {leader_id: [syphoner_id1, syphoner_id2, ...]}
 active_syphons = {}
 
@@ -24,141 +25,50 @@ class FunCog(commands.Cog):
         self.fart_channel_id = config.FART_CHANNEL_ID
         self.guild_id = config.GUILD_ID
         self.leader_role_id = config.LEADER_ROLE_ID
-
-    def openai_response(self, prompt, name_of_user):
-        response = openai.responses.create(
-            model="gpt-4.1-nano",
-            instructions=f"in less than 10 words. Respond to the following prompt as if you were "
-            f"around {name_of_user} farting with a little bit of sarcasm and humor.",
-            input=prompt,
-        )
-        print(response)
-        return response.output_text
-
-    def openai_response_to_attack(self, prompt, name_of_user, damage):
-        response = openai.responses.create(
-            model="gpt-4.1-nano",
-            instructions=f"in less than 10 words. Respond to the following prompt as if you were "
-            f"around {name_of_user} farting to attack another users score with sarcasm and humor. "
-            f"The fart did {damage} damage to the opponent's score. keep the damage number in the response.",
-            input=prompt,
+        self.leader_role_sync = LeaderRoleSync(
+            bot, self.guild_id, self.leader_role_id
         )
-        print(response)
-        return response.output_text
+        self.users = get_user_resolver(bot)
 
-    def save_fart_score(self, last_updated, user_id, user_display_name, level):
+    async def save_fart_score(self, last_updated, user_id, user_display_name, level):
         logger.info(f"Saving fart score {level} for user {user_id}")
-        conn = sqlite3.connect("fart_scores.db")
-        cur = conn.cursor()
-        cur.execute("""CREATE TABLE IF NOT EXISTS fart_scores
-                       (user_id INTEGER PRIMARY KEY, 
-                        user_display_name TEXT,
-                        date_last_updated TEXT, 
-                        score INTEGER
-                       )""")
-        cur.execute("SELECT * FROM fart_scores WHERE user_id=?", (user_id,))
-        row = cur.fetchone()
-        if row:
-            new_score = row[3] + level
-            cur.execute(
-                "UPDATE fart_scores SET score=?, date_last_updated=?, user_display_name=? WHERE user_id=?",
-                (new_score, last_updated.isoformat(), user_display_name, user_id),
-            )
-        else:
-            cur.execute(
-                "INSERT INTO fart_scores (user_id, user_display_name, date_last_updated, score) VALUES (?, ?, ?, ?)",
-                (user_id, user_display_name, last_updated.isoformat(), level),
-            )
-        conn.commit()
-        conn.close()
+        async with DatabaseConnection("fart_scores.db") as cur:
+            await cur.execute("SELECT * FROM fart_scores WHERE user_id=?", (user_id,))
+            row = await cur.fetchone()
+            if row:
+                new_score = row[3] + level
+                await cur.execute(
+                    "UPDATE fart_scores SET score=?, date_last_updated=?, user_display_name=? WHERE user_id=?",
+                    (new_score, last_updated.isoformat(), user_display_name, user_id),
+                )
+            else:
+                await cur.execute(
+                    "INSERT INTO fart_scores (user_id, user_display_name, date_last_updated, score) VALUES (?, ?, ?, ?)",
+                    (user_id, user_display_name, last_updated.isoformat(), level),
+                )
+            await fart_ranks.refresh(user_id)
 
     async def update_fart_leader_role(self, ctx):
-        guild = self.bot.get_guild(self.guild_id)
-        if not guild:
-            print("Guild not found.")
-            return
-
-        leader_role = guild.get_role(self.leader_role_id)
-        if not leader_role:
-            print("Leader role not found.")
-            return
-
-        conn = sqlite3.connect("fart_scores.db")
-        cur = conn.cursor()
-        cur.execute("SELECT user_id FROM fart_scores ORDER BY score DESC LIMIT 1")
-        leader_row = cur.fetchone()
-        conn.close()
+        """Hand the leader role to the current leader if it changed."""
+        self.leader_role_sync.request()
 
-        if not leader_row:
-            print("No fart scores found.")
-            return
-
-        leader_id = leader_row[0]
-        new_leader = guild.get_member(leader_id)
-        if not new_leader:
-            print("New leader not found in the guild.")
-            return
-
-        # Remove the role from all members
-        for member in guild.members:
-            if leader_role in member.roles:
-                try:
-                    await member.remove_roles(leader_role)
-                    print(f"Removed leader role from {member.display_name}.")
-                except discord.errors.Forbidden:
-                    print(
-                        f"Missing permissions to remove role from {member.display_name}."
-                    )
-                except Exception as e:
-                    print(
-                        f"An error occurred removing role from {member.display_name}: {e}"
-                    )
-
-        # Assign the role to the new leader
-        try:
-            await new_leader.add_roles(leader_role)
-            print(f"Assigned leader role to {new_leader.display_name}.")
-        except discord.errors.Forbidden:
-            print(f"Missing permissions to assign role to {new_leader.display_name}.")
-        except Exception as e:
-            print(f"An error occurred assigning role to {new_leader.display_name}: {e}")
-
-    def save_fart_type(self, user_id, username, fart_type, roll, timestamp):
+    async def save_fart_type(self, user_id, username, fart_type, roll, timestamp):
         """Save the fart type to the database for tracking"""
         try:
-            conn = sqlite3.connect("fart_scores.db")
-            cur = conn.cursor()
-
-            # Create table if it doesn't exist with correct schema
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS fart_history (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER NOT NULL,
-                    username TEXT NOT NULL,
-                    fart_type TEXT NOT NULL,
-                    roll INTEGER NOT NULL,
-                    timestamp TEXT NOT NULL
+            async with DatabaseConnection("fart_scores.db") as cur:
+                # Ensure username is not None
+                safe_username = username or "Unknown User"
+
+                # Insert the fart record
+                await cur.execute(
+                    """INSERT INTO fart_history 
+                       (user_id, username, fart_type, roll, timestamp) 
+                       VALUES (?, ?, ?, ?, ?)""",
+                    (user_id, safe_username, fart_type, roll, timestamp.isoformat()),
                 )
-            """)
-
-            # Ensure username is not None
-            safe_username = username or "Unknown User"
-
-            # Insert the fart record
-            cur.execute(
-                """INSERT INTO fart_history 
-                   (user_id, username, fart_type, roll, timestamp) 
-                   VALUES (?, ?, ?, ?, ?)""",
-                (user_id, safe_username, fart_type, roll, timestamp.isoformat()),
-            )
-
-            conn.commit()
-        except sqlite3.Error as e:
+        except DatabaseError as e:
             logger.error(f"Database error in save_fart_type: {e}")
             raise
-        finally:
-            if "conn" in locals():
-                conn.close()
 
     @commands.command()
     async def helpfart(self, ctx):
@@ -241,18 +151,16 @@ class FunCog(commands.Cog):
             return
 
         did_user_fart_today = False
-        conn = sqlite3.connect("fart_scores.db")
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT date_last_updated FROM fart_scores WHERE user_id=?",
-            (ctx.author.id,),
-        )
-        row = cur.fetchone()
+        async with DatabaseConnection("fart_scores.db") as cur:
+            await cur.execute(
+                "SELECT date_last_updated FROM fart_scores WHERE user_id=?",
+                (ctx.author.id,),
+            )
+            row = await cur.fetchone()
         if row:
             last_fart_date = datetime.datetime.fromisoformat(row[0]).date()
             if last_fart_date == datetime.datetime.now().date():
                 did_user_fart_today = True
-        conn.close()
 
         if did_user_fart_today:
             await ctx.send(f"{ctx.author.mention} {daily_usage_message}")
@@ -279,7 +187,9 @@ class FunCog(commands.Cog):
         points_earned = 100 - roll
 
         # Track the fart type in the database
-        self.save_fart_type(ctx.author.id, ctx.author.global_name, fart_type, roll, now)
+        await self.save_fart_type(
+            ctx.author.id, ctx.author.global_name, fart_type, roll, now
+        )
 
         # Check if this user is being syphoned
         if ctx.author.id in active_syphons:
@@ -291,56 +201,64 @@ class FunCog(commands.Cog):
 
             # Award points to each syphoner WITHOUT updating their last_used date
             syphoner_names = []
+            syphoner_users = await self.users.resolve_many(syphoners, ctx.guild)
             for syphoner_id in syphoners:
-                syphoner = await self.bot.fetch_user(syphoner_id)
+                syphoner = syphoner_users.get(syphoner_id)
+                if not syphoner:
+                    logger.error(f"Could not fetch user {syphoner_id}")
+                    continue
 
                 # Update score without changing date_last_updated
-                conn = sqlite3.connect("fart_scores.db")
-                cur = conn.cursor()
-                cur.execute(
-                    """INSERT INTO fart_scores (user_id, user_display_name, score) 
-                       VALUES (?, ?, ?)
-                       ON CONFLICT(user_id) DO UPDATE SET
-                       score = score + ?
-                       WHERE user_id = ?""",
-                    (
-                        syphoner_id,
-                        syphoner.global_name,
-                        points_per_syphoner,
-                        points_per_syphoner,
-                        syphoner_id,
-                    ),
-                )
-                conn.commit()
-                conn.close()
+                async with DatabaseConnection("fart_scores.db") as cur:
+                    await cur.execute(
+                        """INSERT INTO fart_scores (user_id, user_display_name, score) 
+                           VALUES (?, ?, ?)
+                           ON CONFLICT(user_id) DO UPDATE SET
+                           score = score + ?
+                           WHERE user_id = ?""",
+                        (
+                            syphoner_id,
+                            syphoner.global_name,
+                            points_per_syphoner,
+                            points_per_syphoner,
+                            syphoner_id,
+                        ),
+                    )
+                    await fart_ranks.refresh(syphoner_id)
 
                 syphoner_names.append(f"{syphoner.mention} (+{points_per_syphoner})")
 
             # Award remaining points to farter
-            self.save_fart_score(
+            await self.save_fart_score(
                 now, ctx.author.id, ctx.author.global_name, remaining_points
             )
 
             # Remove the syphons
             del active_syphons[ctx.author.id]
 
-            fart_message_add = self.openai_response(fart_message, ctx.author.name)
             syphoners_text = ", ".join(syphoner_names)
-            await ctx.send(
-                f"{fart_message} {fart_message_add}\n\n"
-                f"💀 **SYPHONED BY {num_syphoners} SORCERER{'S' if num_syphoners > 1 else ''}!** "
-                f"{syphoners_text} stole points! "
-                f"You earned {remaining_points} points."
-            )
+
+            def render(fart_message_add):
+                return (
+                    f"{fart_message} {fart_message_add}\n\n"
+                    f"💀 **SYPHONED BY {num_syphoners} SORCERER{'S' if num_syphoners > 1 else ''}!** "
+                    f"{syphoners_text} stole points! "
+                    f"You earned {remaining_points} points."
+                )
+
         else:
             # Normal fart - no syphon active
-            fart_message_add = self.openai_response(fart_message, ctx.author.name)
-            self.save_fart_score(
+            await self.save_fart_score(
                 now, ctx.author.id, ctx.author.global_name, points_earned
             )
-            await ctx.send(
-                f"{fart_message} {fart_message_add} You earned {points_earned} points."
-            )
+
+            def render(fart_message_add):
+                return f"{fart_message} {fart_message_add} You earned {points_earned} points."
+
+        reply = await ctx.send(render(QUIP_PLACEHOLDER))
+        flavor.edit_in_later(
+            flavor.fart_quip(fart_message, ctx.author.name), render, reply.edit
+        )
 
         await self.update_fart_leader_role(ctx)
 
@@ -357,45 +275,23 @@ class FunCog(commands.Cog):
 
             # Database operations in try-except block
             try:
-                conn = sqlite3.connect("fart_scores.db")
-                cur = conn.cursor()
-
-                # Create tables if they don't exist
-                cur.execute("""CREATE TABLE IF NOT EXISTS fart_scores
-                           (user_id INTEGER PRIMARY KEY, 
-                            user_display_name TEXT,
-                            date_last_updated TEXT, 
-                            score INTEGER
-                           )""")
-
-                cur.execute("""CREATE TABLE IF NOT EXISTS fart_history
-                           (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                            user_id INTEGER NOT NULL,
-                            username TEXT NOT NULL,
-                            fart_type TEXT NOT NULL,
-                            roll INTEGER NOT NULL,
-                            timestamp TEXT NOT NULL
-                           )""")
-
-                did_user_fart_today = False
-                cur.execute(
-                    "SELECT date_last_updated FROM fart_scores WHERE user_id=?",
-                    (ctx.author.id,),
-                )
-                row = cur.fetchone()
+                async with DatabaseConnection("fart_scores.db") as cur:
+                    did_user_fart_today = False
+                    await cur.execute(
+                        "SELECT date_last_updated FROM fart_scores WHERE user_id=?",
+                        (ctx.author.id,),
+                    )
+                    row = await cur.fetchone()
                 if row:
                     last_fart_date = datetime.datetime.fromisoformat(row[0]).date()
                     if last_fart_date == datetime.datetime.now().date():
                         did_user_fart_today = True
-            except sqlite3.Error as e:
+            except DatabaseError as e:
                 logger.error(f"Database error while checking fart status: {e}")
                 await ctx.send(
                     "⚠️ There was an error checking your fart status. Please try again later."
                 )
                 return
-            finally:
-                if "conn" in locals():
-                    conn.close()
 
             if did_user_fart_today:
                 await ctx.send(f"{ctx.author.mention} {daily_usage_message}")
@@ -407,33 +303,27 @@ class FunCog(commands.Cog):
             # Check for Lucky Charm
             lucky_charm_active = False
             try:
-                conn = sqlite3.connect("fart_scores.db")
-                cur = conn.cursor()
-                cur.execute(
-                    "SELECT activated_at FROM lucky_charms WHERE user_id = ?",
-                    (ctx.author.id,),
-                )
-                charm_result = cur.fetchone()
-                
-                if charm_result:
-                    # Lucky charm is active - roll twice and take higher
-                    lucky_charm_active = True
-                    roll2 = randrange(1, 101)
-                    original_roll = roll
-                    roll = max(roll, roll2)
-                    
-                    # Remove the lucky charm after use
-                    cur.execute(
-                        "DELETE FROM lucky_charms WHERE user_id = ?",
+                async with DatabaseConnection("fart_scores.db") as cur:
+                    await cur.execute(
+                        "SELECT activated_at FROM lucky_charms WHERE user_id = ?",
                         (ctx.author.id,),
                     )
-                    conn.commit()
-                
-                conn.close()
-            except sqlite3.Error as e:
+                    charm_result = await cur.fetchone()
+                    
+                    if charm_result:
+                        # Lucky charm is active - roll twice and take higher
+                        lucky_charm_active = True
+                        roll2 = randrange(1, 101)
+                        original_roll = roll
+                        roll = max(roll, roll2)
+                        
+                        # Remove the lucky charm after use
+                        await cur.execute(
+                            "DELETE FROM lucky_charms WHERE user_id = ?",
+                            (ctx.author.id,),
+                        )
+            except DatabaseError as e:
                 logger.error(f"Error checking lucky charm: {e}")
-                if "conn" in locals():
-                    conn.close()
             
             # Determine fart type based on roll (higher is better now)
             if roll >= 96:
@@ -457,10 +347,10 @@ class FunCog(commands.Cog):
 
             # Save fart type with error handling
             try:
-                self.save_fart_type(
+                await self.save_fart_type(
                     ctx.author.id, ctx.author.global_name, fart_type, roll, now
                 )
-            except sqlite3.Error as e:
+            except DatabaseError as e:
                 logger.error(f"Error saving fart type: {e}")
                 await ctx.send(
                     "⚠️ There was an error saving your fart type, but continuing..."
@@ -479,29 +369,27 @@ class FunCog(commands.Cog):
 
                     # Award points to each syphoner
                     syphoner_names = []
-                    conn = sqlite3.connect("fart_scores.db")
-                    cur = conn.cursor()
+                    syphoner_rows = []
 
+                    # Look users up before taking the database lock
+                    syphoner_users = await self.users.resolve_many(
+                        syphoners, ctx.guild
+                    )
                     for syphoner_id in syphoners:
                         try:
-                            syphoner = await self.bot.fetch_user(syphoner_id)
+                            syphoner = syphoner_users.get(syphoner_id)
                             if not syphoner:
                                 logger.error(f"Could not fetch user {syphoner_id}")
                                 continue
 
-                            cur.execute(
-                                """INSERT INTO fart_scores (user_id, user_display_name, score) 
-                                   VALUES (?, ?, ?)
-                                   ON CONFLICT(user_id) DO UPDATE SET
-                                   score = score + ?
-                                   WHERE user_id = ?""",
+                            syphoner_rows.append(
                                 (
                                     syphoner_id,
                                     syphoner.global_name,
                                     points_per_syphoner,
                                     points_per_syphoner,
                                     syphoner_id,
-                                ),
+                                )
                             )
                             syphoner_names.append(
                                 f"{syphoner.mention} (+{points_per_syphoner})"
@@ -512,48 +400,43 @@ class FunCog(commands.Cog):
                             )
                             continue
 
-                    conn.commit()
-                    conn.close()
+                    async with DatabaseConnection("fart_scores.db") as cur:
+                        await cur.executemany(
+                            """INSERT INTO fart_scores (user_id, user_display_name, score) 
+                               VALUES (?, ?, ?)
+                               ON CONFLICT(user_id) DO UPDATE SET
+                               score = score + ?
+                               WHERE user_id = ?""",
+                            syphoner_rows,
+                        )
+                        await fart_ranks.refresh(*(row[0] for row in syphoner_rows))
 
                     # Award remaining points to farter
-                    self.save_fart_score(
+                    await self.save_fart_score(
                         now, ctx.author.id, ctx.author.global_name, remaining_points
                     )
 
                     # Remove the syphons
                     del active_syphons[ctx.author.id]
 
-                    try:
-                        fart_message_add = self.openai_response(
-                            fart_message, ctx.author.name
-                        )
-                    except Exception as e:
-                        logger.error(f"OpenAI API error: {e}")
-                        fart_message_add = "... *cough cough*"
-
                     syphoners_text = ", ".join(syphoner_names)
                     mushroom_boost_msg = (
                         " **MUSHROOM BOOST ACTIVATED!** \n"
                         if lucky_charm_active
                         else ""
                     )
-                    await ctx.send(
-                        f"{mushroom_boost_msg}{fart_message} {fart_message_add}\n\n"
-                        f"💀 **SYPHONED BY {num_syphoners} SORCERER{'S' if num_syphoners > 1 else ''}!** "
-                        f"{syphoners_text} stole points! "
-                        f"You earned {remaining_points} points."
-                    )
-                else:
-                    # Normal fart - no syphon active
-                    try:
-                        fart_message_add = self.openai_response(
-                            fart_message, ctx.author.name
+
+                    def render(fart_message_add):
+                        return (
+                            f"{mushroom_boost_msg}{fart_message} {fart_message_add}\n\n"
+                            f"💀 **SYPHONED BY {num_syphoners} SORCERER{'S' if num_syphoners > 1 else ''}!** "
+                            f"{syphoners_text} stole points! "
+                            f"You earned {remaining_points} points."
                         )
-                    except Exception as e:
-                        logger.error(f"OpenAI API error: {e}")
-                        fart_message_add = "... *cough cough*"
 
-                    self.save_fart_score(
+                else:
+                    # Normal fart - no syphon active
+                    await self.save_fart_score(
                         now, ctx.author.id, ctx.author.global_name, points_earned
                     )
                     mushroom_boost_msg = (
@@ -561,9 +444,17 @@ class FunCog(commands.Cog):
                         if lucky_charm_active
                         else ""
                     )
-                    await ctx.send(
-                        f"{mushroom_boost_msg}{fart_message} {fart_message_add} You earned {points_earned} points."
-                    )
+
+                    def render(fart_message_add):
+                        return f"{mushroom_boost_msg}{fart_message} {fart_message_add} You earned {points_earned} points."
+
+                # Reply right away; the quip is edited in when it arrives
+                reply = await ctx.send(render(QUIP_PLACEHOLDER))
+                flavor.edit_in_later(
+                    flavor.fart_quip(fart_message, ctx.author.name),
+                    render,
+                    reply.edit,
+                )
 
             except Exception as e:
                 logger.error(f"Error processing fart mechanics: {e}")
@@ -597,16 +488,9 @@ class FunCog(commands.Cog):
             return
 
         logger.info(f"Checking fart rank for user {ctx.author.id}")
-        conn = sqlite3.connect("fart_scores.db")
-        cur = conn.cursor()
-        cur.execute("SELECT score FROM fart_scores WHERE user_id=?", (ctx.author.id,))
-        row = cur.fetchone()
-        if row:
-            user_score = row[0]
-            cur.execute(
-                "SELECT COUNT(*) FROM fart_scores WHERE score > ?", (user_score,)
-            )
-            rank = cur.fetchone()[0] + 1
+        user_score = fart_ranks.score_of(ctx.author.id)
+        if user_score is not None:
+            rank = fart_ranks.rank_of(ctx.author.id)
             await ctx.send(
                 f"{ctx.author.mention}, your fart score is {user_score} and your rank is #{rank}."
             )
@@ -615,7 +499,6 @@ class FunCog(commands.Cog):
                 f"{ctx.author.mention}, you don't have a fart score yet. "
                 "Use the `!fart` command to start earning points!"
             )
-        conn.close()
         await self.update_fart_leader_role(ctx)
 
     @commands.command()
@@ -628,22 +511,16 @@ class FunCog(commands.Cog):
             return
 
         logger.info("Checking fart leaderboard")
-        conn = sqlite3.connect("fart_scores.db")
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT user_display_name, score FROM fart_scores ORDER BY score DESC LIMIT 5"
-        )
-        rows = cur.fetchall()
+        rows = fart_ranks.top_n(5)
         if rows:
             leaderboard = "🏆 **Fart Leaderboard** 🏆\n"
-            for i, (user_display_name, score) in enumerate(rows, start=1):
-                leaderboard += f"#{i}: {user_display_name} - {score} points\n"
+            for i, (user_id, score) in enumerate(rows, start=1):
+                leaderboard += f"#{i}: {fart_ranks.name_of(user_id)} - {score} points\n"
             await ctx.send(leaderboard)
         else:
             await ctx.send(
                 "No fart scores found. Use the `!fart` command to start earning points!"
             )
-        conn.close()
         await self.update_fart_leader_role(ctx)
 
     @commands.command()
@@ -657,81 +534,77 @@ class FunCog(commands.Cog):
 
         did_user_fart_today = False
         print(f"User {ctx.author.id} is attempting to attack the fart leader.")
-        conn = sqlite3.connect("fart_scores.db")
-        cur = conn.cursor()
-        try:
-            cur.execute(
+        async with DatabaseConnection("fart_scores.db") as cur:
+            await cur.execute(
                 "SELECT date_last_updated FROM fart_scores WHERE user_id=?",
                 (ctx.author.id,),
             )
-            row = cur.fetchone()
+            row = await cur.fetchone()
             if row:
                 last_fart_date = datetime.datetime.fromisoformat(row[0]).date()
                 if last_fart_date == datetime.datetime.now().date():
                     did_user_fart_today = True
 
-            if did_user_fart_today:
-                await ctx.send(f"{ctx.author.mention} {daily_usage_message}")
-                return
-
-            roll = randrange(1, 101)
-            if roll >= 96:
-                fart_message = "Curio Shart Attack! 💩💨💨💨💨"
-                fart_type = "curio_shart"
-            elif roll >= 86:
-                fart_message = "Unique Fart Bomb! 💨💨💨💨"
-                fart_type = "unique"
-            elif roll >= 66:
-                fart_message = "Elite Fart Barrage! 💨💨💨"
-                fart_type = "elite"
-            elif roll >= 36:
-                fart_message = "Exceptional Fart Strike! 💨💨"
-                fart_type = "exceptional"
-            else:
-                fart_message = "Ordinary Fart Puff! 💨"
-                fart_type = "ordinary"
-
-            damage = roll  # Damage equals roll value
-
-            # Get the leaderboard
-            cur.execute(
-                "SELECT user_id, user_display_name, score FROM fart_scores "
-                "ORDER BY score DESC LIMIT 1"
-            )
-            leader_row = cur.fetchone()
+            if not did_user_fart_today:
+                roll = randrange(1, 101)
+                if roll >= 96:
+                    fart_message = "Curio Shart Attack! 💩💨💨💨💨"
+                    fart_type = "curio_shart"
+                elif roll >= 86:
+                    fart_message = "Unique Fart Bomb! 💨💨💨💨"
+                    fart_type = "unique"
+                elif roll >= 66:
+                    fart_message = "Elite Fart Barrage! 💨💨💨"
+                    fart_type = "elite"
+                elif roll >= 36:
+                    fart_message = "Exceptional Fart Strike! 💨💨"
+                    fart_type = "exceptional"
+                else:
+                    fart_message = "Ordinary Fart Puff! 💨"
+                    fart_type = "ordinary"
 
-            leader_id, leader_name, leader_score = leader_row
+                damage = roll  # Damage equals roll value
 
-            if ctx.author.id == leader_id:
-                await ctx.send("You are the leader! You cannot attack yourself.")
-                return
+                # Get the leader
+                leader_id, leader_score = fart_ranks.leader()
+                leader_name = fart_ranks.name_of(leader_id)
 
-            # Update the leader's score
-            new_leader_score = max(0, leader_score - damage)
-            cur.execute(
-                "UPDATE fart_scores SET score=? WHERE user_id=?",
-                (new_leader_score, leader_id),
-            )
+                if ctx.author.id != leader_id:
+                    # Update the leader's score
+                    new_leader_score = max(0, leader_score - damage)
+                    await cur.execute(
+                        "UPDATE fart_scores SET score=? WHERE user_id=?",
+                        (new_leader_score, leader_id),
+                    )
+                    await fart_ranks.refresh(leader_id)
 
-            # Update the user's last attack time
-            now = datetime.datetime.now()
-            cur.execute(
-                "UPDATE fart_scores SET date_last_updated=? WHERE user_id=?",
-                (now.isoformat(), ctx.author.id),
-            )
+                    # Update the user's last attack time
+                    now = datetime.datetime.now()
+                    await cur.execute(
+                        "UPDATE fart_scores SET date_last_updated=? WHERE user_id=?",
+                        (now.isoformat(), ctx.author.id),
+                    )
 
-            conn.commit()
+        if did_user_fart_today:
+            await ctx.send(f"{ctx.author.mention} {daily_usage_message}")
+            return
 
-            chatgpt = self.openai_response_to_attack(
-                fart_message, ctx.author.name, damage
-            )
+        if ctx.author.id == leader_id:
+            await ctx.send("You are the leader! You cannot attack yourself.")
+            return
 
-            await ctx.send(
+        def render(chatgpt):
+            return (
                 f"{ctx.author.mention} attacked {leader_name} {chatgpt} \n\n"
                 f"<@{leader_id}>'s new score is {new_leader_score}."
             )
-        finally:
-            conn.close()
+
+        reply = await ctx.send(render(QUIP_PLACEHOLDER))
+        flavor.edit_in_later(
+            flavor.attack_quip(fart_message, ctx.author.name, damage),
+            render,
+            reply.edit,
+        )
 
         await self.update_fart_leader_role(ctx)
 
@@ -746,82 +619,69 @@ class FunCog(commands.Cog):
 
         # Check if user already used their daily action
         did_user_fart_today = False
-        conn = sqlite3.connect("fart_scores.db")
-        cur = conn.cursor()
-        try:
-            cur.execute(
+        async with DatabaseConnection("fart_scores.db") as cur:
+            await cur.execute(
                 "SELECT date_last_updated FROM fart_scores WHERE user_id=?",
                 (ctx.author.id,),
             )
-            row = cur.fetchone()
+            row = await cur.fetchone()
             if row:
                 last_fart_date = datetime.datetime.fromisoformat(row[0]).date()
                 if last_fart_date == datetime.datetime.now().date():
                     did_user_fart_today = True
 
-            if did_user_fart_today:
-                await ctx.send(f"{ctx.author.mention} {daily_usage_message}")
-                return
-
-            # Get the current leader
-            cur.execute(
-                "SELECT user_id, user_display_name FROM fart_scores ORDER BY score DESC LIMIT 1"
-            )
-            leader_row = cur.fetchone()
+        if did_user_fart_today:
+            await ctx.send(f"{ctx.author.mention} {daily_usage_message}")
+            return
 
-            if not leader_row:
-                await ctx.send("No fart leader found yet! Someone needs to fart first.")
-                return
+        # Get the current leader
+        leader_row = fart_ranks.leader()
+        if not leader_row:
+            await ctx.send("No fart leader found yet! Someone needs to fart first.")
+            return
 
-            leader_id, leader_name = leader_row
+        leader_id = leader_row[0]
+        leader_name = fart_ranks.name_of(leader_id)
 
-            # Can't syphon yourself
-            if ctx.author.id == leader_id:
-                await ctx.send(
-                    "You can't syphon yourself! You're already the leader! 👑"
-                )
-                return
+        # Can't syphon yourself
+        if ctx.author.id == leader_id:
+            await ctx.send("You can't syphon yourself! You're already the leader! 👑")
+            return
 
-            # Check if user already has a syphon on this leader
-            if (
-                leader_id in active_syphons
-                and ctx.author.id in active_syphons[leader_id]
-            ):
-                await ctx.send(
-                    f"⚠️ You already have a syphon placed on {leader_name}! "
-                    f"Wait for them to fart!"
-                )
-                return
+        # Check if user already has a syphon on this leader
+        if leader_id in active_syphons and ctx.author.id in active_syphons[leader_id]:
+            await ctx.send(
+                f"⚠️ You already have a syphon placed on {leader_name}! "
+                f"Wait for them to fart!"
+            )
+            return
 
-            # Add user to the list of syphoners for this leader
-            if leader_id not in active_syphons:
-                active_syphons[leader_id] = []
+        # Add user to the list of syphoners for this leader
+        if leader_id not in active_syphons:
+            active_syphons[leader_id] = []
 
-            active_syphons[leader_id].append(ctx.author.id)
-            num_syphoners = len(active_syphons[leader_id])
+        active_syphons[leader_id].append(ctx.author.id)
+        num_syphoners = len(active_syphons[leader_id])
 
-            # Mark user's daily action as used
-            now = datetime.datetime.now()
-            cur.execute(
+        # Mark user's daily action as used
+        now = datetime.datetime.now()
+        async with DatabaseConnection("fart_scores.db") as cur:
+            await cur.execute(
                 "UPDATE fart_scores SET date_last_updated=? WHERE user_id=?",
                 (now.isoformat(), ctx.author.id),
             )
-            conn.commit()
 
-            if num_syphoners == 1:
-                await ctx.send(
-                    f"🌀 **SYPHON PLACED!** {ctx.author.mention} has placed a mystical syphon on \n"
-                    f"<@{leader_id}>! When they fart, you'll steal half their points!"
-                )
-            else:
-                await ctx.send(
-                    f"🌀 **SYPHON #{num_syphoners} PLACED!** {ctx.author.mention} joins the syphon group! \n"
-                    f"<@{leader_id}> now has **{num_syphoners} syphons** draining them! \n"
-                    f"Points will be split evenly among all syphoners!"
-                )
-
-        finally:
-            conn.close()
+        if num_syphoners == 1:
+            await ctx.send(
+                f"🌀 **SYPHON PLACED!** {ctx.author.mention} has placed a mystical syphon on \n"
+                f"<@{leader_id}>! When they fart, you'll steal half their points!"
+            )
+        else:
+            await ctx.send(
+                f"🌀 **SYPHON #{num_syphoners} PLACED!** {ctx.author.mention} joins the syphon group! \n"
+                f"<@{leader_id}> now has **{num_syphoners} syphons** draining them! \n"
+                f"Points will be split evenly among all syphoners!"
+            )
 
     @commands.command()
     async def syphonstatus(self, ctx):
@@ -832,45 +692,39 @@ class FunCog(commands.Cog):
             )
             return
 
-        conn = sqlite3.connect("fart_scores.db")
-        cur = conn.cursor()
-        try:
-            # Get the current leader
-            cur.execute(
-                "SELECT user_id, user_display_name, score FROM fart_scores ORDER BY score DESC LIMIT 1"
-            )
-            leader_row = cur.fetchone()
-
-            if not leader_row:
-                await ctx.send("No fart leader found yet!")
-                return
+        # Get the current leader
+        leader_row = fart_ranks.leader()
+        if not leader_row:
+            await ctx.send("No fart leader found yet!")
+            return
 
-            leader_id, leader_name, leader_score = leader_row
+        leader_id, leader_score = leader_row
+        leader_name = fart_ranks.name_of(leader_id)
 
-            if leader_id not in active_syphons or len(active_syphons[leader_id]) == 0:
-                await ctx.send(
-                    f"👑 **Current Leader:** {leader_name} ({leader_score} points)\n"
-                    f"✅ No active syphons! The leader is safe... for now. 😈"
-                )
-            else:
-                syphoners = active_syphons[leader_id]
-                num_syphoners = len(syphoners)
-                syphoner_names = []
-
-                for syphoner_id in syphoners:
-                    syphoner = await self.bot.fetch_user(syphoner_id)
-                    syphoner_names.append(syphoner.mention)
+        if leader_id not in active_syphons or len(active_syphons[leader_id]) == 0:
+            await ctx.send(
+                f"👑 **Current Leader:** {leader_name} ({leader_score} points)\n"
+                f"✅ No active syphons! The leader is safe... for now. 😈"
+            )
+        else:
+            syphoners = active_syphons[leader_id]
+            num_syphoners = len(syphoners)
+            syphoner_names = []
 
-                syphoners_text = ", ".join(syphoner_names)
-                await ctx.send(
-                    f"👑 **Current Leader:** {leader_name} ({leader_score} points)\n"
-                    f"💀 **Active Syphons:** {num_syphoners}\n"
-                    f"🌀 **Syphoning:** {syphoners_text}\n\n"
-                    f"When {leader_name} farts next, each syphoner will steal an equal share of 50% of the points!"
+            syphoner_users = await self.users.resolve_many(syphoners, ctx.guild)
+            for syphoner_id in syphoners:
+                syphoner = syphoner_users.get(syphoner_id)
+                syphoner_names.append(
+                    syphoner.mention if syphoner else f"<@{syphoner_id}>"
                 )
 
-        finally:
-            conn.close()
+            syphoners_text = ", ".join(syphoner_names)
+            await ctx.send(
+                f"👑 **Current Leader:** {leader_name} ({leader_score} points)\n"
+                f"💀 **Active Syphons:** {num_syphoners}\n"
+                f"🌀 **Syphoning:** {syphoners_text}\n\n"
+                f"When {leader_name} farts next, each syphoner will steal an equal share of 50% of the points!"
+            )
 
     @commands.Cog.listener()
     async def on_message(self, message):
@@ -885,32 +739,25 @@ class FunCog(commands.Cog):
             ).strip()
             if prompt:
                 try:
-                    conn = sqlite3.connect("fart_scores.db")
-                    cur = conn.cursor()
-                    cur.execute(
-                        "SELECT score FROM fart_scores WHERE user_id=?",
-                        (message.author.id,),
-                    )
-                    row = cur.fetchone()
-                    if row:
-                        user_score = row[0]
-                        cur.execute(
-                            "SELECT COUNT(*) FROM fart_scores WHERE score > ?",
-                            (user_score,),
-                        )
-                        rank = cur.fetchone()[0] + 1
+                    user_score = fart_ranks.score_of(message.author.id)
+                    if user_score is not None:
+                        rank = fart_ranks.rank_of(message.author.id)
                         db_info = (
                             f"Your fart score is {user_score} and your rank is #{rank}."
                         )
                     else:
                         db_info = "You don't have a fart score yet. Use the `!fart` command to start earning points!"
-                    conn.close()
 
-                    response_text = self.openai_response(
-                        f"{prompt}. Also, {db_info}", message.author.name
-                    )
-                    await message.channel.send(
-                        f"{message.author.mention} {response_text}"
+                    def render(response_text):
+                        return f"{message.author.mention} {response_text}"
+
+                    reply = await message.channel.send(render(QUIP_PLACEHOLDER))
+                    flavor.edit_in_later(
+                        flavor.chat_reply(
+                            f"{prompt}. Also, {db_info}", message.author.name
+                        ),
+                        render,
+                        reply.edit,
                     )
                 except Exception as e:
                     logger.error(f"Error during OpenAI interaction: {e}")
@@ -944,191 +791,181 @@ class FunCog(commands.Cog):
         user_id = ctx.author.id
         command_name = "bullfart"
 
-        # Connect to the database
-        conn = sqlite3.connect("fart_scores.db")
-        cur = conn.cursor()
-
-        # Create a table to track command usage if it doesn't exist
-        cur.execute(
-            """CREATE TABLE IF NOT EXISTS command_usage
-                       (user_id INTEGER,
-                        command_name TEXT,
-                        last_used TEXT,
-                        PRIMARY KEY (user_id, command_name))"""
-        )
+        on_cooldown = False
+        roll_row = None
+        async with DatabaseConnection("fart_scores.db") as cur:
+            # Check if the user has used the command before
+            await cur.execute(
+                "SELECT last_used FROM command_usage WHERE user_id=? AND command_name=?",
+                (user_id, command_name),
+            )
+            row = await cur.fetchone()
 
-        # Check if the user has used the command before
-        cur.execute(
-            "SELECT last_used FROM command_usage WHERE user_id=? AND command_name=?",
-            (user_id, command_name),
-        )
-        row = cur.fetchone()
+            if row:
+                last_used_date = datetime.datetime.fromisoformat(row[0]).date()
+                # Check if a week has passed since the last use
+                on_cooldown = (
+                    last_used_date + datetime.timedelta(weeks=1)
+                    > datetime.datetime.now().date()
+                )
 
-        if row:
-            last_used_date = datetime.datetime.fromisoformat(row[0]).date()
-            # Check if a week has passed since the last use
-            if (
-                last_used_date + datetime.timedelta(weeks=1)
-                > datetime.datetime.now().date()
-            ):
-                await ctx.send(
-                    f"{ctx.author.mention}, you can only use this command once a week!"
+            if not on_cooldown:
+                # Get the user's most recent fart from fart_history
+                await cur.execute(
+                    """SELECT fart_type FROM fart_history 
+                       WHERE user_id=? 
+                       ORDER BY timestamp DESC 
+                       LIMIT 1""",
+                    (user_id,),
                 )
-                conn.close()
-                return
+                roll_row = await cur.fetchone()
+                print(f"Last roll row: {roll_row}")
+
+            if roll_row:
+                last_roll_type = roll_row[0]
+                print(f"User's last roll type: {last_roll_type}")
+
+                # Map fart_type to points and display name
+                fart_type_mapping = {
+                    "curio_shart": (50, "Curio Shart"),
+                    "unique": (35, "Unique Fart"),
+                    "elite": (25, "Elite Fart"),
+                    "exceptional": (15, "Exceptional Fart"),
+                    "ordinary": (10, "Ordinary Fart"),
+                }
+
+                if last_roll_type in fart_type_mapping:
+                    points_earned, display_name = fart_type_mapping[last_roll_type]
+                else:
+                    # Fallback for unexpected values
+                    points_earned = 10
+                    display_name = last_roll_type
 
-        # Get the user's most recent fart from fart_history
-        cur.execute(
-            """SELECT fart_type FROM fart_history 
-               WHERE user_id=? 
-               ORDER BY timestamp DESC 
-               LIMIT 1""",
-            (user_id,),
-        )
-        roll_row = cur.fetchone()
-        print(f"Last roll row: {roll_row}")
-
-        if roll_row:
-            last_roll_type = roll_row[0]
-            print(f"User's last roll type: {last_roll_type}")
-
-            # Map fart_type to points and display name
-            fart_type_mapping = {
-                "curio_shart": (50, "Curio Shart"),
-                "unique": (35, "Unique Fart"),
-                "elite": (25, "Elite Fart"),
-                "exceptional": (15, "Exceptional Fart"),
-                "ordinary": (10, "Ordinary Fart"),
-            }
-
-            if last_roll_type in fart_type_mapping:
-                points_earned, display_name = fart_type_mapping[last_roll_type]
-            else:
-                # Fallback for unexpected values
-                points_earned = 10
-                display_name = last_roll_type
+                await self.save_fart_score(
+                    now, ctx.author.id, ctx.author.global_name, points_earned
+                )
 
-            self.save_fart_score(
-                now, ctx.author.id, ctx.author.global_name, points_earned
-            )
+                # Update cooldown AFTER successful execution
+                await cur.execute(
+                    "INSERT OR REPLACE INTO command_usage (user_id, command_name, last_used) VALUES (?, ?, ?)",
+                    (user_id, command_name, now.isoformat()),
+                )
+
+        if on_cooldown:
             await ctx.send(
-                f"You earned a bonus {points_earned} points from using bullfart based on your last fart roll of {display_name}!"
+                f"{ctx.author.mention}, you can only use this command once a week!"
             )
-        else:
+            return
+
+        if not roll_row:
             # User hasn't rolled yet
             await ctx.send(
                 f"{ctx.author.mention}, you need to roll a fart first before using bullfart!"
             )
-            conn.close()
             return
 
-        # Update cooldown AFTER successful execution
-        cur.execute(
-            "INSERT OR REPLACE INTO command_usage (user_id, command_name, last_used) VALUES (?, ?, ?)",
-            (user_id, command_name, now.isoformat()),
+        await ctx.send(
+            f"You earned a bonus {points_earned} points from using bullfart based on your last fart roll of {display_name}!"
         )
 
-        conn.commit()
-        conn.close()
-
         await self.update_fart_leader_role(ctx)
 
     @commands.command()
     @commands.has_role(config.LEADER_ROLE_ID)
     async def fartlord(self, ctx):
         """Declare yourself the Fart Lord (Leader role only)."""
-        response_text = self.openai_response(
-            "as the new fart lord, make a grand proclamation in less than 20 words. about being the fart lord and how great it is to be the fart lord.",
-            ctx.author.name,
-        )
-
-        await ctx.send(
-            f"Hear ye, hear ye! {ctx.author.mention} proclaims: {response_text}"
+        def render(response_text):
+            return f"Hear ye, hear ye! {ctx.author.mention} proclaims: {response_text}"
+
+        reply = await ctx.send(render(QUIP_PLACEHOLDER))
+        flavor.edit_in_later(
+            flavor.fart_quip(
+                "as the new fart lord, make a grand proclamation in less than 20 words. about being the fart lord and how great it is to be the fart lord.",
+                ctx.author.name,
+            ),
+            render,
+            reply.edit,
         )
 
     @commands.command()
     @commands.has_role(config.LEADER_ROLE_ID)
     async def taxes(self, ctx):
         try:
-            conn = sqlite3.connect("fart_scores.db")
-            cur = conn.cursor()
-            cur.execute("""CREATE TABLE IF NOT EXISTS fart_leader_only_once
-                           (user_id INTEGER PRIMARY KEY, 
-                            user_display_name TEXT
-                           )""")
-
-            # Check the CORRECT table - fart_leader_only_once, not fart_scores
-            cur.execute(
-                "SELECT * FROM fart_leader_only_once WHERE user_id=?", (ctx.author.id,)
-            )
-            row = cur.fetchone()
-
-            if row:
-                await ctx.send(
-                    "You have already stolen from the working class during your reign."
-                )
-                conn.close()
-                return
-            else:
-                cur.execute(
-                    "INSERT OR REPLACE INTO fart_leader_only_once (user_id, user_display_name) VALUES (?, ?)",
-                    (ctx.author.id, ctx.author.global_name),
-                )
-                # Fixed: Changed 'username' to 'user_display_name'
-                cur.execute(
-                    """SELECT user_id, user_display_name, score 
-                   FROM fart_scores 
-                   ORDER BY score DESC"""
+            all_users = []
+            async with DatabaseConnection("fart_scores.db") as cur:
+                # Check the CORRECT table - fart_leader_only_once, not fart_scores
+                await cur.execute(
+                    "SELECT * FROM fart_leader_only_once WHERE user_id=?",
+                    (ctx.author.id,),
                 )
-                all_users = cur.fetchall()
+                already_used = await cur.fetchone() is not None
+
+                if not already_used:
+                    # Fixed: Changed 'username' to 'user_display_name'
+                    await cur.execute(
+                        """SELECT user_id, user_display_name, score 
+                       FROM fart_scores 
+                       ORDER BY score DESC"""
+                    )
+                    all_users = await cur.fetchall()
 
-                if len(all_users) < 6:
-                    await ctx.send(
-                        "Not enough users to redistribute! Need at least 6 players."
+                if not already_used and len(all_users) >= 6:
+                    await cur.execute(
+                        "INSERT OR REPLACE INTO fart_leader_only_once (user_id, user_display_name) VALUES (?, ?)",
+                        (ctx.author.id, ctx.author.global_name),
                     )
-                    conn.close()
-                    return
 
-                # Split into top 5 and everyone else
-                top_5 = all_users[:5]
-                others = all_users[5:]
+                    # Split into top 5 and everyone else
+                    top_5 = all_users[:5]
+                    others = all_users[5:]
 
-                # Calculate total points to take from non-top-5
-                total_taken = 0
-                redistribution_details = []
+                    # Calculate total points to take from non-top-5
+                    total_taken = 0
+                    redistribution_details = []
 
-                for user_id, user_display_name, score in others:
-                    points_to_take = int(score * 0.05)
-                    new_score = score - points_to_take
-                    total_taken += points_to_take
+                    for user_id, user_display_name, score in others:
+                        points_to_take = int(score * 0.05)
+                        new_score = score - points_to_take
+                        total_taken += points_to_take
 
-                    # Update the user's score
-                    cur.execute(
-                        "UPDATE fart_scores SET score=? WHERE user_id=?",
-                        (new_score, user_id),
-                    )
-                    redistribution_details.append(
-                        f"{user_display_name}: -{points_to_take} points"
-                    )
+                        # Update the user's score
+                        await cur.execute(
+                            "UPDATE fart_scores SET score=? WHERE user_id=?",
+                            (new_score, user_id),
+                        )
+                        redistribution_details.append(
+                            f"{user_display_name}: -{points_to_take} points"
+                        )
 
-                # Distribute evenly to top 5
-                points_per_top_user = total_taken // 5
-                remainder = total_taken % 5
+                    # Distribute evenly to top 5
+                    points_per_top_user = total_taken // 5
+                    remainder = total_taken % 5
 
-                top_5_details = []
-                for i, (user_id, user_display_name, score) in enumerate(top_5):
-                    # Give remainder to first user
-                    bonus = points_per_top_user + (remainder if i == 0 else 0)
-                    new_score = score + bonus
+                    top_5_details = []
+                    for i, (user_id, user_display_name, score) in enumerate(top_5):
+                        # Give remainder to first user
+                        bonus = points_per_top_user + (remainder if i == 0 else 0)
+                        new_score = score + bonus
 
-                    cur.execute(
-                        "UPDATE fart_scores SET score=? WHERE user_id=?",
-                        (new_score, user_id),
-                    )
-                    top_5_details.append(f"{user_display_name}: +{bonus} points")
+                        await cur.execute(
+                            "UPDATE fart_scores SET score=? WHERE user_id=?",
+                            (new_score, user_id),
+                        )
+                        top_5_details.append(f"{user_display_name}: +{bonus} points")
 
-                conn.commit()
-                conn.close()
+                    await fart_ranks.refresh(*(row[0] for row in all_users))
+
+            if already_used:
+                await ctx.send(
+                    "You have already stolen from the working class during your reign."
+                )
+                return
+            else:
+                if len(all_users) < 6:
+                    await ctx.send(
+                        "Not enough users to redistribute! Need at least 6 players."
+                    )
+                    return
 
                 # Create response message
                 response = (
@@ -1159,86 +996,82 @@ class FunCog(commands.Cog):
                 )
                 return
 
-            conn = sqlite3.connect("fart_scores.db")
-            cur = conn.cursor()
-            cur.execute("""CREATE TABLE IF NOT EXISTS fart_leader_only_once
-                           (user_id INTEGER PRIMARY KEY, 
-                            user_display_name TEXT
-                           )""")
+            all_users = []
+            async with DatabaseConnection("fart_scores.db") as cur:
+                # Check if user has already used robin command
+                await cur.execute(
+                    "SELECT * FROM fart_leader_only_once WHERE user_id=?",
+                    (ctx.author.id,),
+                )
+                already_used = await cur.fetchone() is not None
+
+                if not already_used:
+                    # Fixed: Changed 'username' to 'user_display_name'
+                    await cur.execute(
+                        """SELECT user_id, user_display_name, score 
+                       FROM fart_scores 
+                       ORDER BY score DESC"""
+                    )
+                    all_users = await cur.fetchall()
 
-            # Check if user has already used robin command
-            cur.execute(
-                "SELECT * FROM fart_leader_only_once WHERE user_id=?", (ctx.author.id,)
-            )
-            row = cur.fetchone()
+                if not already_used and len(all_users) >= 6:
+                    await cur.execute(
+                        "INSERT OR REPLACE INTO fart_leader_only_once (user_id, user_display_name) VALUES (?, ?)",
+                        (ctx.author.id, ctx.author.global_name),
+                    )
 
-            if row:
+                    # Split into top 5 and everyone else
+                    top_5 = all_users[:5]
+                    others = all_users[5:]
+
+                    # Calculate total points to take from top 5
+                    total_taken = 0
+                    top_5_details = []
+
+                    for user_id, user_display_name, score in top_5:
+                        points_to_take = int(score * 0.10)
+                        new_score = score - points_to_take
+                        total_taken += points_to_take
+
+                        # Update the user's score
+                        await cur.execute(
+                            "UPDATE fart_scores SET score=? WHERE user_id=?",
+                            (new_score, user_id),
+                        )
+                        top_5_details.append(
+                            f"{user_display_name}: -{points_to_take} points"
+                        )
+
+                    # Distribute evenly to everyone else
+                    points_per_user = total_taken // len(others)
+                    remainder = total_taken % len(others)
+
+                    others_details = []
+                    for i, (user_id, user_display_name, score) in enumerate(others):
+                        # Give remainder to first user
+                        bonus = points_per_user + (remainder if i == 0 else 0)
+                        new_score = score + bonus
+
+                        await cur.execute(
+                            "UPDATE fart_scores SET score=? WHERE user_id=?",
+                            (new_score, user_id),
+                        )
+                        others_details.append(f"{user_display_name}: +{bonus} points")
+
+                    await fart_ranks.refresh(*(row[0] for row in all_users))
+
+            if already_used:
                 await ctx.send(
                     "You have already used wealth distribution during your reign!"
                 )
-                conn.close()
                 return
             else:
-                cur.execute(
-                    "INSERT OR REPLACE INTO fart_leader_only_once (user_id, user_display_name) VALUES (?, ?)",
-                    (ctx.author.id, ctx.author.global_name),
-                )
-                # Fixed: Changed 'username' to 'user_display_name'
-                cur.execute(
-                    """SELECT user_id, user_display_name, score 
-                   FROM fart_scores 
-                   ORDER BY score DESC"""
-                )
-                all_users = cur.fetchall()
-
                 if len(all_users) < 6:
                     await ctx.send(
                         "Not enough users to redistribute! Need at least 6 players."
                     )
-                    conn.close()
                     return
 
-                # Split into top 5 and everyone else
-                top_5 = all_users[:5]
-                others = all_users[5:]
-
-                # Calculate total points to take from top 5
-                total_taken = 0
-                top_5_details = []
-
-                for user_id, user_display_name, score in top_5:
-                    points_to_take = int(score * 0.10)
-                    new_score = score - points_to_take
-                    total_taken += points_to_take
-
-                    # Update the user's score
-                    cur.execute(
-                        "UPDATE fart_scores SET score=? WHERE user_id=?",
-                        (new_score, user_id),
-                    )
-                    top_5_details.append(
-                        f"{user_display_name}: -{points_to_take} points"
-                    )
-
-                # Distribute evenly to everyone else
-                points_per_user = total_taken // len(others)
-                remainder = total_taken % len(others)
-
-                others_details = []
-                for i, (user_id, user_display_name, score) in enumerate(others):
-                    # Give remainder to first user
-                    bonus = points_per_user + (remainder if i == 0 else 0)
-                    new_score = score + bonus
-
-                    cur.execute(
-                        "UPDATE fart_scores SET score=? WHERE user_id=?",
-                        (new_score, user_id),
-                    )
-                    others_details.append(f"{user_display_name}: +{bonus} points")
-
-                conn.commit()
-                conn.close()
-
                 # Create response message
                 response = (
                     f"🏹 **ROBIN HOOD REDISTRIBUTION!** 🏹\n\n"
@@ -1320,18 +1153,16 @@ class FartPredictionView(discord.ui.View):
         cog = self.cog
 
         did_user_fart_today = False
-        conn = sqlite3.connect("fart_scores.db")
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT date_last_updated FROM fart_scores WHERE user_id=?",
-            (self.user_id,),
-        )
-        row = cur.fetchone()
+        async with DatabaseConnection("fart_scores.db") as cur:
+            await cur.execute(
+                "SELECT date_last_updated FROM fart_scores WHERE user_id=?",
+                (self.user_id,),
+            )
+            row = await cur.fetchone()
         if row:
             last_fart_date = datetime.datetime.fromisoformat(row[0]).date()
             if last_fart_date == datetime.datetime.now().date():
                 did_user_fart_today = True
-        conn.close()
 
         if did_user_fart_today:
             await ctx.response.send_message(f"<@{self.user_id}>, {daily_usage_message}")
@@ -1342,33 +1173,27 @@ class FartPredictionView(discord.ui.View):
         # Check for Mushroom Boost
         mushroom_boost_active = False
         try:
-            conn = sqlite3.connect("fart_scores.db")
-            cur = conn.cursor()
-            cur.execute(
-                "SELECT activated_at FROM lucky_charms WHERE user_id = ?",
-                (self.user_id,),
-            )
-            charm_result = cur.fetchone()
-            
-            if charm_result:
-                # Mushroom boost is active - roll twice and take higher
-                mushroom_boost_active = True
-                roll2 = randrange(1, 101)
-                original_roll = roll
-                roll = max(roll, roll2)
-                
-                # Remove the mushroom boost after use
-                cur.execute(
-                    "DELETE FROM lucky_charms WHERE user_id = ?",
+            async with DatabaseConnection("fart_scores.db") as cur:
+                await cur.execute(
+                    "SELECT activated_at FROM lucky_charms WHERE user_id = ?",
                     (self.user_id,),
                 )
-                conn.commit()
-            
-            conn.close()
-        except sqlite3.Error as e:
+                charm_result = await cur.fetchone()
+                
+                if charm_result:
+                    # Mushroom boost is active - roll twice and take higher
+                    mushroom_boost_active = True
+                    roll2 = randrange(1, 101)
+                    original_roll = roll
+                    roll = max(roll, roll2)
+                    
+                    # Remove the mushroom boost after use
+                    await cur.execute(
+                        "DELETE FROM lucky_charms WHERE user_id = ?",
+                        (self.user_id,),
+                    )
+        except DatabaseError as e:
             logger.error(f"Error checking mushroom boost in prediction: {e}")
-            if "conn" in locals():
-                conn.close()
         
         if roll >= 96:
             fart_message = "Curio Shart! 💩💨💨💨💨"
@@ -1396,8 +1221,7 @@ class FartPredictionView(discord.ui.View):
             points_earned //= 2
             result_message = "\n😢 Wrong prediction! Your points are halved."
 
-        cog.save_fart_score(now, self.user_id, ctx.user.global_name, points_earned)
-        fart_message_add = cog.openai_response(fart_message, ctx.user.name)
+        await cog.save_fart_score(now, self.user_id, ctx.user.global_name, points_earned)
 
         mushroom_boost_msg = (
             " **MUSHROOM BOOST ACTIVATED!** \n"
@@ -1405,8 +1229,14 @@ class FartPredictionView(discord.ui.View):
             else ""
         )
 
-        await ctx.response.send_message(
-            f"{mushroom_boost_msg}{fart_message} {fart_message_add} {result_message} You earned {points_earned} points."
+        def render(fart_message_add):
+            return f"{mushroom_boost_msg}{fart_message} {fart_message_add} {result_message} You earned {points_earned} points."
+
+        await ctx.response.send_message(render(QUIP_PLACEHOLDER))
+        flavor.edit_in_later(
+            flavor.fart_quip(fart_message, ctx.user.name),
+            render,
+            ctx.edit_original_response,
         )
 
         await cog.update_fart_leader_role(ctx)
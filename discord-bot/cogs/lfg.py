@@ -1,16 +1,20 @@
 import discord
 from discord.ext import commands
-import datetime
 import logging
+import time
 from random import randrange
 
 from utils.database import winner_report, losser_report, solo_match_report
 from utils.constants import SORCERY_NICKNAMES
+from utils.lfg_queue import lfg_queue
+from utils.lfg_stats import heatmap, hour_of_week, slot_label, summarize
+from utils.lfg_watch import format_window, lfg_watch, parse_window
+from utils.outbound import outbound, pack_messages
+from utils.users import get_user_resolver
 
 logger = logging.getLogger("discord_bot")
 
-# In-memory LFG queue (user_id: {timestamp, timeframe})
-lfg_queue = {}
+LFG_CHANNEL_ID = 1336912830867439676
 
 
 class MatchReportModal(discord.ui.Modal, title="Match Report"):
@@ -65,7 +69,7 @@ class MatchReportModal(discord.ui.Modal, title="Match Report"):
         )
 
         if self.is_winner:
-            winner_report(
+            await winner_report(
                 interaction_user_id,
                 self.winner_id,
                 self.winner_global,
@@ -80,7 +84,7 @@ class MatchReportModal(discord.ui.Modal, title="Match Report"):
                 interaction_global,
             )
         else:
-            losser_report(
+            await losser_report(
                 interaction_user_id,
                 self.winner_id,
                 self.winner_global,
@@ -94,6 +98,9 @@ class MatchReportModal(discord.ui.Modal, title="Match Report"):
                 interaction_user_id,
                 interaction_global,
             )
+        if match_time:
+            # Keeps the expected game length used for pairing up to date
+            await lfg_queue.refresh_match_minutes()
 
         await interaction.followup.send(
             f"✅ Match report submitted!\n**Winner:** {self.winner_global}\n**Loser:** {self.loser_global}",
@@ -197,7 +204,9 @@ class ChallengeButtons(discord.ui.View):
     async def accept_button(
         self, interaction: discord.Interaction, button: discord.ui.Button
     ):
-        challenger = await interaction.client.fetch_user(self.challenger_id)
+        challenger = await get_user_resolver(interaction.client).resolve(
+            self.challenger_id
+        )
 
         # Send match report buttons to both players
         challenger_view = LFGReportButtons(
@@ -224,7 +233,9 @@ class ChallengeButtons(discord.ui.View):
     async def decline_button(
         self, interaction: discord.Interaction, button: discord.ui.Button
     ):
-        challenger = await interaction.client.fetch_user(self.challenger_id)
+        challenger = await get_user_resolver(interaction.client).resolve(
+            self.challenger_id
+        )
         await challenger.send(
             f"{interaction.user.global_name} has declined your challenge."
         )
@@ -320,7 +331,7 @@ class SoloMatchReportModal(discord.ui.Modal, title="Solo Match Report"):
             int(self.match_time.value) if self.match_time.value.isdigit() else 0
         )
 
-        solo_match_report(
+        await solo_match_report(
             reporter_id=self.reporter_id,
             reporter_global=self.reporter_global,
             opponent_name=self.opponent_name.value,
@@ -341,98 +352,149 @@ class SoloMatchReportModal(discord.ui.Modal, title="Solo Match Report"):
 class LFGCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.users = get_user_resolver(bot)
+        lfg_queue.start(self.announce_expired, self.announce_pairs)
+
+    def check_if_someone_is_lfg(self, ctx, timeframe, start_in=0):
+        """
+        The queue entry closest to the caller's Elo within the search window
+        that is free for a whole game during the caller's window.
+        """
+        available_from = time.time() + start_in * 60
+        return lfg_queue.find_match(
+            ctx.author.id, available_from, available_from + timeframe * 60
+        )
 
-    def check_if_someone_is_lfg(self, ctx):
-        now = datetime.datetime.now()
-        for user_id, info in lfg_queue.items():
-            timestamp = info["timestamp"]
-            timeframe = info["timeframe"]
-            if (now - timestamp).total_seconds() < timeframe * 60:
-                return user_id
-        return None
-
-    def add_to_lfg_queue(self, ctx, timeframe):
-        lfg_queue[ctx.author.id] = {
-            "timestamp": datetime.datetime.now(),
-            "timeframe": int(timeframe),
-        }
-
-    def pair_players(self, ctx):
-        now = datetime.datetime.now()
-        for user_id, info in lfg_queue.items():
-            if (
-                user_id != ctx.author.id
-                and (now - info["timestamp"]).total_seconds() < info["timeframe"] * 60
-            ):
-                matched_user_id = user_id
-                lfg_queue.pop(matched_user_id, None)
-                lfg_queue.pop(ctx.author.id, None)
-                logger.info(f"Pairing {matched_user_id} with {ctx.author.id}")
-                return matched_user_id
-        return None
-
-    def clean_expired_lfg(self):
-        now = datetime.datetime.now()
-        expired = [
-            user_id
-            for user_id, info in lfg_queue.items()
-            if (now - info["timestamp"]).total_seconds() > info["timeframe"] * 60
-        ]
-        for user_id in expired:
-            lfg_queue.pop(user_id)
+    async def add_to_lfg_queue(self, ctx, timeframe, start_in=0):
+        await lfg_queue.join(ctx.author.id, int(timeframe), int(start_in))
+
+    async def pair_players(self, ctx, matched_user_id):
+        await lfg_queue.pair(ctx.author.id, matched_user_id)
+        logger.info(f"Pairing {matched_user_id} with {ctx.author.id}")
+
+    async def start_match(self, player, opponent, starts_at=None):
+        """
+        DM both players their match report buttons and announce the pairing.
+        ``starts_at`` is when both are free, if that's later than now.
+        """
+        when = ""
+        if starts_at is not None and starts_at > time.time() + 60:
+            when = f" starting <t:{int(starts_at)}:t> (<t:{int(starts_at)}:R>)"
+        for user, other in ((player, opponent), (opponent, player)):
+            view = LFGReportButtons(
+                user.id, user.id, user.global_name, other.id, other.global_name
+            )
+            logger.info(f"Sending match report to {user} via DM")
+            await user.send(
+                f"You've been matched with {other.mention} for a game{when}!",
+                view=view,
+            )
+
+        lfg_channel = self.bot.get_channel(LFG_CHANNEL_ID)
+        if lfg_channel:
+            logger.info(f"Announcing match in LFG channel")
+            await lfg_channel.send(
+                f"A match was found! {SORCERY_NICKNAMES[randrange(0, len(SORCERY_NICKNAMES))]} and "
+                f"{SORCERY_NICKNAMES[randrange(0, len(SORCERY_NICKNAMES))]} have been paired for a game."
+            )
+
+    async def announce_pairs(self, pairs):
+        """Called by the queue when waiting players' search windows meet."""
+        for first, second in pairs:
+            logger.info(f"Pairing {first['user_id']} with {second['user_id']} from the queue")
+            try:
+                player = await self.users.resolve(first["user_id"])
+                opponent = await self.users.resolve(second["user_id"])
+                await self.start_match(
+                    player,
+                    opponent,
+                    max(first["available_from"], second["available_from"]),
+                )
+            except Exception as e:
+                logger.error(
+                    f"Error starting match for {first['user_id']} and {second['user_id']}: {e}"
+                )
+
+    async def notify_watchers(self, player, available_from, timeframe):
+        """DM subscribers watching the hour a newly queued player is free from."""
+        hour = hour_of_week(available_from) % 24
+        # Anyone already in the queue (the new player included) is looking anyway
+        user_ids = lfg_watch.to_notify(hour, exclude=lfg_queue)
+        if not user_ids:
+            return
+        logger.info(f"Notifying {len(user_ids)} LFG watchers about {player.id}")
+        starting = (
+            f" from <t:{int(available_from)}:t>"
+            if available_from > time.time() + 60
+            else ""
+        )
+        users = await self.users.resolve_many(user_ids)
+        for user in users.values():
+            outbound.send(
+                user,
+                f"A {SORCERY_NICKNAMES[randrange(0, len(SORCERY_NICKNAMES))]} is looking "
+                f"for a game{starting} for {timeframe} minutes! Use `!lfg` to join them. "
+                "(`!lfgunwatch` to stop these messages)",
+            )
+
+    async def announce_expired(self, entries):
+        """Called by the queue's sweeper with entries whose time ran out."""
+        lfg_channel = self.bot.get_channel(LFG_CHANNEL_ID)
+        users = await self.users.resolve_many(entry["user_id"] for entry in entries)
+        lines = []
+        for entry in entries:
+            logger.info(f"LFG entry for {entry['user_id']} expired")
+            lines.append(
+                f"A {SORCERY_NICKNAMES[randrange(0, len(SORCERY_NICKNAMES))]} "
+                "stopped looking for a game."
+            )
+            user = users.get(entry["user_id"])
+            if user:
+                outbound.send(
+                    user,
+                    f"Your {entry['minutes']} minute LFG request has expired. "
+                    "Use `!lfg` to queue again.",
+                )
+        if len(lfg_queue) == 0:
+            lines.append("No one is currently looking for a game.")
+        if lfg_channel:
+            for message in pack_messages(lines):
+                outbound.send(lfg_channel, message)
 
     @commands.command()
-    async def lfg(self, ctx, timeframe: int = 30):
-        """Usage: !lfg [minutes]"""
-        logger.info(f"LFG command started - User: {ctx.author} (ID: {ctx.author.id}), Channel: {ctx.channel}, Timeframe: {timeframe}")
-        
-        self.clean_expired_lfg()
-        logger.info(f"Cleaned expired LFG entries. Current queue size: {len(lfg_queue)}")
-        
+    async def lfg(self, ctx, timeframe: int = 30, start_in: int = 0):
+        """Usage: !lfg [minutes] [starting in minutes]"""
+        logger.info(f"LFG command started - User: {ctx.author} (ID: {ctx.author.id}), Channel: {ctx.channel}, Timeframe: {timeframe}, Start in: {start_in}, Queue size: {len(lfg_queue)}")
+        start_in = max(start_in, 0)
+
         owner_id = 296846802924208130
-        channel_id = 1336912830867439676
-        owner = await self.bot.fetch_user(owner_id)
+        channel_id = LFG_CHANNEL_ID
+        owner = await self.users.resolve(owner_id)
         lfg_channel = self.bot.get_channel(channel_id)
 
         if owner:
-            logger.info(f"Sending notification to owner about {ctx.author}'s LFG request")
-            await owner.send(f"{ctx.author} used the !lfg command in #{ctx.channel}.")
+            logger.info(f"Queueing notification to owner about {ctx.author}'s LFG request")
+            outbound.send(owner, f"{ctx.author} used the !lfg command in #{ctx.channel}.")
 
-        matched_user_id = self.check_if_someone_is_lfg(ctx)
+        match = None
+        if ctx.author.id in lfg_queue:
+            matched_user_id = ctx.author.id
+        else:
+            match = self.check_if_someone_is_lfg(ctx, timeframe, start_in)
+            matched_user_id = match["user_id"] if match else None
         logger.info(f"Checked for existing LFG users. Matched user ID: {matched_user_id}")
         if matched_user_id and matched_user_id != ctx.author.id:
             logger.info(f"Match found! Pairing {ctx.author.id} with {matched_user_id}")
-            matched_user = await self.bot.fetch_user(matched_user_id)
-            view_ctx = LFGReportButtons(
-                ctx.author.id,
-                ctx.author.id,
-                ctx.author.global_name,
-                matched_user_id,
-                matched_user.global_name,
-            )
-            logger.info(f"Sending match report to {ctx.author} via DM")
-            await ctx.author.send("Match report:", view=view_ctx)
+            # Leave the queue before any await so nobody else takes the match
+            await self.pair_players(ctx, matched_user_id)
+            matched_user = await self.users.resolve(matched_user_id, ctx.guild)
             await ctx.send(
                 f"{ctx.author.mention}, matched with {matched_user.mention} who is also looking for a game!"
             )
-
-            view_matched = LFGReportButtons(
-                matched_user_id,
-                matched_user_id,
-                matched_user.global_name,
-                ctx.author.id,
-                ctx.author.global_name,
-            )
-            logger.info(f"Sending match report to {matched_user} via DM")
-            await matched_user.send(
-                f"You've been matched with {ctx.author.mention} for a game!",
-                view=view_matched,
-            )
-            self.pair_players(ctx)
-            logger.info(f"Announcing match in LFG channel")
-            await lfg_channel.send(
-                f"A match was found! {SORCERY_NICKNAMES[randrange(0, len(SORCERY_NICKNAMES))]} and "
-                f"{SORCERY_NICKNAMES[randrange(0, len(SORCERY_NICKNAMES))]} have been paired for a game."
+            await self.start_match(
+                ctx.author,
+                matched_user,
+                max(match["available_from"], time.time() + start_in * 60),
             )
         elif matched_user_id == ctx.author.id:
             logger.info(f"User {ctx.author.id} is already in queue")
@@ -441,13 +503,21 @@ class LFGCog(commands.Cog):
             )
         else:
             logger.info(f"No match found. Adding {ctx.author.id} to queue for {timeframe} minutes")
-            self.add_to_lfg_queue(ctx, timeframe)
-            logger.info(f"User added to queue. Queue contents: {lfg_queue}")
-            
+            await self.add_to_lfg_queue(ctx, timeframe, start_in)
+            logger.info(f"User added to queue. Queue size: {len(lfg_queue)}")
+            await self.notify_watchers(
+                ctx.author, lfg_queue.get(ctx.author.id)["available_from"], timeframe
+            )
+            starting = (
+                f", starting <t:{int(time.time() + start_in * 60)}:R>"
+                if start_in
+                else ""
+            )
+
             try:
                 await ctx.author.send(
                     f"You have been added to the queue for looking for a game for "
-                    f"{timeframe} minutes. You can also use the `!lfg` command here to join the queue privately."
+                    f"{timeframe} minutes{starting}. You can also use the `!lfg` command here to join the queue privately."
                 )
                 logger.info(f"DM sent successfully to {ctx.author}")
             except discord.Forbidden:
@@ -459,7 +529,7 @@ class LFGCog(commands.Cog):
                 logger.info(f"Announcing new LFG entry in channel {channel_id}")
                 await lfg_channel.send(
                     f"A {SORCERY_NICKNAMES[randrange(0, len(SORCERY_NICKNAMES))]} is now looking for a game "
-                    f"for {timeframe} minutes! Message me with the `!lfg` command to join them."
+                    f"for {timeframe} minutes{starting}! Message me with the `!lfg` command to join them."
                 )
             else:
                 logger.warning(f"LFG channel {channel_id} not found")
@@ -469,19 +539,122 @@ class LFGCog(commands.Cog):
     @commands.command()
     async def checklfg(self, ctx):
         """Check if anyone is currently in the LFG queue."""
-        self.clean_expired_lfg()
         if len(lfg_queue) > 0:
             await ctx.send(f"{ctx.author.mention}, yes, someone is in the queue!")
         else:
             await ctx.send(f"{ctx.author.mention}, no one is currently in the queue.")
 
+    @commands.command()
+    async def lfgsoon(self, ctx, minutes: int = 60):
+        """Usage: !lfgsoon [minutes] - who can play within the next X minutes."""
+        now = time.time()
+        entries = lfg_queue.free_within(max(minutes, 0), now)
+        if not entries:
+            await ctx.send(
+                f"{ctx.author.mention}, no one is free to play in the next {minutes} minutes."
+            )
+            return
+        lines = [
+            f"A {SORCERY_NICKNAMES[randrange(0, len(SORCERY_NICKNAMES))]} - "
+            + (
+                "free now"
+                if entry["available_from"] <= now
+                else f"from <t:{int(entry['available_from'])}:t>"
+            )
+            + f" until <t:{int(entry['expires_at'])}:t>"
+            for entry in entries
+        ]
+        lines.insert(
+            0, f"**Free to play in the next {minutes} minutes ({len(entries)}):**"
+        )
+        for message in pack_messages(lines):
+            await ctx.send(message)
+
+    @commands.command()
+    async def lfgstats(self, ctx):
+        """LFG demand by hour of the week and how long players wait for a match."""
+        hourly, waits = await lfg_queue.stats()
+        stats = summarize(hourly, waits)
+        totals = stats["totals"]
+        if not totals["joins"]:
+            await ctx.send("No LFG activity has been recorded yet.")
+            return
+
+        embed = discord.Embed(
+            title="📈 LFG Activity",
+            description=f"Players looking for a game by hour of the week (bot time)\n```\n{heatmap(hourly)}\n```",
+            color=discord.Color.blue(),
+        )
+        embed.add_field(
+            name="Peak Hours",
+            value="\n".join(
+                f"{slot_label(slot)} - {joins} looking" for slot, joins in stats["peaks"]
+            ),
+            inline=True,
+        )
+        median = stats["median_wait"]
+        quick = stats["paired_within_15"]
+        embed.add_field(
+            name="Waiting",
+            value=(
+                f"Median wait to match: {f'{median:.1f} min' if median is not None else 'n/a'}\n"
+                f"Matched within 15 min: {f'{quick:.0%}' if quick is not None else 'n/a'}"
+            ),
+            inline=True,
+        )
+        embed.add_field(
+            name="Totals",
+            value=(
+                f"Joined: {totals['joins']}\nPaired: {totals['pairs']}\n"
+                f"Expired: {totals['expires']}\nCancelled: {totals['cancels']}"
+            ),
+            inline=True,
+        )
+        await ctx.send(embed=embed)
+
+    @commands.command()
+    async def lfgwatch(self, ctx, *, window: str = None):
+        """Usage: !lfgwatch 7-10pm - get a DM when someone queues in those hours."""
+        if window is None:
+            current = lfg_watch.get(ctx.author.id)
+            if current:
+                await ctx.send(
+                    f"{ctx.author.mention}, you're watching for games between "
+                    f"{format_window(*current)} (bot time). Use `!lfgunwatch` to stop."
+                )
+            else:
+                await ctx.send(
+                    f"{ctx.author.mention}, usage: `!lfgwatch 7-10pm` or `!lfgwatch 19-22`"
+                )
+            return
+
+        hours = parse_window(window)
+        if hours is None:
+            await ctx.send(
+                f"{ctx.author.mention}, I couldn't read `{window}`. Try `!lfgwatch 7-10pm` or `!lfgwatch 19-22`."
+            )
+            return
+        await lfg_watch.watch(ctx.author.id, *hours)
+        logger.info(f"{ctx.author.id} is watching LFG between {format_window(*hours)}")
+        await ctx.send(
+            f"{ctx.author.mention}, I'll DM you when someone looks for a game between "
+            f"{format_window(*hours)} (bot time)."
+        )
+
+    @commands.command()
+    async def lfgunwatch(self, ctx):
+        """Stop LFG watch notifications."""
+        if await lfg_watch.unwatch(ctx.author.id):
+            await ctx.send(f"{ctx.author.mention}, you will no longer get LFG notifications.")
+        else:
+            await ctx.send(f"{ctx.author.mention}, you aren't watching for games.")
+
     @commands.command()
     async def cancel(self, ctx):
         """Cancel your LFG queue status."""
-        channel_id = 1336912830867439676
-        lfg_channel = self.bot.get_channel(channel_id)
+        lfg_channel = self.bot.get_channel(LFG_CHANNEL_ID)
         if ctx.author.id in lfg_queue:
-            lfg_queue.pop(ctx.author.id)
+            await lfg_queue.remove(ctx.author.id)
             await ctx.send(
                 f"{ctx.author.mention}, you have been removed from the LFG queue."
             )
@@ -539,8 +712,13 @@ class LFGCog(commands.Cog):
         embed.add_field(
             name="🔍 Queue Commands",
             value=(
-                "`!lfg [minutes]` - Join queue for X minutes (default 30)\n"
+                "`!lfg [minutes] [start_in]` - Join queue for X minutes (default 30), "
+                "optionally starting in Y minutes\n"
                 "`!checklfg` - See if anyone is in queue\n"
+                "`!lfgsoon [minutes]` - See who is free in the next X minutes (default 60)\n"
+                "`!lfgstats` - Busiest LFG hours and typical wait for a match\n"
+                "`!lfgwatch 7-10pm` - Get a DM when someone queues in those hours\n"
+                "`!lfgunwatch` - Stop watch notifications\n"
                 "`!cancel` - Leave the queue"
             ),
             inline=False,
@@ -573,6 +751,8 @@ class LFGCog(commands.Cog):
             name="💡 Tips",
             value=(
                 "• Queue time can be 5-120 minutes\n"
+                "• You're paired with the closest Elo in the queue; the allowed gap widens the longer you wait\n"
+                "• You're only paired if you're both free for a typical game's length\n"
                 "• Direct challenges expire after 5 minutes\n"
             ),
             inline=False,
@@ -1,12 +1,13 @@
 import discord
 from discord.ext import commands
 import datetime
-import sqlite3
 import logging
 import random
 from openai import OpenAI
 
 import config
+from utils.database import DatabaseConnection
+from utils.ranking import fart_ranks
 
 logger = logging.getLogger("discord_bot")
 
@@ -34,17 +35,6 @@ class ShopCog(commands.Cog):
         }
         logger.info("ShopCog initialized")
 
-    async def setup_protection_table(self):
-        """Create protection table if it doesn't exist"""
-        async with self.bot.db.cursor() as cursor:
-            await cursor.execute("""
-                CREATE TABLE IF NOT EXISTS protection_status (
-                    user_id INTEGER PRIMARY KEY,
-                    protected_until TIMESTAMP
-                )
-            """)
-            await self.bot.db.commit()
-
     # Update the check_points method
     async def check_points(self, user_id: int, item_type: str = "red") -> bool:
         cost = self.item_costs.get(
@@ -52,13 +42,13 @@ class ShopCog(commands.Cog):
         )  # Default to 10 if item type not found
         logger.debug(f"Checking points for user {user_id} - needs {cost} points")
         try:
-            conn = sqlite3.connect("fart_scores.db")
-            cur = conn.cursor()
-            cur.execute("SELECT score FROM fart_scores WHERE user_id = ?", (user_id,))
-            result = cur.fetchone()
+            async with DatabaseConnection("fart_scores.db") as cur:
+                await cur.execute(
+                    "SELECT score FROM fart_scores WHERE user_id = ?", (user_id,)
+                )
+                result = await cur.fetchone()
             has_points = result and result[0] >= cost
             logger.debug(f"User {user_id} has enough points: {has_points}")
-            conn.close()
             return has_points
         except Exception as e:
             logger.error(f"Error checking points: {e}")
@@ -71,14 +61,12 @@ class ShopCog(commands.Cog):
         )  # Default to 10 if item type not found
         logger.debug(f"Deducting {cost} points from user {user_id}")
         try:
-            conn = sqlite3.connect("fart_scores.db")
-            cur = conn.cursor()
-            cur.execute(
-                "UPDATE fart_scores SET score = score - ? WHERE user_id = ?",
-                (cost, user_id),
-            )
-            conn.commit()
-            conn.close()
+            async with DatabaseConnection("fart_scores.db") as cur:
+                await cur.execute(
+                    "UPDATE fart_scores SET score = score - ? WHERE user_id = ?",
+                    (cost, user_id),
+                )
+                await fart_ranks.refresh(user_id)
             logger.debug(f"Successfully deducted points from user {user_id}")
         except Exception as e:
             logger.error(f"Error deducting points: {e}")
@@ -86,65 +74,30 @@ class ShopCog(commands.Cog):
 
     async def is_protected(self, user_id: int) -> bool:
         """Check if user has active protection"""
-        conn = sqlite3.connect("fart_scores.db")
-        cur = conn.cursor()
-        try:
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS protection_status (
-                    user_id INTEGER PRIMARY KEY,
-                    protected_until TIMESTAMP
-                )
-            """)
-            cur.execute(
+        async with DatabaseConnection("fart_scores.db") as cur:
+            await cur.execute(
                 """
                 SELECT protected_until FROM protection_status 
                 WHERE user_id = ? AND protected_until > datetime('now')
                 """,
                 (user_id,),
             )
-            result = bool(cur.fetchone())
-            conn.close()
-            return result
-        except Exception as e:
-            conn.close()
-            raise e
+            return bool(await cur.fetchone())
 
     def roll_damage(self, num_dice: int) -> int:
         """Roll specified number of D20 dice and return average"""
         total = sum(random.randint(1, 20) for _ in range(num_dice))
         return total // 2
 
-    async def get_sorted_players(self):
-        """Get players sorted by score"""
-        conn = sqlite3.connect("fart_scores.db")
-        cur = conn.cursor()
-        cur.execute("SELECT user_id, score FROM fart_scores ORDER BY score DESC")
-        result = cur.fetchall()
-        conn.close()
-        return result
-
     async def find_target(self, user_id: int, direction: str) -> tuple:
         """Find target based on direction (front/back/random_front)"""
-        players = await self.get_sorted_players()
-        user_index = next(
-            (i for i, (pid, _) in enumerate(players) if pid == user_id), None
-        )
-
-        if user_index is None:
-            return None
-
         if direction == "front":
-            target_index = user_index - 1
+            return fart_ranks.neighbor_above(user_id)
         elif direction == "back":
-            target_index = user_index + 1
+            return fart_ranks.neighbor_below(user_id)
         elif direction == "random_front":
-            if user_index == 0:
-                return None
-            target_index = random.randint(0, user_index - 1)
-        else:
-            return None
-
-        return players[target_index] if 0 <= target_index < len(players) else None
+            return fart_ranks.random_ahead(user_id)
+        return None
 
     @commands.command(name="blueshell")
     async def blue_shell(self, ctx):
@@ -162,12 +115,12 @@ class ShopCog(commands.Cog):
                     f"You don't have enough points! Blue Shell costs {self.item_costs['blue']} points!"
                 )
 
-            players = await self.get_sorted_players()
-            if not players:
+            leader = fart_ranks.leader()
+            if not leader:
                 logger.warning("No players found for blue shell")
                 return await ctx.send("No players found!")
 
-            leader_id = players[0][0]
+            leader_id = leader[0]
             logger.debug(f"Target leader: {leader_id}")
 
             if await self.is_protected(leader_id):
@@ -290,28 +243,17 @@ class ShopCog(commands.Cog):
             protection_end = datetime.datetime.now() + datetime.timedelta(hours=24)
             logger.debug(f"Setting protection until: {protection_end}")
 
-            conn = sqlite3.connect("fart_scores.db")
-            cur = conn.cursor()
-            try:
-                cur.execute("""
-                    CREATE TABLE IF NOT EXISTS protection_status (
-                        user_id INTEGER PRIMARY KEY,
-                        protected_until TIMESTAMP
-                    )
-                """)
-                cur.execute(
+            async with DatabaseConnection("fart_scores.db") as cur:
+                await cur.execute(
                     "INSERT OR REPLACE INTO protection_status (user_id, protected_until) VALUES (?, ?)",
                     (ctx.author.id, protection_end),
                 )
-                conn.commit()
                 logger.debug(f"Protection status updated for user {ctx.author.id}")
 
                 await self.deduct_points(ctx.author.id, "star")
-                await ctx.send(
-                    f"<@{ctx.author.id}> is now protected by a Star for 24 hours!"
-                )
-            finally:
-                conn.close()
+            await ctx.send(
+                f"<@{ctx.author.id}> is now protected by a Star for 24 hours!"
+            )
         except Exception as e:
             logger.error(f"Error in star command: {e}")
             await ctx.send("An error occurred while processing the command.")
@@ -333,79 +275,59 @@ class ShopCog(commands.Cog):
                     f"You don't have enough points! Mushroom Boost costs {self.item_costs['mushroom']} points!"
                 )
 
-            conn = sqlite3.connect("fart_scores.db")
-            cur = conn.cursor()
-
-            # Create lucky charms table if it doesn't exist
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS lucky_charms (
-                    user_id INTEGER PRIMARY KEY,
-                    activated_at TEXT
+            days_remaining = None
+            already_active = False
+            async with DatabaseConnection("fart_scores.db") as cur:
+                # Check weekly cooldown
+                await cur.execute(
+                    "SELECT last_used FROM lucky_charm_usage WHERE user_id = ? AND command_name = 'mushroom'",
+                    (ctx.author.id,),
                 )
-            """)
-
-            # Create weekly usage tracking table
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS lucky_charm_usage (
-                    user_id INTEGER,
-                    command_name TEXT,
-                    last_used TEXT,
-                    PRIMARY KEY (user_id, command_name)
+                cooldown_result = await cur.fetchone()
+
+                if cooldown_result:
+                    last_used_date = datetime.datetime.fromisoformat(cooldown_result[0]).date()
+                    if last_used_date + datetime.timedelta(weeks=1) > datetime.datetime.now().date():
+                        days_remaining = (last_used_date + datetime.timedelta(weeks=1) - datetime.datetime.now().date()).days
+
+                # Check if user already has an active lucky charm
+                await cur.execute(
+                    "SELECT activated_at FROM lucky_charms WHERE user_id = ?",
+                    (ctx.author.id,),
                 )
-            """)
+                already_active = bool(await cur.fetchone())
 
-            # Check weekly cooldown
-            cur.execute(
-                "SELECT last_used FROM lucky_charm_usage WHERE user_id = ? AND command_name = 'mushroom'",
-                (ctx.author.id,),
-            )
-            cooldown_result = cur.fetchone()
-
-            if cooldown_result:
-                last_used_date = datetime.datetime.fromisoformat(cooldown_result[0]).date()
-                if last_used_date + datetime.timedelta(weeks=1) > datetime.datetime.now().date():
-                    days_remaining = (last_used_date + datetime.timedelta(weeks=1) - datetime.datetime.now().date()).days
-                    conn.close()
-                    return await ctx.send(
-                        f"You can only use Mushroom Boost once per week! Try again in {days_remaining} day{'s' if days_remaining != 1 else ''}."
+                if days_remaining is None and not already_active:
+                    # Deduct the cost
+                    await self.deduct_points(ctx.author.id, "mushroom")
+
+                    # Activate the lucky charm
+                    now = datetime.datetime.now()
+                    await cur.execute(
+                        "INSERT INTO lucky_charms (user_id, activated_at) VALUES (?, ?)",
+                        (ctx.author.id, now.isoformat()),
                     )
 
-            # Check if user already has an active lucky charm
-            cur.execute(
-                "SELECT activated_at FROM lucky_charms WHERE user_id = ?",
-                (ctx.author.id,),
-            )
-            result = cur.fetchone()
+                    # Update weekly usage cooldown
+                    await cur.execute(
+                        """
+                        INSERT INTO lucky_charm_usage (user_id, command_name, last_used)
+                        VALUES (?, 'mushroom', ?)
+                        ON CONFLICT(user_id, command_name) 
+                        DO UPDATE SET last_used = ?
+                        """,
+                        (ctx.author.id, now.isoformat(), now.isoformat()),
+                    )
 
-            if result:
-                conn.close()
+            if days_remaining is not None:
                 return await ctx.send(
-                    f"You already have a Mushroom Boost active! Use `!fart` to consume it first."
+                    f"You can only use Mushroom Boost once per week! Try again in {days_remaining} day{'s' if days_remaining != 1 else ''}."
                 )
 
-            # Deduct the cost
-            await self.deduct_points(ctx.author.id, "mushroom")
-
-            # Activate the lucky charm
-            now = datetime.datetime.now()
-            cur.execute(
-                "INSERT INTO lucky_charms (user_id, activated_at) VALUES (?, ?)",
-                (ctx.author.id, now.isoformat()),
-            )
-
-            # Update weekly usage cooldown
-            cur.execute(
-                """
-                INSERT INTO lucky_charm_usage (user_id, command_name, last_used)
-                VALUES (?, 'mushroom', ?)
-                ON CONFLICT(user_id, command_name) 
-                DO UPDATE SET last_used = ?
-                """,
-                (ctx.author.id, now.isoformat(), now.isoformat()),
-            )
-
-            conn.commit()
-            conn.close()
+            if already_active:
+                return await ctx.send(
+                    f"You already have a Mushroom Boost active! Use `!fart` to consume it first."
+                )
 
             await ctx.send(
                 f" **Mushroom Boost Activated!** \n"
@@ -433,12 +355,11 @@ class ShopCog(commands.Cog):
                 f"You don't have enough points! Bob-omb costs {self.item_costs['bobomb']} points!"
             )
 
-        players = await self.get_sorted_players()
-        if not players:
+        # Get top 5 players
+        top_5 = fart_ranks.top_n(5)
+        if not top_5:
             return await ctx.send("No players found!")
 
-        # Get top 5 players
-        top_5 = players[:5]
         damage = self.roll_damage(3)  # 3d20/2 damage
 
         # Track who got hit
@@ -523,14 +444,12 @@ class ShopCog(commands.Cog):
         print("Deducting damage...")
         """Deduct damage amount from user's points"""
         try:
-            conn = sqlite3.connect("fart_scores.db")
-            cur = conn.cursor()
-            cur.execute(
-                "UPDATE fart_scores SET score = CASE WHEN score - ? < 0 THEN 0 ELSE score - ? END WHERE user_id = ?",
-                (damage, damage, user_id),
-            )
-            conn.commit()
-            conn.close()
+            async with DatabaseConnection("fart_scores.db") as cur:
+                await cur.execute(
+                    "UPDATE fart_scores SET score = CASE WHEN score - ? < 0 THEN 0 ELSE score - ? END WHERE user_id = ?",
+                    (damage, damage, user_id),
+                )
+                await fart_ranks.refresh(user_id)
             logger.debug(f"Deducted {damage} damage points from user {user_id}")
         except Exception as e:
             logger.error(f"Error deducting damage: {e}")
@@ -553,11 +472,11 @@ class ShopCog(commands.Cog):
             )
 
         # Find and hit the leader
-        players = await self.get_sorted_players()
-        if not players:
+        leader = fart_ranks.leader()
+        if not leader:
             return await ctx.send("No players found!")
 
-        leader_id = players[0][0]
+        leader_id = leader[0]
         if leader_id == ctx.author.id:
             return await ctx.send("You can't Blue Star yourself!")
 
@@ -570,30 +489,25 @@ class ShopCog(commands.Cog):
         # Give protection for 12 hours
         protection_end = datetime.datetime.now() + datetime.timedelta(hours=12)
 
-        conn = sqlite3.connect("fart_scores.db")
-        cur = conn.cursor()
-        try:
+        async with DatabaseConnection("fart_scores.db") as cur:
             # Set protection status
-            cur.execute(
+            await cur.execute(
                 """
                 INSERT OR REPLACE INTO protection_status (user_id, protected_until) 
                 VALUES (?, ?)
                 """,
                 (ctx.author.id, protection_end),
             )
-            conn.commit()
 
             # Apply effects
             await self.deduct_points(ctx.author.id, "bluestar")
             await self.deduct_damage(leader_id, damage)
 
-            await ctx.send(
-                f"<@{ctx.author.id}> used a Blue Star!\n"
-                f"Hit leader <@{leader_id}> for {damage} damage!\n"
-                f"Gained Star protection for 12 hours!"
-            )
-        finally:
-            conn.close()
+        await ctx.send(
+            f"<@{ctx.author.id}> used a Blue Star!\n"
+            f"Hit leader <@{leader_id}> for {damage} damage!\n"
+            f"Gained Star protection for 12 hours!"
+        )
 
 
 async def setup(bot):
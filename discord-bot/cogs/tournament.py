@@ -2,50 +2,88 @@ import discord
 from discord.ext import commands
 import datetime
 import logging
-import json
-import os
-from typing import Dict, List
+from collections import OrderedDict
+
+from utils.bracket import build_bracket, seed_players
+from utils.outbound import outbound, pack_messages
+from utils.swiss import BYE, pair_round, standings, swiss_rounds
+from utils.tournaments import tournament_store
+from utils.users import get_user_resolver
 
 logger = logging.getLogger("discord_bot")
 
-# Tournament storage with file persistence
-active_tournaments: Dict[int, dict] = {}  # tournament_id: tournament_data
-TOURNAMENTS_FILE = "data/tournaments.json"
+# Rendered brackets kept for repeat !bracket calls
+BRACKET_CACHE_SIZE = 32
 
 
-def find_tournament_by_name(name: str) -> tuple[int, dict] | tuple[None, None]:
-    """Find a tournament by name (case-insensitive)"""
-    name = name.lower()
-    for tournament_id, tournament in active_tournaments.items():
-        if tournament["name"].lower() == name:
-            return tournament_id, tournament
-    return None, None
+def match_player_ids(matches) -> list[int]:
+    """Every player id that appears in the given matches."""
+    return [m[key] for m in matches for key in ("player1", "player2")]
+
+
+def is_swiss(tournament) -> bool:
+    return "swiss" in (tournament.get("format") or "").lower()
+
 
+def swiss_results(tournament) -> list[tuple]:
+    """``(player1, player2, winner)`` for every finished match, byes included."""
+    return [
+        (m["player1"], m["player2"], m["winner"])
+        for m in tournament["matches"]
+        if m["status"] == "completed"
+    ]
 
-def save_tournaments():
-    """Save tournaments data to file"""
-    try:
-        # Ensure the data directory exists
-        os.makedirs(os.path.dirname(TOURNAMENTS_FILE), exist_ok=True)
 
-        with open(TOURNAMENTS_FILE, "w") as f:
-            json.dump(active_tournaments, f, indent=4)
-        logger.info("Tournaments data saved successfully")
-    except Exception as e:
-        logger.error(f"Error saving tournaments data: {str(e)}")
+def is_bye(match) -> bool:
+    return match["player2"] is BYE and match["status"] == "completed"
 
 
-def load_tournaments():
-    """Load tournaments data from file"""
-    global active_tournaments
-    try:
-        if os.path.exists(TOURNAMENTS_FILE):
-            with open(TOURNAMENTS_FILE, "r") as f:
-                active_tournaments = json.load(f)
-            logger.info("Tournaments data loaded successfully")
-    except Exception as e:
-        logger.error(f"Error loading tournaments data: {str(e)}")
-        active_tournaments = {}
+def next_match_ready(tournament_id: int, match) -> dict | None:
+    """The match a reported one feeds into, if both its players are now known."""
+    next_match = tournament_store.get_match(tournament_id, match.get("next_match_id"))
+    if next_match is not None and next_match["status"] == "pending":
+        return next_match
+    return None
+
+
+def champion_embed(tournament, winner) -> discord.Embed:
+    """Winner announcement for a finished tournament."""
+    embed = discord.Embed(
+        title=f"🏆 Tournament Complete: {tournament['name']}",
+        description=f"Congratulations to our champion: {winner.mention}!",
+        color=discord.Color.gold(),
+    )
+    embed.add_field(
+        name="Tournament Stats",
+        value=f"Total Players: {len(tournament['players'])}\nTotal Matches: {len(tournament['matches'])}",
+        inline=False,
+    )
+    return embed
+
+
+def build_round(round_num: int, pairs, bye=None) -> list[dict]:
+    """New match dicts for a round; a bye is recorded as an instant win."""
+    matches = [
+        {
+            "round": round_num,
+            "player1": player1,
+            "player2": player2,
+            "winner": None,
+            "status": "pending",
+        }
+        for player1, player2 in pairs
+    ]
+    if bye is not None:
+        matches.append(
+            {
+                "round": round_num,
+                "player1": bye,
+                "player2": BYE,
+                "winner": bye,
+                "status": "completed",
+            }
+        )
+    return matches
 
 
 class TournamentSetupModal(discord.ui.Modal, title="Tournament Setup"):
@@ -62,7 +100,7 @@ class TournamentSetupModal(discord.ui.Modal, title="Tournament Setup"):
 
     tournament_format = discord.ui.TextInput(
         label="Tournament Format",
-        placeholder="Single Elimination/Double Elimination",
+        placeholder="Single Elimination/Swiss",
         required=True,
     )
 
@@ -76,19 +114,18 @@ class TournamentSetupModal(discord.ui.Modal, title="Tournament Setup"):
                 )
                 return
 
-            tournament_data = {
-                "name": self.tournament_name.value,
-                "format": self.tournament_format.value,
-                "max_players": max_players,
-                "players": [],
-                "matches": [],
-                "status": "registration",
-                "winner": None,
-            }
+            _, existing = tournament_store.find_by_name(self.tournament_name.value)
+            if existing and existing["status"] != "completed":
+                await interaction.response.send_message(
+                    f"A tournament called '{existing['name']}' is already running. "
+                    "Please pick another name.",
+                    ephemeral=True,
+                )
+                return
 
-            tournament_id = len(active_tournaments) + 1
-            active_tournaments[tournament_id] = tournament_data
-            save_tournaments()  # Save after creating new tournament
+            await tournament_store.create(
+                self.tournament_name.value, self.tournament_format.value, max_players
+            )
 
             await interaction.response.send_message(
                 f"Tournament '{self.tournament_name.value}' created! Players can join by using `!join {self.tournament_name.value}`"
@@ -130,22 +167,25 @@ class TournamentMatchModal(discord.ui.Modal, title="Tournament Match Report"):
     )
 
     def __init__(
-        self, tournament_id: int, match_id: int, is_winner: bool, tournament_name: str
+        self,
+        tournament_id: int,
+        match_id: int,
+        is_winner: bool,
+        tournament_name: str,
+        view: discord.ui.View = None,
     ):
         super().__init__()
         self.tournament_id = tournament_id
         self.match_id = match_id
         self.is_winner = is_winner
         self.tournament_name = tournament_name
+        self.view = view
 
     async def on_submit(self, interaction: discord.Interaction):
         await interaction.response.defer()
 
-        # Get the tournament and match data
-        tournament = active_tournaments.get(self.tournament_id)
-        match = next(
-            (m for m in tournament["matches"] if m["id"] == self.match_id), None
-        )
+        # Get the match data
+        match = tournament_store.get_match(self.tournament_id, self.match_id)
 
         # Record match details
         curiosa_link = (
@@ -157,35 +197,48 @@ class TournamentMatchModal(discord.ui.Modal, title="Tournament Match Report"):
             int(self.match_time.value) if self.match_time.value.isdigit() else 0
         )
 
-        # Update match with winner
-        if self.is_winner:
-            match["winner"] = interaction.user.id
-        else:
-            opponent_id = (
-                match["player2"]
-                if interaction.user.id == match["player1"]
-                else match["player1"]
-            )
-            match["winner"] = opponent_id
-
-        match["status"] = "completed"
-        match["details"] = {
-            "curiosa_url": curiosa_link,
-            "first_player": first_player,
-            "match_time": match_time,
-            "match_comment": match_comment,
-            "reported_by": interaction.user.id,
-        }
-        save_tournaments()
-
-        # Get opponent name for the database record
+        # Get opponent, who is the winner if the reporter lost
         opponent_id = (
             match["player2"]
             if interaction.user.id == match["player1"]
             else match["player1"]
         )
+        winner_id = interaction.user.id if self.is_winner else opponent_id
+
+        cog = interaction.client.get_cog("TournamentCog")
+        reported, ready, champion = await cog.report_result(
+            self.tournament_id,
+            self.match_id,
+            winner_id,
+            {
+                "curiosa_url": curiosa_link,
+                "first_player": first_player,
+                "match_time": match_time,
+                "match_comment": match_comment,
+                "reported_by": interaction.user.id,
+            },
+        )
+        if reported is None:
+            await interaction.followup.send(
+                "This match has already been reported!", ephemeral=True
+            )
+            return
+
+        # Disable both buttons now that a result is in
+        if self.view is not None and interaction.message:
+            self.view.disabled = True
+            for child in self.view.children:
+                child.disabled = True
+            try:
+                await interaction.message.edit(view=self.view)
+            except discord.NotFound:
+                pass
+
+        # Get opponent name for the database record
         try:
-            opponent = await interaction.client.fetch_user(opponent_id)
+            opponent = await get_user_resolver(interaction.client).resolve(
+                opponent_id, interaction.guild
+            )
             opponent_name = opponent.global_name or opponent.name
         except Exception as e:
             logger.warning(
@@ -196,7 +249,7 @@ class TournamentMatchModal(discord.ui.Modal, title="Tournament Match Report"):
         # Save to solo_match_reports table
         from utils.database import solo_match_report
 
-        solo_match_report(
+        await solo_match_report(
             reporter_id=interaction.user.id,
             reporter_global=interaction.user.global_name or interaction.user.name,
             opponent_name=opponent_name,
@@ -214,6 +267,14 @@ class TournamentMatchModal(discord.ui.Modal, title="Tournament Match Report"):
             ephemeral=True,
         )
 
+        await cog.announce_progress(
+            interaction.channel,
+            interaction.guild,
+            tournament_store.get(self.tournament_id),
+            ready,
+            champion,
+        )
+
 
 class MatchReportButton(discord.ui.View):
     def __init__(self, tournament_id: int, match_id: int, user_id: int):
@@ -242,280 +303,64 @@ class MatchReportButton(discord.ui.View):
         except discord.NotFound:
             pass
 
-    @discord.ui.button(label="I Won! 🏆", style=discord.ButtonStyle.green)
-    async def report_win(
-        self, interaction: discord.Interaction, button: discord.ui.Button
-    ):
+    async def open_report(self, interaction: discord.Interaction, is_winner: bool):
+        """Check the match can still be reported, then ask for the details."""
+        logger.info(
+            f"{'Win' if is_winner else 'Loss'} button clicked by "
+            f"{interaction.user.name} (ID: {interaction.user.id}) for "
+            f"tournament {self.tournament_id}, match {self.match_id}"
+        )
         if self.disabled:
             await interaction.response.send_message(
                 "This match has already been reported!", ephemeral=True
             )
             return
 
-        tournament = active_tournaments.get(self.tournament_id)
+        tournament = tournament_store.get(self.tournament_id)
         if not tournament:
             await interaction.response.send_message(
                 "Tournament not found!", ephemeral=True
             )
             return
 
-        match = next(
-            (m for m in tournament["matches"] if m["id"] == self.match_id), None
-        )
-        if not match or match["status"] == "completed":
+        match = tournament_store.get_match(self.tournament_id, self.match_id)
+        if not match or match["status"] != "pending":
             await interaction.response.send_message(
                 "Match not found or already completed!", ephemeral=True
             )
             return
 
-        # Send modal for detailed match report
-        await interaction.response.send_modal(
-            TournamentMatchModal(
-                tournament_id=self.tournament_id,
-                match_id=self.match_id,
-                is_winner=True,
-                tournament_name=tournament["name"],
-            )
-        )
-
-        logger.info(
-            f"Win button clicked by {interaction.user.name} (ID: {interaction.user.id})"
-        )
-        logger.info(f"Tournament ID: {self.tournament_id}, Match ID: {self.match_id}")
-
-        tournament = active_tournaments.get(self.tournament_id)
-        if not tournament:
-            logger.error(
-                f"Tournament {self.tournament_id} not found in active tournaments"
-            )
-            await interaction.response.send_message(
-                "Tournament not found!", ephemeral=True
-            )
-            return
-
-        match = next(
-            (m for m in tournament["matches"] if m["id"] == self.match_id), None
-        )
-        if not match:
-            logger.error(
-                f"Match {self.match_id} not found in tournament {self.tournament_id}"
-            )
-            await interaction.response.send_message("Match not found!", ephemeral=True)
-            return
-
-        if match["status"] == "completed":
-            await interaction.response.send_message(
-                "This match has already been reported!", ephemeral=True
-            )
-            return
-
-        logger.info(
-            f"Match found - Round: {match['round']}, Players: {match['player1']} vs {match['player2']}"
-        )
-        if interaction.user.id not in [match["player1"], match["player2"]]:
+        if interaction.user.id not in (match["player1"], match["player2"]):
             logger.warning(
-                f"Unauthorized win report attempt by {interaction.user.id} for match {self.match_id}"
+                f"Unauthorized report attempt by {interaction.user.id} for match {self.match_id}"
             )
             await interaction.response.send_message(
                 "You are not part of this match!", ephemeral=True
             )
             return
 
-        # Update match with winner
-        match["winner"] = interaction.user.id
-        match["status"] = "completed"
-        save_tournaments()
-
-        # Get opponent for the announcement
-        opponent_id = (
-            match["player2"]
-            if interaction.user.id == match["player1"]
-            else match["player1"]
-        )
-        try:
-            opponent = await interaction.client.fetch_user(opponent_id)
-            victory_message = f"Victory recorded for {interaction.user.mention} against {opponent.mention} in round {match['round']}!"
-        except discord.NotFound:
-            victory_message = f"Victory recorded for {interaction.user.name}!"
-
-        # Update the bracket display
-        try:
-            cog = interaction.client.get_cog("TournamentCog")
-            if cog:
-                logger.info("Generating updated bracket display")
-                bracket_display = await cog.generate_bracket_display(tournament)
-                if interaction.message:
-                    await interaction.message.edit(content=bracket_display)
-                    logger.info("Successfully updated bracket display")
-                else:
-                    logger.warning(
-                        "Could not update bracket - interaction message not found"
-                    )
-            else:
-                logger.error("TournamentCog not found - cannot update bracket display")
-        except Exception as e:
-            logger.error(f"Error updating bracket display: {str(e)}")
-
-        # Check if the round is complete and create next round matches if needed
-        current_round = match["round"]
-        round_matches = [
-            m for m in tournament["matches"] if m["round"] == current_round
-        ]
-        all_completed = all(m["status"] == "completed" for m in round_matches)
-
-        if all_completed:
-            winners_count = len([m for m in round_matches if m["winner"] is not None])
-            if winners_count >= 2:  # Need at least 2 winners to create a new match
-                cog = interaction.client.get_cog("TournamentCog")
-                if cog:
-                    new_matches = await cog.create_next_round_match(
-                        tournament, round_matches
-                    )
-                    if new_matches:
-                        victory_message += (
-                            "\n\nNext round matches have been created! Use `!bracket"
-                            + f" {tournament['name']}`"
-                            + " to view the updated bracket."
-                        )
-
-        # Disable both buttons after a result is reported
-        self.disabled = True
-        for child in self.children:
-            child.disabled = True
-        await interaction.message.edit(view=self)
-
-        await interaction.response.send_message(victory_message)
-
-    @discord.ui.button(label="I Lost 😢", style=discord.ButtonStyle.red)
-    async def report_loss(
-        self, interaction: discord.Interaction, button: discord.ui.Button
-    ):
-        if self.disabled:
-            await interaction.response.send_message(
-                "This match has already been reported!", ephemeral=True
-            )
-            return
-
-        tournament = active_tournaments.get(self.tournament_id)
-        if not tournament:
-            await interaction.response.send_message(
-                "Tournament not found!", ephemeral=True
-            )
-            return
-
-        match = next(
-            (m for m in tournament["matches"] if m["id"] == self.match_id), None
-        )
-        if not match or match["status"] == "completed":
-            await interaction.response.send_message(
-                "Match not found or already completed!", ephemeral=True
-            )
-            return
-
-        # Send modal for detailed match report
+        # The result is recorded when the modal is submitted
         await interaction.response.send_modal(
             TournamentMatchModal(
                 tournament_id=self.tournament_id,
                 match_id=self.match_id,
-                is_winner=False,
+                is_winner=is_winner,
                 tournament_name=tournament["name"],
+                view=self,
             )
         )
 
-        logger.info(
-            f"Loss button clicked by {interaction.user.name} (ID: {interaction.user.id})"
-        )
-        logger.info(f"Tournament ID: {self.tournament_id}, Match ID: {self.match_id}")
-
-        tournament = active_tournaments.get(self.tournament_id)
-        if not tournament:
-            logger.error(
-                f"Tournament {self.tournament_id} not found in active tournaments"
-            )
-            await interaction.response.send_message(
-                "Tournament not found!", ephemeral=True
-            )
-            return
-
-        match = next(
-            (m for m in tournament["matches"] if m["id"] == self.match_id), None
-        )
-        if not match:
-            logger.error(
-                f"Match {self.match_id} not found in tournament {self.tournament_id}"
-            )
-            await interaction.response.send_message("Match not found!", ephemeral=True)
-            return
-
-        if match["status"] == "completed":
-            await interaction.response.send_message(
-                "This match has already been reported!", ephemeral=True
-            )
-            return
-
-        # Get opponent as the winner
-        opponent_id = (
-            match["player2"]
-            if interaction.user.id == match["player1"]
-            else match["player1"]
-        )
-        match["winner"] = opponent_id
-        match["status"] = "completed"
-        save_tournaments()
-
-        try:
-            opponent = await interaction.client.fetch_user(opponent_id)
-            loss_message = f"Match result recorded: {opponent.mention} won against {interaction.user.mention} in round {match['round']}!"
-        except discord.NotFound:
-            loss_message = f"Match result recorded: You lost in round {match['round']}!"
-
-        # Update the bracket display
-        try:
-            cog = interaction.client.get_cog("TournamentCog")
-            if cog:
-                logger.info("Generating updated bracket display")
-                bracket_display = await cog.generate_bracket_display(tournament)
-                if interaction.message:
-                    await interaction.message.edit(content=bracket_display)
-                    logger.info("Successfully updated bracket display")
-                else:
-                    logger.warning(
-                        "Could not update bracket - interaction message not found"
-                    )
-            else:
-                logger.error("TournamentCog not found - cannot update bracket display")
-        except Exception as e:
-            logger.error(f"Error updating bracket display: {str(e)}")
-
-        # Check if the round is complete and create next round matches if needed
-        current_round = match["round"]
-        round_matches = [
-            m for m in tournament["matches"] if m["round"] == current_round
-        ]
-        all_completed = all(m["status"] == "completed" for m in round_matches)
-
-        if all_completed:
-            winners_count = len([m for m in round_matches if m["winner"] is not None])
-            if winners_count >= 2:  # Need at least 2 winners to create a new match
-                cog = interaction.client.get_cog("TournamentCog")
-                if cog:
-                    new_matches = await cog.create_next_round_match(
-                        tournament, round_matches
-                    )
-                    if new_matches:
-                        loss_message += (
-                            "\n\nNext round matches have been created! Use `!bracket"
-                            + f" {tournament['name']}`"
-                            + " to view the updated bracket."
-                        )
-
-        # Disable both buttons after a result is reported
-        self.disabled = True
-        for child in self.children:
-            child.disabled = True
-        await interaction.message.edit(view=self)
+    @discord.ui.button(label="I Won! 🏆", style=discord.ButtonStyle.green)
+    async def report_win(
+        self, interaction: discord.Interaction, button: discord.ui.Button
+    ):
+        await self.open_report(interaction, is_winner=True)
 
-        await interaction.response.send_message(loss_message)
+    @discord.ui.button(label="I Lost 😢", style=discord.ButtonStyle.red)
+    async def report_loss(
+        self, interaction: discord.Interaction, button: discord.ui.Button
+    ):
+        await self.open_report(interaction, is_winner=False)
 
 
 class CreateTournamentButton(discord.ui.View):
@@ -534,141 +379,190 @@ class CreateTournamentButton(discord.ui.View):
 class TournamentCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        # Load existing tournaments when the cog is initialized
-        load_tournaments()
+        self.users = get_user_resolver(bot)
+        # tournament_id -> (version, rendered bracket embed)
+        self._brackets: OrderedDict[int, tuple[int, discord.Embed]] = OrderedDict()
+
+    async def pick_tournament(
+        self, ctx, tournament_name, statuses=("registration", "in_progress")
+    ):
+        """
+        Work out which tournament a command is about.
+
+        Uses ``tournament_name`` when given. Otherwise picks the caller's own
+        tournament, or the only one running, among those in ``statuses``, and
+        asks for a name when that is ambiguous.
+        """
+        if tournament_name:
+            tournament_id, tournament = tournament_store.find_by_name(tournament_name)
+            if not tournament:
+                await ctx.send(
+                    "Tournament not found! Please check the exact tournament name."
+                )
+            return tournament_id, tournament
+
+        mine = [
+            t
+            for t in tournament_store.player_tournaments(ctx.author.id)
+            if t["status"] in statuses
+        ]
+        candidates = mine or [
+            t for t in tournament_store.unfinished() if t["status"] in statuses
+        ]
+        if len(candidates) == 1:
+            return candidates[0]["id"], candidates[0]
+
+        if not candidates:
+            await ctx.send("There are no matching tournaments right now.")
+        else:
+            names = ", ".join(f"`{t['name']}`" for t in candidates)
+            await ctx.send(f"Which tournament? Add its name to the command: {names}")
+        return None, None
 
     @commands.command()
     @commands.has_permissions(administrator=True)
     async def create_tournament(self, ctx):
         """Create a new tournament (Admin only)"""
-        # Clear existing tournaments
-        global active_tournaments
-        active_tournaments.clear()
-        save_tournaments()
-
         view = CreateTournamentButton()
         await ctx.send(
-            "Previous tournament cleared. Click the button below to create a new tournament:",
+            "Click the button below to create a new tournament:",
             view=view,
         )
 
     @commands.command()
-    async def join(self, ctx, *, tournament_name: str):
+    async def join(self, ctx, *, tournament_name: str = None):
         """Join a tournament by name"""
-        tournament_id, tournament = find_tournament_by_name(tournament_name)
+        tournament_id, tournament = await self.pick_tournament(
+            ctx, tournament_name, statuses=("registration",)
+        )
         if not tournament:
-            await ctx.send(
-                "Tournament not found! Please check the exact tournament name."
-            )
             return
 
-        if tournament["status"] != "registration":
-            await ctx.send("Tournament is not accepting registrations!")
-            return
+        async with tournament_store.lock(tournament_id):
+            if tournament["status"] != "registration":
+                await ctx.send("Tournament is not accepting registrations!")
+                return
 
-        if len(tournament["players"]) >= tournament["max_players"]:
-            await ctx.send("Tournament is full!")
-            return
+            if len(tournament["players"]) >= tournament["max_players"]:
+                await ctx.send("Tournament is full!")
+                return
 
-        if ctx.author.id in tournament["players"]:
-            await ctx.send("You are already registered!")
-            return
+            if ctx.author.id in tournament["players"]:
+                await ctx.send("You are already registered!")
+                return
 
-        tournament["players"].append(ctx.author.id)
-        save_tournaments()  # Save after adding player
+            await tournament_store.add_player(tournament_id, ctx.author.id)
         await ctx.send(
             f"You have joined {tournament['name']}! ({len(tournament['players'])}/{tournament['max_players']} players)"
         )
 
     @commands.command()
     @commands.has_permissions(administrator=True)
-    async def start_tournament(self, ctx, *, tournament_name: str):
+    async def start_tournament(self, ctx, *, tournament_name: str = None):
         """Start a tournament by name (Admin only)"""
+        tournament_id = None
         try:
             logger.info(
                 f"Attempting to start tournament '{tournament_name}' by {ctx.author}"
             )
 
-            tournament_id, tournament = find_tournament_by_name(tournament_name)
+            tournament_id, tournament = await self.pick_tournament(
+                ctx, tournament_name, statuses=("registration",)
+            )
             if not tournament:
                 logger.warning(
                     f"Tournament '{tournament_name}' not found when attempted to start by {ctx.author}"
                 )
-                await ctx.send(
-                    "Tournament not found! Please check the exact tournament name."
-                )
                 return
 
-            tournament = active_tournaments[tournament_id]
-            if tournament["status"] != "registration":
-                logger.warning(
-                    f"Tournament {tournament_id} already started when attempted by {ctx.author}"
-                )
-                await ctx.send("Tournament has already started!")
-                return
-
-            if len(tournament["players"]) < 2:
-                logger.warning(
-                    f"Tournament {tournament_id} has insufficient players ({len(tournament['players'])}) when start attempted by {ctx.author}"
-                )
-                await ctx.send("Not enough players to start tournament!")
-                return
-
-            # Generate first round matches
-            import random
-
-            players = tournament["players"].copy()
-            random.shuffle(players)
-            logger.info(
-                f"Generated matchups for tournament {tournament_id} with {len(players)} players"
-            )
+            async with tournament_store.lock(tournament_id):
+                if tournament["status"] != "registration":
+                    logger.warning(
+                        f"Tournament {tournament_id} already started when attempted by {ctx.author}"
+                    )
+                    await ctx.send("Tournament has already started!")
+                    return
 
-            matches = []
-            for i in range(0, len(players), 2):
-                if i + 1 < len(players):
-                    matches.append(
-                        {
-                            "id": len(matches) + 1,
-                            "round": 1,
-                            "player1": players[i],
-                            "player2": players[i + 1],
-                            "winner": None,
-                            "status": "pending",
-                        }
+                if len(tournament["players"]) < 2:
+                    logger.warning(
+                        f"Tournament {tournament_id} has insufficient players ({len(tournament['players'])}) when start attempted by {ctx.author}"
+                    )
+                    await ctx.send("Not enough players to start tournament!")
+                    return
+
+                # Generate first round matches; elimination brackets are seeded
+                # by Elo and laid out in full, with byes for the top seeds
+                players = tournament["players"].copy()
+                seeds = {}
+                if is_swiss(tournament):
+                    pairs, bye = pair_round(players, [])
+                    matches = build_round(1, pairs, bye)
+                else:
+                    players = seed_players(players)
+                    seeds = {player: seed for seed, player in enumerate(players, 1)}
+                    matches = build_bracket(
+                        players, tournament_store.reserve_match_ids(len(players) - 1)
                     )
+                logger.info(
+                    f"Generated matchups for tournament {tournament_id} with {len(players)} players"
+                )
 
-            tournament["matches"] = matches
-            tournament["status"] = "in_progress"
-            save_tournaments()  # Save after starting tournament
+                await tournament_store.add_matches(tournament_id, matches)
+                await tournament_store.set_status(tournament_id, "in_progress")
             logger.info(
                 f"Created {len(matches)} matches for tournament {tournament_id}"
             )
 
-            # Send match notifications
-            for match in matches:
-                try:
-                    player1 = await self.bot.fetch_user(match["player1"])
-                    player2 = await self.bot.fetch_user(match["player2"])
+            # Send match notifications: one channel post per 2000 characters
+            # and a queued DM to each player
+            users = await self.users.resolve_many(players, ctx.guild)
 
-                    match_msg = f"Round 1 Match: {player1.mention} vs {player2.mention}\nUse `!my_round` to view your match and report your win!"
-                    await ctx.send(match_msg)
-                    logger.info(
-                        f"Sent match notification for match {match['id']} in tournament {tournament_id}"
+            def seeded(user):
+                return f"{user.mention} (#{seeds[user.id]})" if seeds else user.mention
+
+            lines = []
+            first_round = set(match_player_ids(m for m in matches if m["round"] == 1))
+            for player_id in players:
+                if seeds and player_id not in first_round and player_id in users:
+                    lines.append(
+                        f"Round 1 Bye: {seeded(users[player_id])} goes straight "
+                        "to round 2"
                     )
-                except discord.NotFound:
+            for match in matches:
+                if match["status"] == "waiting":
+                    continue
+                player1 = users.get(match["player1"])
+                player2 = users.get(match["player2"])
+                if player1 and is_bye(match):
+                    lines.append(f"Round 1 Bye: {player1.mention} gets a free win")
+                    continue
+                if not player1 or not player2:
                     logger.error(
                         f"Failed to fetch user for match {match['id']} in tournament {tournament_id}"
                     )
-                    await ctx.send(
+                    lines.append(
                         f"Error: Could not fetch user information for match {match['id']}"
                     )
-                except Exception as e:
-                    logger.error(
-                        f"Error sending match notification for match {match['id']} in tournament {tournament_id}: {str(e)}"
-                    )
-                    await ctx.send(
-                        f"Error sending match notification for match {match['id']}"
+                    continue
+
+                lines.append(
+                    f"Round {match['round']} Match: {seeded(player1)} vs "
+                    f"{seeded(player2)}"
+                )
+                for player, opponent in ((player1, player2), (player2, player1)):
+                    outbound.send(
+                        player,
+                        f"{tournament['name']} has started! Your Round "
+                        f"{match['round']} opponent is {opponent.mention}. "
+                        "Use `!my_round` to report your result.",
                     )
+            lines.append("Use `!my_round` to view your match and report your win!")
+
+            for message in pack_messages(lines):
+                await ctx.send(message)
+            logger.info(
+                f"Sent {len(matches)} match notifications for tournament {tournament_id}"
+            )
 
             logger.info(f"Successfully started tournament {tournament_id}")
 
@@ -680,136 +574,125 @@ class TournamentCog(commands.Cog):
                 "An error occurred while starting the tournament. Please check the logs or contact an administrator."
             )
 
-    @commands.command()
-    async def create_next_round_match(self, tournament, prev_round_matches):
-        """Create matches for the next round based on winners"""
-        next_round = prev_round_matches[0]["round"] + 1
-        winners = []
-
-        # Get winners from the previous round in order
-        for match in sorted(prev_round_matches, key=lambda m: m["id"]):
-            if match["winner"] is not None:
-                winners.append(match["winner"])
-
-        # Create new matches pairing winners
-        new_matches = []
-        for i in range(0, len(winners), 2):
-            if i + 1 < len(winners):
-                match_id = len(tournament["matches"]) + 1
-                new_matches.append(
-                    {
-                        "id": match_id,
-                        "round": next_round,
-                        "player1": winners[i],
-                        "player2": winners[i + 1],
-                        "winner": None,
-                        "status": "pending",
-                    }
-                )
-
-        if new_matches:
-            tournament["matches"].extend(new_matches)
-            save_tournaments()
-            return new_matches
-        return []
-
-    @commands.command()
-    async def check_round_completion(self, ctx, *, tournament_name: str):
-        """Check if a round is complete and create next round if needed"""
-        # Find the tournament
-        tournament_id, tournament = find_tournament_by_name(tournament_name)
-        if not tournament:
-            await ctx.send(
-                "Tournament not found! Please check the exact tournament name."
+    def plan_next_round(self, tournament, match, winner):
+        """
+        What finishing the last open match of a round leads to, worked out
+        before the result is saved so both go into one transaction.
+
+        Returns:
+            tuple: (new matches for the next round, champion or None)
+        """
+        round_num = match["round"]
+        players = tournament["players"]
+        if is_swiss(tournament):
+            results = swiss_results(tournament) + [
+                (match["player1"], match["player2"], winner)
+            ]
+            if round_num >= swiss_rounds(len(players)):
+                table = standings(players, results)
+                return [], table[0]["player"] if table else None
+            pairs, bye = pair_round(players, results)
+            return build_round(round_num + 1, pairs, bye), None
+
+        if match.get("next_match_id") is not None:
+            return [], None  # complete_match moves the winner on
+
+        # The final, or a round of a bracket created round by round
+        winners = [
+            winner if m is match else m["winner"]
+            for m in tournament_store.round_matches(tournament["id"], round_num)
+        ]
+        if len(winners) == 1:
+            return [], winner
+        return build_round(round_num + 1, zip(winners[::2], winners[1::2])), None
+
+    async def report_result(self, tournament_id, match_id, winner, details=None):
+        """
+        Record a match result and move the tournament along.
+
+        Each round keeps a count of its open matches, so only the report that
+        closes a round creates the next one (or crowns the champion).
+
+        Returns:
+            tuple: (the match or None if it was already reported, matches that
+            became playable, champion or None)
+        """
+        async with tournament_store.lock(tournament_id):
+            tournament = tournament_store.get(tournament_id)
+            match = tournament_store.get_match(tournament_id, match_id)
+            if match is None or match["status"] != "pending":
+                return None, [], None
+
+            next_round, champion = [], None
+            if tournament_store.open_matches(tournament_id, match["round"]) == 1:
+                next_round, champion = self.plan_next_round(tournament, match, winner)
+            await tournament_store.complete_match(
+                tournament_id,
+                match_id,
+                winner,
+                details,
+                next_round=next_round,
+                champion=champion,
             )
-            return
 
-        # Get current round (highest round number with pending matches)
-        current_round = max(
-            (m["round"] for m in tournament["matches"] if m["status"] == "pending"),
-            default=1,
+        ready = [m for m in next_round if m["status"] == "pending"]
+        next_match = next_match_ready(tournament_id, match)
+        if next_match is not None:
+            ready.append(next_match)
+        logger.info(
+            f"Match {match_id} of tournament {tournament_id} won by {winner}; "
+            f"{len(ready)} match(es) ready"
         )
+        return match, ready, champion
 
-        # Get matches for the current round
-        round_matches = [
-            m for m in tournament["matches"] if m["round"] == current_round
-        ]
-
-        if not round_matches:
-            await ctx.send(
-                f"No matches found for round {current_round} in tournament {tournament_name}."
-            )
+    async def announce_progress(self, channel, guild, tournament, ready, champion):
+        """Post newly playable matches (and DM their players) or the champion."""
+        if champion is not None:
+            try:
+                winner = await self.users.resolve(champion, guild)
+            except discord.NotFound:
+                await channel.send(f"🏆 {tournament['name']} is complete!")
+                return
+            await channel.send(embed=champion_embed(tournament, winner))
+            return
+        if not ready:
             return
 
-        # Count completed and pending matches
-        completed_matches = [m for m in round_matches if m["status"] == "completed"]
-        pending_matches = [m for m in round_matches if m["status"] == "pending"]
-
-        # Create status message
-        status_msg = f"**Round {current_round} Status for {tournament_name}**\n"
-        status_msg += f"Total Matches: {len(round_matches)}\n"
-        status_msg += f"Completed: {len(completed_matches)}/{len(round_matches)}\n"
-        status_msg += f"Pending: {len(pending_matches)}/{len(round_matches)}\n\n"
-
-        # Add details about pending matches
-        if pending_matches:
-            status_msg += "**Pending Matches:**\n"
-            for match in pending_matches:
-                try:
-                    player1 = await ctx.bot.fetch_user(match["player1"])
-                    player2 = await ctx.bot.fetch_user(match["player2"])
-                    status_msg += f"• {player1.name} vs {player2.name}\n"
-                except discord.NotFound:
-                    status_msg += "• Unknown Players\n"
-
-        all_completed = len(pending_matches) == 0
-        if all_completed and len(round_matches) >= 2:
-            # Create next round matches
-            new_matches = await self.create_next_round_match(tournament, round_matches)
-            if new_matches:
-                status_msg += f"\n✅ Round {current_round} is complete! Next round matches have been created."
-            else:
-                status_msg += f"\n✅ Round {current_round} is complete!"
-        elif all_completed:
-            status_msg += f"\n🏆 Tournament complete! Use `!complete_tournament {tournament_name}` to finalize."
-        else:
-            status_msg += "\n⏳ Waiting for remaining matches to complete."
-
-        await ctx.send(status_msg)
+        users = await self.users.resolve_many(match_player_ids(ready), guild)
+        lines = []
+        for match in ready:
+            player1 = users.get(match["player1"])
+            player2 = users.get(match["player2"])
+            if player1 and is_bye(match):
+                lines.append(
+                    f"Round {match['round']} Bye: {player1.mention} gets a free win"
+                )
+                continue
+            if not player1 or not player2:
+                continue
+            lines.append(
+                f"Round {match['round']} Match: {player1.mention} vs {player2.mention}"
+            )
+            for player, opponent in ((player1, player2), (player2, player1)):
+                outbound.send(
+                    player,
+                    f"Your {tournament['name']} Round {match['round']} opponent is "
+                    f"{opponent.mention}. Use `!my_round` to report your result.",
+                )
+        lines.append("Use `!my_round` to view your match and report your win!")
+        for message in pack_messages(lines):
+            await channel.send(message)
 
     @commands.command()
     async def my_round(self, ctx):
         """View your current match and report your win"""
         # Find the player's current active match across all tournaments
-        player_match = None
-        print("Checking active tournaments for player match...")
-
-        for tournament in active_tournaments.values():
-            if tournament["status"] != "in_progress":
-                continue
-
-            for match in tournament["matches"]:
-                if match["status"] == "pending" and ctx.author.id in [
-                    match["player1"],
-                    match["player2"],
-                ]:
-                    player_match = match
-                    pass  # Tournament found, continue with the code below
-                    break
-            if player_match:
-                break
+        tournament_id, player_match = tournament_store.active_match(ctx.author.id)
 
         if not player_match:
             await ctx.send("You don't have any active matches at the moment!")
             return
 
-        # Find the tournament this match belongs to
-        tournament_id = None
-        for t_id, tournament in active_tournaments.items():
-            if any(m["id"] == player_match["id"] for m in tournament["matches"]):
-                tournament_id = t_id
-                break
-
         if player_match["status"] == "completed":
             await ctx.send("This match has already been completed!")
             return
@@ -820,7 +703,7 @@ class TournamentCog(commands.Cog):
             if ctx.author.id == player_match["player1"]
             else player_match["player1"]
         )
-        opponent = await self.bot.fetch_user(opponent_id)
+        opponent = await self.users.resolve(opponent_id, ctx.guild)
 
         # Create an embed to display the match
         embed = discord.Embed(
@@ -839,12 +722,19 @@ class TournamentCog(commands.Cog):
         # Return to let the button handle the win reporting
         return
 
-    @commands.command()
-    async def find_tournament_winner(self, tournament):
+    def find_tournament_winner(self, tournament):
         """Helper method to find the winner of a tournament"""
         if not tournament["matches"]:
             return None
 
+        if is_swiss(tournament):
+            # Swiss ends after a fixed number of rounds; top of the standings wins
+            max_round = max(match["round"] for match in tournament["matches"])
+            if max_round < swiss_rounds(len(tournament["players"])):
+                return None
+            table = standings(tournament["players"], swiss_results(tournament))
+            return table[0]["player"] if table else None
+
         # Get matches from the last round
         max_round = max(match["round"] for match in tournament["matches"])
         final_matches = [m for m in tournament["matches"] if m["round"] == max_round]
@@ -860,13 +750,16 @@ class TournamentCog(commands.Cog):
 
     @commands.command()
     @commands.has_permissions(administrator=True)
-    async def complete_tournament(self, ctx, *, tournament_name: str):
-        """Complete a tournament and announce the winner (Admin only)"""
-        tournament_id, tournament = find_tournament_by_name(tournament_name)
+    async def complete_tournament(self, ctx, *, tournament_name: str = None):
+        """Complete a tournament and announce the winner (Admin only)
+
+        Tournaments finish by themselves when the last match is reported;
+        this is for ones that didn't (e.g. started before that was the case).
+        """
+        tournament_id, tournament = await self.pick_tournament(
+            ctx, tournament_name, statuses=("in_progress",)
+        )
         if not tournament:
-            await ctx.send(
-                "Tournament not found! Please check the exact tournament name."
-            )
             return
 
         if tournament["status"] != "in_progress":
@@ -887,15 +780,18 @@ class TournamentCog(commands.Cog):
                 rounds_pending[round_num].append(match)
 
             # Create detailed message about pending matches
+            users = await self.users.resolve_many(
+                match_player_ids(incomplete_matches), ctx.guild
+            )
             pending_details = []
             for round_num, matches in sorted(rounds_pending.items()):
                 match_details = []
                 for match in matches:
-                    try:
-                        player1 = await self.bot.fetch_user(match["player1"])
-                        player2 = await self.bot.fetch_user(match["player2"])
+                    player1 = users.get(match["player1"])
+                    player2 = users.get(match["player2"])
+                    if player1 and player2:
                         match_details.append(f"{player1.name} vs {player2.name}")
-                    except discord.NotFound:
+                    else:
                         match_details.append("Unknown Players")
 
                 pending_details.append(
@@ -909,33 +805,18 @@ class TournamentCog(commands.Cog):
             return
 
         # Find the winner
-        winner_id = await self.find_tournament_winner(tournament)
+        winner_id = self.find_tournament_winner(tournament)
         if not winner_id:
             await ctx.send("Error: Could not determine tournament winner!")
             return
 
         try:
-            winner = await self.bot.fetch_user(winner_id)
+            winner = await self.users.resolve(winner_id, ctx.guild)
 
             # Update tournament status
-            tournament["status"] = "completed"
-            tournament["winner"] = winner_id
-            save_tournaments()
-
-            # Create winner announcement embed
-            embed = discord.Embed(
-                title=f"🏆 Tournament Complete: {tournament['name']}",
-                description=f"Congratulations to our champion: {winner.mention}!",
-                color=discord.Color.gold(),
-            )
+            await tournament_store.set_status(tournament_id, "completed", winner_id)
 
-            embed.add_field(
-                name="Tournament Stats",
-                value=f"Total Players: {len(tournament['matches'])}\nTotal Matches: {len(tournament['matches'])}",
-                inline=False,
-            )
-
-            await ctx.send(embed=embed)
+            await ctx.send(embed=champion_embed(tournament, winner))
 
         except discord.NotFound:
             await ctx.send("Error: Could not fetch winner information!")
@@ -944,26 +825,42 @@ class TournamentCog(commands.Cog):
             await ctx.send("An error occurred while completing the tournament.")
 
     @commands.command()
-    async def bracket(self, ctx, *, tournament_name: str):
+    async def bracket(self, ctx, *, tournament_name: str = None):
         """View the current tournament bracket in a visual format"""
-        tournament_id, tournament = find_tournament_by_name(tournament_name)
+        tournament_id, tournament = await self.pick_tournament(ctx, tournament_name)
         if not tournament:
-            await ctx.send(
-                "Tournament not found! Please check the exact tournament name."
-            )
             return
 
+        # Rendered once per tournament version; any change bumps the version
+        version = tournament_store.version(tournament_id)
+        cached = self._brackets.get(tournament_id)
+        if cached is None or cached[0] != version:
+            cached = (version, await self.render_bracket(tournament, ctx.guild))
+            self._brackets[tournament_id] = cached
+        self._brackets.move_to_end(tournament_id)
+        while len(self._brackets) > BRACKET_CACHE_SIZE:
+            self._brackets.popitem(last=False)
+        await ctx.send(embed=cached[1])
+
+    async def render_bracket(self, tournament, guild) -> discord.Embed:
+        """Build the ``!bracket`` embed for a tournament."""
         # Prepare description with winner if tournament is completed
         description = f"Status: {tournament['status']}\n"
         description += (
             f"Players: {len(tournament['players'])}/{tournament['max_players']}"
         )
 
+        # One batch of lookups for every name on the page
+        users = await self.users.resolve_many(
+            tournament["players"] + match_player_ids(tournament["matches"]),
+            guild,
+        )
+
         if tournament["status"] == "completed" and tournament.get("winner"):
-            try:
-                winner = await self.bot.fetch_user(tournament["winner"])
+            winner = users.get(tournament["winner"])
+            if winner:
                 description += f"\n🏆 Champion: {winner.name}"
-            except discord.NotFound:
+            else:
                 description += "\n🏆 Champion: Unknown"
 
         embed = discord.Embed(
@@ -977,10 +874,10 @@ class TournamentCog(commands.Cog):
         # Add list of registered players
         registered_players = []
         for player_id in tournament['players']:
-            try:
-                player = await self.bot.fetch_user(player_id)
+            player = users.get(player_id)
+            if player:
                 registered_players.append(player.name)
-            except discord.NotFound:
+            else:
                 registered_players.append(f"Unknown Player ({player_id})")
 
         # Sort players alphabetically
@@ -1019,8 +916,7 @@ class TournamentCog(commands.Cog):
                 value="No matches have been scheduled yet.",
                 inline=False,
             )
-            await ctx.send(embed=embed)
-            return
+            return embed
 
         # Group matches by round
         matches_by_round = {}
@@ -1039,15 +935,24 @@ class TournamentCog(commands.Cog):
 
             for match in round_matches:
                 try:
-                    player1 = await self.bot.fetch_user(match["player1"])
-                    player2 = await self.bot.fetch_user(match["player2"])
+                    player1 = users.get(match["player1"])
+                    player2 = users.get(match["player2"])
+                    if player1 and is_bye(match):
+                        bracket_lines.append(f"  {player1.name[:20]} - bye")
+                        bracket_lines.append("")
+                        continue
+                    # Empty slots in a precomputed bracket are still to be decided
+                    if (match["player1"] and not player1) or (
+                        match["player2"] and not player2
+                    ):
+                        continue
 
                     # Format player names with status indicators
-                    p1_name = player1.name[:20]  # Truncate long names
-                    p2_name = player2.name[:20]
+                    p1_name = player1.name[:20] if player1 else "TBD"  # Truncate
+                    p2_name = player2.name[:20] if player2 else "TBD"
 
                     if match["winner"] is not None:
-                        if match["winner"] == player1.id:
+                        if match["winner"] == match["player1"]:
                             p1_name = f"✅ {p1_name}"
                             p2_name = f"❌ {p2_name}"
                         else:
@@ -1062,8 +967,6 @@ class TournamentCog(commands.Cog):
                     bracket_lines.append("└─" + "─" * 24 + "┘")
                     bracket_lines.append("")  # Add space between matches
 
-                except discord.NotFound:
-                    continue
                 except Exception as e:
                     logger.error(f"Error displaying match in bracket: {str(e)}")
                     continue
@@ -1074,13 +977,29 @@ class TournamentCog(commands.Cog):
                     name=f"Round {round_num}", value=round_display, inline=False
                 )
 
-        await ctx.send(embed=embed)
+        if is_swiss(tournament):
+            table = standings(tournament["players"], swiss_results(tournament))
+            rows = []
+            for place, row in enumerate(table[:10], start=1):
+                player = users.get(row["player"])
+                name = player.name[:16] if player else str(row["player"])
+                rows.append(
+                    f"{place:>2}. {name:<16} {row['points']:>4g} pts  "
+                    f"Bh {row['buchholz']:g}  OMW {row['omw']:.0%}"
+                )
+            embed.add_field(
+                name="Standings",
+                value="```\n" + "\n".join(rows) + "```",
+                inline=False,
+            )
+
+        return embed
 
     @commands.command()
     @commands.has_permissions(administrator=True)
     async def remove(self, ctx, tournament_name: str, member: discord.Member):
         """Remove a player from a tournament (Admin only)"""
-        tournament_id, tournament = find_tournament_by_name(tournament_name)
+        tournament_id, tournament = tournament_store.find_by_name(tournament_name)
         if not tournament:
             await ctx.send(
                 "Tournament not found! Please check the exact tournament name."
@@ -1096,8 +1015,8 @@ class TournamentCog(commands.Cog):
             return
 
         # Remove the player
-        tournament["players"].remove(member.id)
-        save_tournaments()
+        async with tournament_store.lock(tournament_id):
+            await tournament_store.remove_player(tournament_id, member.id)
 
         await ctx.send(
             f"Successfully removed {member.name} from {tournament['name']}! ({len(tournament['players'])}/{tournament['max_players']} players)"
@@ -1116,7 +1035,7 @@ class TournamentCog(commands.Cog):
         admin_commands = (
             "`!create_tournament` - Create a new tournament (Admin only)\n"
             "`!start_tournament <name>` - Start a tournament with registered players (Admin only)\n"
-            "`!complete_tournament <name>` - Complete and finalize a tournament (Admin only)\n"
+            "`!complete_tournament <name>` - Finalize a tournament by hand; it normally finishes itself after the last match (Admin only)\n"
             "`!remove <name> @user` - Remove a player from a tournament (Admin only)\n"
         )
         embed.add_field(name="🛡️ Admin Commands", value=admin_commands, inline=False)
@@ -1126,6 +1045,8 @@ class TournamentCog(commands.Cog):
             "`!join <tournament_name>` - Join a tournament during registration\n"
             "`!my_round` - View your current match and report results\n"
             "`!bracket <tournament_name>` - View the current tournament bracket\n"
+            "Several tournaments can run at once; the name can be left out when "
+            "you're only in one of them\n"
         )
         embed.add_field(name="👥 Player Commands", value=player_commands, inline=False)
 
@@ -1,9 +1,8 @@
 import discord
 from discord.ext import commands
-import requests
-import json
 import logging
 
+from utils.curiosa import CuriosaError, fetch_deck
 from utils.deck_checker import get_deck_id, find_card
 
 logger = logging.getLogger("discord_bot")
@@ -22,16 +21,21 @@ class DeckCheckModal(discord.ui.Modal, title="Deck Check"):
 
         try:
             deck_id = get_deck_id(deck_url)
-            response = requests.get("https://curiosa.io/api/decks?ids=" + deck_id)
-
-            if response.status_code != 200:
+            try:
+                json_data = await fetch_deck(deck_id)
+            except CuriosaError as e:
                 await interaction.followup.send(
-                    f"Failed to retrieve deck data. Status code: {response.status_code}",
+                    f"Failed to retrieve deck data. Status code: {e.status}",
                     ephemeral=True,
                 )
                 return
 
-            json_data = json.loads(response.text)
+            if json_data is None:
+                await interaction.followup.send(
+                    "Deck not found on Curiosa. Please check the URL.",
+                    ephemeral=True,
+                )
+                return
 
             invalid_cards = find_card(json_data, "Ring of Morrigan")
 
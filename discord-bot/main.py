@@ -10,6 +10,16 @@ from cogs.fun import FunCog
 from cogs.utility import UtilityCog
 from cogs.shop import ShopCog
 from cogs.tournament import TournamentCog
+from utils.curiosa import close_curiosa_client
+from utils.db import close_databases
+from utils.deck_log import migrate_legacy_deck_file
+from utils.flavor import flavor
+from utils.lfg_queue import lfg_queue
+from utils.lfg_watch import lfg_watch
+from utils.migrations import run_migrations
+from utils.outbound import outbound
+from utils.ranking import load_rankings
+from utils.tournaments import tournament_store
 
 load_dotenv()
 TOKEN = os.getenv("TOKEN")
@@ -92,9 +102,23 @@ async def setup_cogs():
 
 
 async def main():
+    await run_migrations()
+    await load_rankings()
+    await tournament_store.load()
+    await lfg_queue.load()
+    await lfg_watch.load()
+    migrate_legacy_deck_file()
+
     async with bot:
         await setup_cogs()
-        await bot.start(TOKEN)
+        try:
+            await bot.start(TOKEN)
+        finally:
+            await close_curiosa_client()
+            await flavor.close()
+            await outbound.close()
+            await lfg_queue.close()
+            close_databases()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,108 @@
+"""Elo-seeded single-elimination brackets."""
+
+from utils.ranking import DEFAULT_ELO, ScoreIndex, elo_ranks
+
+
+def bracket_size(player_count: int) -> int:
+    """Smallest power of two that fits every player."""
+    return 1 << max(player_count - 1, 1).bit_length()
+
+
+def seed_order(size: int) -> list[int]:
+    """
+    Seeds in bracket-line order, e.g. ``[1, 8, 4, 5, 2, 7, 3, 6]`` for 8,
+    so the top two seeds can only meet in the final.
+    """
+    order = [1]
+    while len(order) < size:
+        total = 2 * len(order) + 1
+        order = [seed for top in order for seed in (top, total - top)]
+    return order
+
+
+def seed_players(players, ratings: ScoreIndex = elo_ranks) -> list[int]:
+    """
+    Players best first by Elo; unrated players count as ``DEFAULT_ELO``
+    and ties keep registration order.
+    """
+    order = {player: index for index, player in enumerate(players)}
+    return sorted(
+        players,
+        key=lambda player: (
+            -(ratings.score_of(player) or DEFAULT_ELO),
+            order[player],
+        ),
+    )
+
+
+def build_bracket(seeded, match_ids) -> list[dict]:
+    """
+    Every match of a seeded single-elimination bracket, created up front.
+
+    Top seeds get the byes needed to fill the bracket and go straight into
+    round 2. Each match points at the one its winner plays next through
+    ``next_match_id``/``next_slot`` (0 for ``player1``, 1 for ``player2``).
+    Matches still waiting on an earlier result have status ``"waiting"``.
+
+    Args:
+        seeded: Player ids, best seed first
+        match_ids: ``len(seeded) - 1`` ids to give the matches, in order
+
+    Returns:
+        list[dict]: matches ordered by round, then bracket line
+    """
+    size = bracket_size(len(seeded))
+    lines = [
+        seeded[seed - 1] if seed <= len(seeded) else None for seed in seed_order(size)
+    ]
+
+    # Round 1; a bye leaves a hole and its player moves straight on
+    byes = {}
+    first_round = []
+    for i in range(size // 2):
+        player1, player2 = lines[2 * i], lines[2 * i + 1]
+        if player2 is None:
+            byes[i] = player1
+            first_round.append(None)
+        else:
+            first_round.append(
+                {
+                    "round": 1,
+                    "player1": player1,
+                    "player2": player2,
+                    "winner": None,
+                    "status": "pending",
+                }
+            )
+
+    rounds = [first_round]
+    while len(rounds[-1]) > 1:
+        previous = rounds[-1]
+        current = []
+        for i in range(len(previous) // 2):
+            match = {
+                "round": len(rounds) + 1,
+                "player1": None,
+                "player2": None,
+                "winner": None,
+                "status": "waiting",
+            }
+            for slot, key in enumerate(("player1", "player2")):
+                if len(rounds) == 1 and previous[2 * i + slot] is None:
+                    match[key] = byes[2 * i + slot]
+            if match["player1"] is not None and match["player2"] is not None:
+                match["status"] = "pending"
+            current.append(match)
+        rounds.append(current)
+
+    matches = [match for row in rounds for match in row if match is not None]
+    for match, match_id in zip(matches, match_ids):
+        match["id"] = match_id
+        match["next_match_id"] = None
+        match["next_slot"] = None
+    for row, next_row in zip(rounds, rounds[1:]):
+        for i, match in enumerate(row):
+            if match is not None:
+                match["next_match_id"] = next_row[i // 2]["id"]
+                match["next_slot"] = i % 2
+    return matches
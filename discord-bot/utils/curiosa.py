@@ -0,0 +1,203 @@
+"""Async Curiosa API client shared by every deck lookup."""
+
+import asyncio
+import json
+import logging
+
+import aiohttp
+
+logger = logging.getLogger("discord_bot")
+
+CURIOSA_API_URL = "https://curiosa.io/api"
+
+# Statuses worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class CuriosaError(Exception):
+    """Raised when a deck can't be fetched from Curiosa."""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class CuriosaClient:
+    """
+    Pooled, non-blocking client for the Curiosa deck API.
+
+    One aiohttp session is reused for every request so connections stay
+    alive between match reports. ``base_url`` can be pointed at a local
+    stub server.
+    """
+
+    def __init__(
+        self,
+        base_url: str = CURIOSA_API_URL,
+        limit_per_host: int = 4,
+        timeout: float = 10,
+        retries: int = 3,
+        backoff: float = 0.5,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self._session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit_per_host=self.limit_per_host, keepalive_timeout=30
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def fetch_decks(self, deck_ids: list[str]) -> list[dict]:
+        """Fetch one or more decks by id. Returns the decoded deck list."""
+        url = f"{self.base_url}/decks?ids=" + ",".join(deck_ids)
+        last_error = None
+
+        for attempt in range(self.retries + 1):
+            if attempt:
+                delay = self.backoff * 2 ** (attempt - 1)
+                logger.warning(
+                    f"Retrying Curiosa request in {delay:.1f}s "
+                    f"(attempt {attempt + 1}/{self.retries + 1}): {last_error}"
+                )
+                await asyncio.sleep(delay)
+
+            try:
+                async with self._get_session().get(url) as response:
+                    if response.status in RETRY_STATUSES:
+                        last_error = CuriosaError(
+                            f"Curiosa returned status {response.status}",
+                            status=response.status,
+                        )
+                        continue
+                    if response.status != 200:
+                        raise CuriosaError(
+                            f"Curiosa returned status {response.status}",
+                            status=response.status,
+                        )
+                    text = await response.text()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                last_error = CuriosaError(f"Curiosa request failed: {e!r}")
+                continue
+
+            try:
+                return json.loads(text)
+            except json.JSONDecodeError as e:
+                raise CuriosaError(f"Invalid JSON from Curiosa: {e}")
+
+        raise last_error
+
+    async def fetch_deck(self, deck_id: str) -> dict | None:
+        """Fetch a single deck by id, or None if Curiosa doesn't know it."""
+        decks = await self.fetch_decks([deck_id])
+        return decks[0] if decks else None
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+
+class DeckBatcher:
+    """
+    Coalesces single-deck lookups into multi-id Curiosa requests.
+
+    Lookups arriving within ``window`` seconds of each other are sent as one
+    ``?ids=a,b,c`` request (flushed early once ``max_batch`` ids are queued)
+    and each caller gets back only its own deck.
+    """
+
+    def __init__(
+        self, client: CuriosaClient, window: float = 0.05, max_batch: int = 25
+    ):
+        self.client = client
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: dict[str, list[asyncio.Future]] = {}
+        self._flush_handle = None
+
+    async def fetch_deck(self, deck_id: str) -> dict | None:
+        """Queue a deck lookup and wait for the batch it lands in."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.setdefault(deck_id, []).append(future)
+
+        if len(self._pending) >= self.max_batch:
+            self._flush_now()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                self.window, self._flush_now
+            )
+        return await future
+
+    def _flush_now(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        asyncio.ensure_future(self._send(batch))
+
+    async def _send(self, batch: dict[str, list[asyncio.Future]]):
+        deck_ids = list(batch)
+        logger.debug(f"Fetching {len(deck_ids)} deck(s) from Curiosa in one call")
+        try:
+            decks = await self.client.fetch_decks(deck_ids)
+        except Exception as e:
+            for futures in batch.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+
+        by_id = {deck.get("id"): deck for deck in decks if isinstance(deck, dict)}
+        if len(deck_ids) == 1 and decks and deck_ids[0] not in by_id:
+            # Single lookups don't need the response to echo the id back
+            by_id[deck_ids[0]] = decks[0]
+
+        for deck_id, futures in batch.items():
+            for future in futures:
+                if not future.done():
+                    future.set_result(by_id.get(deck_id))
+
+
+_client = None
+_batcher = None
+
+
+def get_curiosa_client() -> CuriosaClient:
+    """Return the shared Curiosa client, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = CuriosaClient()
+    return _client
+
+
+def get_deck_batcher() -> DeckBatcher:
+    """Return the shared deck batcher wrapping the shared client."""
+    global _batcher
+    if _batcher is None:
+        _batcher = DeckBatcher(get_curiosa_client())
+    return _batcher
+
+
+async def fetch_deck(deck_id: str) -> dict | None:
+    """Fetch one deck through the shared batcher."""
+    return await get_deck_batcher().fetch_deck(deck_id)
+
+
+async def close_curiosa_client():
+    """Close the shared client's connection pool."""
+    global _client, _batcher
+    if _client is not None:
+        await _client.close()
+        _client = None
+        _batcher = None
@@ -0,0 +1,164 @@
+"""Shared SQLite access: one long-lived connection per database file."""
+
+import asyncio
+import logging
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger("discord_bot")
+
+# Re-exported so callers can catch database errors without importing sqlite3
+DatabaseError = sqlite3.Error
+
+
+class Database:
+    """
+    A single persistent connection to one SQLite file.
+
+    Every statement runs on a dedicated worker thread, so the event loop
+    never blocks on disk I/O. The connection is opened in WAL mode with a
+    large statement cache, so repeated queries reuse prepared statements.
+    """
+
+    def __init__(self, db_name: str):
+        self.db_name = db_name
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix=f"sqlite-{db_name}"
+        )
+        self._conn = None
+        self._lock = asyncio.Lock()
+        self._owner = None
+        self._depth = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(
+                self.db_name, check_same_thread=False, cached_statements=256
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            logger.info(f"Opened shared connection to {self.db_name}")
+        return self._conn
+
+    async def run(self, fn, *args):
+        """Run ``fn(connection, *args)`` on this database's worker thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, lambda: fn(self._connection(), *args)
+        )
+
+    async def acquire(self) -> bool:
+        """
+        Start a transaction block. Blocks nested in the same task join the
+        outer transaction; returns True for the outermost block.
+        """
+        task = asyncio.current_task()
+        if self._owner is task:
+            self._depth += 1
+            return False
+        await self._lock.acquire()
+        self._owner = task
+        self._depth = 1
+        return True
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            self._owner = None
+            self._lock.release()
+
+    def close(self):
+        def _close():
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+        self._executor.submit(_close).result()
+        self._executor.shutdown()
+
+
+class AsyncCursor:
+    """Awaitable counterpart of ``sqlite3.Cursor`` bound to a Database."""
+
+    def __init__(self, db: Database):
+        self._db = db
+        self._cursor = None
+
+    def _cur(self, conn):
+        if self._cursor is None:
+            self._cursor = conn.cursor()
+        return self._cursor
+
+    async def execute(self, sql: str, params=()):
+        await self._db.run(lambda conn: self._cur(conn).execute(sql, params))
+        return self
+
+    async def executemany(self, sql: str, seq_of_params):
+        seq_of_params = list(seq_of_params)
+        await self._db.run(
+            lambda conn: self._cur(conn).executemany(sql, seq_of_params)
+        )
+        return self
+
+    async def fetchone(self):
+        return await self._db.run(lambda conn: self._cur(conn).fetchone())
+
+    async def fetchall(self):
+        return await self._db.run(lambda conn: self._cur(conn).fetchall())
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid if self._cursor else None
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount if self._cursor else -1
+
+
+class DatabaseConnection:
+    """
+    Transaction on the shared connection for ``db_name``::
+
+        async with DatabaseConnection("elo.db") as cur:
+            await cur.execute("SELECT elo FROM overall_standings WHERE user_id=?", (1,))
+            row = await cur.fetchone()
+
+    Commits when the block exits cleanly and rolls back on error. Blocks are
+    serialized per database, so keep Discord API calls outside of them.
+    """
+
+    def __init__(self, db_name: str):
+        self.db_name = db_name
+        self.db = get_database(db_name)
+        self._outermost = False
+
+    async def __aenter__(self) -> AsyncCursor:
+        self._outermost = await self.db.acquire()
+        return AsyncCursor(self.db)
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        try:
+            if self._outermost:
+                if exc_type is None:
+                    await self.db.run(lambda conn: conn.commit())
+                else:
+                    await self.db.run(lambda conn: conn.rollback())
+        finally:
+            self.db.release()
+
+
+_databases: dict[str, Database] = {}
+
+
+def get_database(db_name: str) -> Database:
+    """Return the shared Database for a file, opening it on first use."""
+    if db_name not in _databases:
+        _databases[db_name] = Database(db_name)
+    return _databases[db_name]
+
+
+def close_databases():
+    """Close every shared connection (called on shutdown)."""
+    for db in _databases.values():
+        db.close()
+    _databases.clear()
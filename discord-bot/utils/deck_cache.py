@@ -0,0 +1,166 @@
+"""Persistent Curiosa deck cache keyed by deck id."""
+
+import asyncio
+import datetime
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+
+from utils.curiosa import CuriosaError, fetch_deck
+from utils.db import DatabaseConnection
+
+logger = logging.getLogger("discord_bot")
+
+DECK_CACHE_DB = "match_records.db"
+DECK_TTL = datetime.timedelta(hours=24)
+
+
+def deck_hash(deck: dict) -> str:
+    """Stable content hash of a deck, used to skip rewrites of unchanged decks."""
+    canonical = json.dumps(deck, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class DeckCache:
+    """
+    Two-level deck cache: an in-memory LRU in front of the ``deck_cache``
+    table.
+
+    Fresh hits never touch the network. Entries older than ``ttl`` are still
+    served immediately while a background fetch revalidates them; if the
+    content hash hasn't changed only the timestamp is bumped.
+    """
+
+    def __init__(self, db_name=DECK_CACHE_DB, ttl=DECK_TTL, capacity=256):
+        self.db_name = db_name
+        self.ttl = ttl
+        self.capacity = capacity
+        self._lru: OrderedDict[str, tuple[dict, str, datetime.datetime]] = (
+            OrderedDict()
+        )
+        self._refreshing: set[str] = set()
+
+    def _remember(self, deck_id, deck, content_hash, fetched_at):
+        self._lru[deck_id] = (deck, content_hash, fetched_at)
+        self._lru.move_to_end(deck_id)
+        while len(self._lru) > self.capacity:
+            self._lru.popitem(last=False)
+
+    async def _load(self, deck_id):
+        async with DatabaseConnection(self.db_name) as cur:
+            await cur.execute(
+                "SELECT json_deck_data, content_hash, fetched_at FROM deck_cache "
+                "WHERE deck_id = ?",
+                (deck_id,),
+            )
+            row = await cur.fetchone()
+        if not row:
+            return None
+        return json.loads(row[0]), row[1], datetime.datetime.fromisoformat(row[2])
+
+    async def _store(self, deck_id, deck):
+        content_hash = deck_hash(deck)
+        fetched_at = datetime.datetime.now()
+        async with DatabaseConnection(self.db_name) as cur:
+            await cur.execute(
+                """INSERT INTO deck_cache (deck_id, json_deck_data, content_hash, fetched_at)
+                   VALUES (?, ?, ?, ?)
+                   ON CONFLICT(deck_id) DO UPDATE SET
+                       json_deck_data = CASE WHEN content_hash = excluded.content_hash
+                                             THEN json_deck_data
+                                             ELSE excluded.json_deck_data END,
+                       content_hash = excluded.content_hash,
+                       fetched_at = excluded.fetched_at""",
+                (deck_id, json.dumps(deck), content_hash, fetched_at.isoformat()),
+            )
+        self._remember(deck_id, deck, content_hash, fetched_at)
+
+    async def _revalidate(self, deck_id):
+        try:
+            deck = await fetch_deck(deck_id)
+            if deck is not None:
+                await self._store(deck_id, deck)
+        except CuriosaError as e:
+            logger.warning(f"Could not revalidate cached deck {deck_id}: {e}")
+        finally:
+            self._refreshing.discard(deck_id)
+
+    async def get_deck(self, deck_id: str) -> dict | None:
+        """Return a deck, hitting Curiosa only when it isn't cached yet."""
+        entry = self._lru.get(deck_id)
+        if entry is not None:
+            self._lru.move_to_end(deck_id)
+        else:
+            entry = await self._load(deck_id)
+            if entry is not None:
+                self._remember(deck_id, *entry)
+
+        if entry is None:
+            deck = await fetch_deck(deck_id)
+            if deck is not None:
+                await self._store(deck_id, deck)
+            return deck
+
+        deck, _, fetched_at = entry
+        if (
+            datetime.datetime.now() - fetched_at > self.ttl
+            and deck_id not in self._refreshing
+        ):
+            self._refreshing.add(deck_id)
+            asyncio.ensure_future(self._revalidate(deck_id))
+        return deck
+
+
+deck_cache = DeckCache()
+
+
+async def backfill_deck_cache(db_name=DECK_CACHE_DB):
+    """
+    Move per-row deck JSON copies into deck_cache and point rows at the
+    cached deck by id instead. Safe to run repeatedly; runs as a schema
+    migration (see utils/migrations.py).
+    """
+    from utils.deck_checker import get_deck_id
+
+    moved = 0
+    now = datetime.datetime.now().isoformat()
+
+    async with DatabaseConnection(db_name) as cur:
+        for table, url_column in (
+            ("match_records", "curiosa_url"),
+            ("solo_match_reports", "curiosa_link"),
+        ):
+            await cur.execute(
+                f"SELECT rowid, {url_column}, json_deck_data FROM {table} "
+                "WHERE json_deck_data IS NOT NULL AND deck_id IS NULL"
+            )
+            cached, updated = [], []
+            for rowid, url, raw in await cur.fetchall():
+                try:
+                    deck = json.loads(raw)
+                except (TypeError, json.JSONDecodeError):
+                    continue
+                if not deck or not url or url == "No URL provided":
+                    continue
+
+                deck_id = get_deck_id(url)
+                cached.append((deck_id, json.dumps(deck), deck_hash(deck), now))
+                updated.append((deck_id, rowid))
+
+            await cur.executemany(
+                "INSERT OR IGNORE INTO deck_cache "
+                "(deck_id, json_deck_data, content_hash, fetched_at) "
+                "VALUES (?, ?, ?, ?)",
+                cached,
+            )
+            await cur.executemany(
+                f"UPDATE {table} SET deck_id = ?, json_deck_data = NULL "
+                "WHERE rowid = ?",
+                updated,
+            )
+            moved += len(updated)
+
+    if moved:
+        logger.info(f"Moved {moved} inline deck copies into deck_cache")
+    return moved
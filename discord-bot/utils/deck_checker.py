@@ -1,6 +1,8 @@
-import requests
 import json
-import os
+
+from utils.curiosa import CuriosaError
+from utils.deck_cache import deck_cache
+from utils.deck_log import DECK_LOG_FILE, log_deck
 
 
 def get_deck_id(url: str) -> str:
@@ -12,36 +14,24 @@ def get_deck_id(url: str) -> str:
     return deck_id
 
 
-def scrape_Curosa(deck_url, name):
-    """Scrape deck data from Curiosa and save to file."""
+async def scrape_Curosa(deck_url, name=DECK_LOG_FILE):
+    """Scrape deck data from Curiosa (or the deck cache) and archive it."""
     deck_id = get_deck_id(deck_url)
-    response = requests.get("https://curiosa.io/api/decks?ids=" + deck_id)
-
-    if response.status_code != 200:
-        print(f"Failed to retrieve the website. Status code: {response.status_code}")
+    try:
+        deck = await deck_cache.get_deck(deck_id)
+    except CuriosaError as e:
+        print(f"Failed to retrieve the website. Status code: {e.status} ({e})")
         return None
 
-    json_data = json.loads(response.text)
-
-    # Load existing data from file if it exists
-    if os.path.exists(name):
-        with open(name, "r") as f:
-            try:
-                existing_data = json.load(f)
-            except json.JSONDecodeError:
-                existing_data = []
-    else:
-        existing_data = []
-
-    # Append the new data to existing data
-    existing_data.append(json_data[0])
+    if deck is None:
+        print(f"No deck found on Curiosa for id {deck_id}")
+        return None
 
-    # Write the updated data back to the file
-    with open(name, "w") as f:
-        json.dump(existing_data, f, indent=2)
+    # Append the deck to the archive
+    await log_deck(deck, name)
 
     # Return json data as a string to save in the db
-    json_data = json.dumps(json_data[0])
+    json_data = json.dumps(deck)
     return json_data
 
 
@@ -0,0 +1,70 @@
+"""Append-only JSON-lines archive of every reported deck."""
+
+import asyncio
+import json
+import logging
+import os
+
+logger = logging.getLogger("discord_bot")
+
+DECK_LOG_FILE = "deck_data.jsonl"
+LEGACY_DECK_FILE = "deck_data_test.json"
+
+
+def append_deck(deck: dict, path: str = DECK_LOG_FILE):
+    """
+    Append one deck as a single line.
+
+    The line is written with one ``write()`` on an ``O_APPEND`` descriptor,
+    so overlapping reports can't interleave or clobber each other.
+    """
+    line = (json.dumps(deck, separators=(",", ":")) + "\n").encode("utf-8")
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, line)
+    finally:
+        os.close(fd)
+
+
+async def log_deck(deck: dict, path: str = DECK_LOG_FILE):
+    """Append a deck without blocking the event loop."""
+    await asyncio.to_thread(append_deck, deck, path)
+
+
+def iter_decks(path: str = DECK_LOG_FILE):
+    """Stream decks from the archive one at a time, skipping damaged lines."""
+    if not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"Skipping unreadable line {line_number} in {path}")
+
+
+def migrate_legacy_deck_file(src: str = LEGACY_DECK_FILE, dst: str = DECK_LOG_FILE):
+    """
+    One-time move of the old JSON-array deck file into the JSON-lines log.
+    The old file is renamed to ``<src>.migrated`` so this only runs once.
+    """
+    if not os.path.exists(src):
+        return 0
+
+    try:
+        with open(src, "r") as f:
+            decks = json.load(f)
+    except json.JSONDecodeError:
+        logger.error(f"Could not parse {src}; leaving it in place")
+        return 0
+
+    with open(dst, "a", encoding="utf-8") as out:
+        for deck in decks:
+            out.write(json.dumps(deck, separators=(",", ":")) + "\n")
+
+    os.replace(src, src + ".migrated")
+    logger.info(f"Migrated {len(decks)} decks from {src} to {dst}")
+    return len(decks)
@@ -0,0 +1,230 @@
+"""Non-blocking, pooled OpenAI flavor text for the fart commands."""
+
+import asyncio
+import logging
+import random
+from collections import deque
+
+from openai import AsyncOpenAI
+
+import config
+
+logger = logging.getLogger("discord_bot")
+
+FLAVOR_MODEL = "gpt-4.1-nano"
+
+# Shown until the real quip arrives
+QUIP_PLACEHOLDER = "..."
+
+FALLBACK_LINES = [
+    "... *cough cough*",
+    "The air will never be the same.",
+    "Somebody open a window!",
+    "A truly magical emission.",
+    "The mana pool just got murkier.",
+]
+
+# Pooled lines are generated once with these tokens and personalised at send time
+NAME_TOKEN = "{user}"
+DAMAGE_TOKEN = "{damage}"
+
+FART_INSTRUCTIONS = (
+    "in less than 10 words. Respond to the following prompt as if you were "
+    "around {name} farting with a little bit of sarcasm and humor."
+)
+ATTACK_INSTRUCTIONS = (
+    "in less than 10 words. Respond to the following prompt as if you were "
+    "around {name} farting to attack another users score with sarcasm and humor. "
+    "The fart did {damage} damage to the opponent's score. keep the damage number in the response."
+)
+TOKEN_INSTRUCTIONS = (
+    f" Refer to the person only as {NAME_TOKEN} and write any damage number as "
+    f"{DAMAGE_TOKEN}, exactly as shown."
+)
+
+QUIP_INSTRUCTIONS = {
+    "fart": FART_INSTRUCTIONS.format(name=NAME_TOKEN) + TOKEN_INSTRUCTIONS,
+    "attack": ATTACK_INSTRUCTIONS.format(name=NAME_TOKEN, damage=DAMAGE_TOKEN)
+    + TOKEN_INSTRUCTIONS,
+}
+
+
+class FlavorText:
+    """
+    Async LLM quips that never hold up a command.
+
+    Each request is capped at ``timeout`` seconds and at most
+    ``max_in_flight`` run at once; anything over the cap, slow or failing
+    gets a canned line instead. ``generate`` can be swapped for a local stub
+    (``async def generate(instructions, prompt) -> str``).
+
+    Quips for the fixed command prompts (fart tiers, attack tiers, the
+    fart lord proclamation) are generated with name/damage tokens, so one
+    line serves every user. Each prompt gets a pool of unused lines that a
+    background task keeps topped up to ``pool_size``, plus a cache of every
+    line seen so far that is reused whenever the pool runs dry.
+    """
+
+    def __init__(
+        self,
+        generate=None,
+        timeout: float = 8.0,
+        max_in_flight: int = 4,
+        pool_size: int = 5,
+        cache_size: int = 20,
+        refill_interval: float = 1.0,
+        refill_backoff: float = 60.0,
+    ):
+        self._generate = generate or self._openai_generate
+        self.timeout = timeout
+        self.max_in_flight = max_in_flight
+        self.pool_size = pool_size
+        self.cache_size = cache_size
+        self.refill_interval = refill_interval
+        self.refill_backoff = refill_backoff
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._client = None
+        self._edits: set[asyncio.Task] = set()
+        self._prompts: dict[tuple[str, str], str] = {}
+        self._pools: dict[tuple[str, str], deque[str]] = {}
+        self._cache: dict[tuple[str, str], deque[str]] = {}
+        self._wake = asyncio.Event()
+        self._refiller = None
+
+    def _get_client(self):
+        if self._client is None:
+            self._client = AsyncOpenAI(api_key=config.OPENAI_API_KEY)
+        return self._client
+
+    async def _openai_generate(self, instructions: str, prompt: str) -> str:
+        response = await self._get_client().responses.create(
+            model=FLAVOR_MODEL, instructions=instructions, input=prompt
+        )
+        return response.output_text
+
+    def fallback(self) -> str:
+        return random.choice(FALLBACK_LINES)
+
+    async def _call(self, instructions: str, prompt: str, wait: bool = False):
+        """Ask the model once. Returns None if busy (unless ``wait``), slow or down."""
+        if self._semaphore.locked() and not wait:
+            logger.debug("Flavor text at capacity; using a canned line")
+            return None
+
+        async with self._semaphore:
+            try:
+                text = await asyncio.wait_for(
+                    self._generate(instructions, prompt), self.timeout
+                )
+            except asyncio.TimeoutError:
+                logger.warning(f"Flavor text timed out after {self.timeout}s")
+                return None
+            except Exception as e:
+                logger.error(f"OpenAI API error: {e}")
+                return None
+        return text.strip() or None
+
+    async def generate(self, instructions: str, prompt: str) -> str:
+        """One uncached quip, or a canned line if the model is busy, slow or down."""
+        return await self._call(instructions, prompt) or self.fallback()
+
+    @staticmethod
+    def _key(kind: str, prompt: str) -> tuple[str, str]:
+        return kind, " ".join(prompt.lower().split())
+
+    async def _new_line(self, key, wait: bool = False):
+        kind, _ = key
+        line = await self._call(QUIP_INSTRUCTIONS[kind], self._prompts[key], wait)
+        if line is not None:
+            self._cache[key].append(line)
+        return line
+
+    async def quip(self, kind: str, prompt: str, name: str, damage=None) -> str:
+        """
+        A quip for one of the fixed command prompts, personalised for ``name``.
+
+        Served from the prompt's pool, then its cache, and only generated
+        live the first time a prompt is seen.
+        """
+        key = self._key(kind, prompt)
+        if key not in self._prompts:
+            self._prompts[key] = prompt
+            self._pools[key] = deque()
+            self._cache[key] = deque(maxlen=self.cache_size)
+
+        if self._pools[key]:
+            line = self._pools[key].popleft()
+        elif self._cache[key]:
+            line = random.choice(self._cache[key])
+        else:
+            line = await self._new_line(key)
+        self._request_refill()
+
+        if line is None:
+            return self.fallback()
+        return line.replace(NAME_TOKEN, name).replace(DAMAGE_TOKEN, str(damage))
+
+    async def fart_quip(self, prompt: str, name_of_user: str) -> str:
+        return await self.quip("fart", prompt, name_of_user)
+
+    async def attack_quip(self, prompt: str, name_of_user: str, damage: int) -> str:
+        return await self.quip("attack", prompt, name_of_user, damage)
+
+    async def chat_reply(self, prompt: str, name_of_user: str) -> str:
+        """Free-form reply to a mention; never pooled or cached."""
+        return await self.generate(FART_INSTRUCTIONS.format(name=name_of_user), prompt)
+
+    def _request_refill(self):
+        self._wake.set()
+        if self._refiller is None or self._refiller.done():
+            self._refiller = asyncio.ensure_future(self._refill_loop())
+
+    async def _refill_loop(self):
+        """Top every known prompt's pool back up, one line at a time."""
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            while True:
+                key = next(
+                    (k for k, pool in self._pools.items() if len(pool) < self.pool_size),
+                    None,
+                )
+                if key is None:
+                    break
+                line = await self._new_line(key, wait=True)
+                if line is None:
+                    await asyncio.sleep(self.refill_backoff)
+                    continue
+                self._pools[key].append(line)
+                await asyncio.sleep(self.refill_interval)
+
+    async def close(self):
+        """Stop the background refill (called on shutdown)."""
+        if self._refiller is not None:
+            self._refiller.cancel()
+            self._refiller = None
+
+    def edit_in_later(self, quip, render, edit):
+        """
+        Fill a quip into an already-sent reply once it arrives.
+
+        Args:
+            quip: Awaitable resolving to the quip text
+            render: Builds the full message content from a quip
+            edit: ``message.edit`` or ``interaction.edit_original_response``
+        """
+
+        async def _edit():
+            text = await quip
+            try:
+                await edit(content=render(text))
+            except Exception as e:
+                logger.error(f"Could not edit quip into message: {e}")
+
+        task = asyncio.ensure_future(_edit())
+        self._edits.add(task)
+        task.add_done_callback(self._edits.discard)
+        return task
+
+
+flavor = FlavorText()
@@ -0,0 +1,126 @@
+"""Interval index: a treap ordered by start and augmented with the max end."""
+
+import random
+
+
+class _Node:
+    __slots__ = ("key", "start", "end", "priority", "max_end", "left", "right")
+
+    def __init__(self, key, start: float, end: float, priority: float):
+        self.key = key
+        self.start = start
+        self.end = end
+        self.priority = priority
+        self.max_end = end
+        self.left = None
+        self.right = None
+
+    def update(self):
+        self.max_end = self.end
+        if self.left is not None and self.left.max_end > self.max_end:
+            self.max_end = self.left.max_end
+        if self.right is not None and self.right.max_end > self.max_end:
+            self.max_end = self.right.max_end
+
+
+def _split(node, start, key):
+    """Split into nodes ordered before ``(start, key)`` and the rest."""
+    if node is None:
+        return None, None
+    if (node.start, node.key) < (start, key):
+        node.right, right = _split(node.right, start, key)
+        node.update()
+        return node, right
+    left, node.left = _split(node.left, start, key)
+    node.update()
+    return left, node
+
+
+def _merge(left, right):
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        left.update()
+        return left
+    right.left = _merge(left, right.left)
+    right.update()
+    return right
+
+
+def _remove(node, target):
+    if node is target:
+        return _merge(node.left, node.right)
+    if (target.start, target.key) < (node.start, node.key):
+        node.left = _remove(node.left, target)
+    else:
+        node.right = _remove(node.right, target)
+    node.update()
+    return node
+
+
+class IntervalIndex:
+    """
+    Keyed intervals ``[start, end]`` (e.g. user id -> availability window).
+
+    A treap ordered by ``(start, key)`` where every node also stores the
+    largest ``end`` in its subtree. ``overlapping`` walks it in start order,
+    skipping any subtree whose ``max_end`` is too early and stopping at the
+    first start that is too late, so the cost is the O(log n) search path
+    plus the subtrees that hold results, not the whole queue. Adding and
+    removing are O(log n) expected.
+    """
+
+    def __init__(self, seed=None):
+        self._root = None
+        self._nodes: dict = {}
+        self._random = random.Random(seed)
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def __contains__(self, key):
+        return key in self._nodes
+
+    def get(self, key) -> tuple[float, float] | None:
+        node = self._nodes.get(key)
+        return (node.start, node.end) if node else None
+
+    def add(self, key, start: float, end: float):
+        """Insert an interval, replacing any existing one for ``key``."""
+        self.remove(key)
+        node = _Node(key, start, end, self._random.random())
+        left, right = _split(self._root, start, key)
+        self._root = _merge(_merge(left, node), right)
+        self._nodes[key] = node
+
+    def remove(self, key):
+        node = self._nodes.pop(key, None)
+        if node is not None:
+            self._root = _remove(self._root, node)
+
+    def overlapping(self, max_start: float, min_end: float) -> list[tuple]:
+        """
+        ``(key, start, end)`` for every interval with ``start <= max_start``
+        and ``end >= min_end``, ordered by start. With ``min_end <=
+        max_start`` that is every interval touching ``[min_end, max_start]``.
+        """
+        found = []
+        stack = []
+        node = self._root
+        while stack or node is not None:
+            # Go left as far as any subtree could still hold a match
+            while node is not None and node.max_end >= min_end:
+                stack.append(node)
+                node = node.left
+            if not stack:
+                break
+            node = stack.pop()
+            if node.start > max_start:
+                break  # Everything after this starts later still
+            if node.end >= min_end:
+                found.append((node.key, node.start, node.end))
+            node = node.right
+        return found
@@ -0,0 +1,362 @@
+"""Persistent LFG queue with heap-ordered expiry."""
+
+import asyncio
+import datetime
+import heapq
+import logging
+import time
+
+from utils.database import typical_match_minutes
+from utils.db import DatabaseConnection
+from utils.intervals import IntervalIndex
+from utils.lfg_stats import read_rollups, record_events
+from utils.matchmaking import Matchmaker
+from utils.ranking import DEFAULT_ELO, elo_ranks
+
+logger = logging.getLogger("discord_bot")
+
+LFG_DB = "lfg.db"
+
+# How often waiting players are re-checked as their search windows widen
+REMATCH_INTERVAL = 60.0
+
+# Game length assumed until players have reported some match times
+DEFAULT_MATCH_MINUTES = 30
+
+
+def _elo(user_id: int) -> int:
+    return elo_ranks.score_of(user_id) or DEFAULT_ELO
+
+
+class LFGQueue:
+    """
+    Players looking for a game, stored in ``lfg.db`` so a restart doesn't
+    empty the queue.
+
+    Entries are dicts ``{"user_id", "joined_at", "minutes", "available_from",
+    "expires_at"}`` (the last two are Unix timestamps bounding when the
+    player can play), kept in join order. A min-heap of
+    ``(expires_at, user_id)`` orders them by expiry; leaving or re-joining
+    just drops the entry and leaves its heap item behind, which is skipped
+    when it surfaces (lazy deletion). Each expiry costs O(log n).
+
+    Queued players are also kept in a rating-ordered ``Matchmaker`` so
+    ``find_match`` pairs a new arrival with the closest Elo that fits, and
+    their availability windows in an ``IntervalIndex``. Two players only
+    match if their windows overlap by at least ``match_minutes`` (the median
+    reported game length), and ``free_within`` lists who can play soon.
+
+    Every join, pairing, expiry and cancel is also appended to ``lfg_events``
+    and counted into the ``lfg_hourly``/``lfg_waits`` rollups in the same
+    transaction (see ``utils.lfg_stats``), so ``stats`` never reads the log.
+
+    ``start(on_expire, on_pair)`` runs a background task that sleeps until
+    the next entry is due, removes everything that has expired and hands
+    those entries to ``on_expire``. While two or more players wait it also
+    wakes every ``rematch_interval`` seconds to pair players whose search
+    windows have grown wide enough, handing them to ``on_pair``. Commands
+    never need to sweep the queue.
+    """
+
+    def __init__(
+        self,
+        db_name: str = LFG_DB,
+        rating_of=_elo,
+        rematch_interval: float = REMATCH_INTERVAL,
+    ):
+        self.db_name = db_name
+        self.rating_of = rating_of
+        self.rematch_interval = rematch_interval
+        self.matchmaker = Matchmaker()
+        self.windows = IntervalIndex()
+        self.match_minutes = DEFAULT_MATCH_MINUTES
+        self._entries: dict[int, dict] = {}
+        self._heap: list[tuple[float, int]] = []
+        self._wake = asyncio.Event()
+        self._sweeper = None
+        self._on_expire = None
+        self._on_pair = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, user_id):
+        return user_id in self._entries
+
+    def get(self, user_id: int) -> dict | None:
+        return self._entries.get(user_id)
+
+    def entries(self) -> list[dict]:
+        """Queued entries, oldest first."""
+        return list(self._entries.values())
+
+    def find_match(
+        self,
+        user_id: int,
+        available_from: float = None,
+        expires_at: float = None,
+        now: float = None,
+    ) -> dict | None:
+        """
+        The queued player closest in Elo to ``user_id`` whose rating gap fits
+        the search window of either of them and who is free for a whole game
+        at the same time. A queued player's own window is used unless one is
+        given.
+        """
+        now = time.time() if now is None else now
+        entry = self._entries.get(user_id)
+        if entry is not None and available_from is None:
+            available_from, expires_at = entry["available_from"], entry["expires_at"]
+        waited = now - self._joined(entry) if entry else 0
+        start = max(available_from, now)
+        needed = self.match_minutes * 60
+
+        def overlaps(other_id):
+            other_from, other_to = self.windows.get(other_id)
+            return min(expires_at, other_to) - max(start, other_from) >= needed
+
+        match_id = self.matchmaker.best_match(
+            self.rating_of(user_id), waited, exclude=user_id, now=now, accept=overlaps
+        )
+        return self._entries.get(match_id)
+
+    def free_within(self, minutes: float, now: float = None) -> list[dict]:
+        """Queued players whose window is open at some point in the next ``minutes``."""
+        now = time.time() if now is None else now
+        return [
+            self._entries[user_id]
+            for user_id, _, _ in self.windows.overlapping(now + minutes * 60, now)
+        ]
+
+    @staticmethod
+    def _joined(entry: dict) -> float:
+        return datetime.datetime.fromisoformat(entry["joined_at"]).timestamp()
+
+    def _push(self, entry: dict):
+        self._entries[entry["user_id"]] = entry
+        self.matchmaker.add(
+            entry["user_id"], self.rating_of(entry["user_id"]), self._joined(entry)
+        )
+        self.windows.add(
+            entry["user_id"], entry["available_from"], entry["expires_at"]
+        )
+        heapq.heappush(self._heap, (entry["expires_at"], entry["user_id"]))
+        # The sweeper may need an earlier deadline (new first expiry, or a
+        # second player to rematch)
+        self._wake.set()
+
+    def _is_live(self, expires_at: float, user_id: int) -> bool:
+        entry = self._entries.get(user_id)
+        return entry is not None and entry["expires_at"] == expires_at
+
+    def _next_expiry(self) -> float | None:
+        while self._heap and not self._is_live(*self._heap[0]):
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    async def load(self):
+        """Rebuild the in-memory queue from the database."""
+        async with DatabaseConnection(self.db_name) as cur:
+            await cur.execute(
+                "SELECT user_id, joined_at, minutes, available_from, expires_at "
+                "FROM lfg_queue ORDER BY joined_at"
+            )
+            rows = await cur.fetchall()
+
+        self._entries, self._heap = {}, []
+        self.matchmaker, self.windows = Matchmaker(), IntervalIndex()
+        for user_id, joined_at, minutes, available_from, expires_at in rows:
+            self._push(
+                {
+                    "user_id": user_id,
+                    "joined_at": joined_at,
+                    "minutes": minutes,
+                    "available_from": available_from,
+                    "expires_at": expires_at,
+                }
+            )
+        await self.refresh_match_minutes()
+        logger.info(f"Loaded {len(self._entries)} LFG queue entries")
+
+    async def refresh_match_minutes(self):
+        """Re-read the typical game length (after new match reports)."""
+        self.match_minutes = await typical_match_minutes() or DEFAULT_MATCH_MINUTES
+
+    async def join(self, user_id: int, minutes: int, start_in: int = 0) -> dict:
+        """
+        Queue a player who can play for ``minutes``, starting ``start_in``
+        minutes from now (re-joining replaces the old window).
+        """
+        now = time.time()
+        available_from = now + start_in * 60
+        entry = {
+            "user_id": user_id,
+            "joined_at": datetime.datetime.now().isoformat(),
+            "minutes": minutes,
+            "available_from": available_from,
+            "expires_at": available_from + minutes * 60,
+        }
+        async with DatabaseConnection(self.db_name) as cur:
+            await cur.execute(
+                """INSERT OR REPLACE INTO lfg_queue
+                   (user_id, joined_at, minutes, available_from, expires_at)
+                   VALUES (?, ?, ?, ?, ?)""",
+                (
+                    user_id,
+                    entry["joined_at"],
+                    minutes,
+                    available_from,
+                    entry["expires_at"],
+                ),
+            )
+            await record_events(cur, [("join", user_id, now, None)])
+        # Re-inserting moves the player to the back of the join order
+        self._entries.pop(user_id, None)
+        self._push(entry)
+        return entry
+
+    async def remove(self, *user_ids: int) -> list[dict]:
+        """Take players out of the queue (cancelled); returns their entries."""
+        removed = [self._entries[u] for u in user_ids if u in self._entries]
+        if not removed:
+            return []
+        now = time.time()
+        await self._delete(
+            removed, [("cancel", entry["user_id"], now, None) for entry in removed]
+        )
+        return removed
+
+    async def pair(self, *user_ids: int, now: float = None) -> list[dict]:
+        """
+        Take paired players out of the queue, logging how long each waited.
+        A player who matched without queueing counts as a join with no wait.
+        """
+        now = time.time() if now is None else now
+        removed, events = [], []
+        for user_id in user_ids:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                events.append(("join", user_id, now, None))
+                events.append(("pair", user_id, now, 0.0))
+            else:
+                removed.append(entry)
+                events.append(("pair", user_id, now, now - self._joined(entry)))
+        await self._delete(removed, events)
+        return removed
+
+    async def _delete(self, removed: list[dict], events: list[tuple]):
+        async with DatabaseConnection(self.db_name) as cur:
+            await cur.executemany(
+                "DELETE FROM lfg_queue WHERE user_id = ?",
+                [(entry["user_id"],) for entry in removed],
+            )
+            await record_events(cur, events)
+        for entry in removed:
+            self._entries.pop(entry["user_id"], None)
+            self.matchmaker.discard(entry["user_id"])
+            self.windows.remove(entry["user_id"])
+
+    async def expire(self, now: float = None) -> list[dict]:
+        """Remove and return every entry whose time is up."""
+        now = time.time() if now is None else now
+        expired = []
+        while True:
+            expires_at = self._next_expiry()
+            if expires_at is None or expires_at > now:
+                break
+            _, user_id = heapq.heappop(self._heap)
+            expired.append(self._entries[user_id])
+        if not expired:
+            return []
+        try:
+            async with DatabaseConnection(self.db_name) as cur:
+                await cur.executemany(
+                    "DELETE FROM lfg_queue WHERE user_id = ? AND expires_at = ?",
+                    [(entry["user_id"], entry["expires_at"]) for entry in expired],
+                )
+                await record_events(
+                    cur,
+                    [("expire", entry["user_id"], now, None) for entry in expired],
+                )
+        except Exception:
+            # Keep them due so the next sweep retries
+            for entry in expired:
+                heapq.heappush(self._heap, (entry["expires_at"], entry["user_id"]))
+            raise
+        for entry in expired:
+            # Only if the player didn't re-join while the delete ran
+            if self._entries.get(entry["user_id"]) is entry:
+                del self._entries[entry["user_id"]]
+                self.matchmaker.discard(entry["user_id"])
+                self.windows.remove(entry["user_id"])
+        return expired
+
+    async def pair_waiting(self, now: float = None) -> list[tuple[dict, dict]]:
+        """
+        Pair players already in the queue whose rating windows now overlap,
+        longest waiting first, and take them out of the queue.
+        """
+        pairs = []
+        for entry in self.entries():
+            if entry["user_id"] not in self._entries:
+                continue  # Paired earlier in this pass
+            match = self.find_match(entry["user_id"], now=now)
+            if match is not None:
+                await self.pair(entry["user_id"], match["user_id"], now=now)
+                pairs.append((entry, match))
+        return pairs
+
+    async def stats(self) -> tuple[dict, dict]:
+        """Hour-of-week counts and the wait histogram, from the rollups."""
+        async with DatabaseConnection(self.db_name) as cur:
+            return await read_rollups(cur)
+
+    def start(self, on_expire, on_pair=None):
+        """
+        Run the background sweeper; ``await on_expire(entries)`` is called with
+        each batch of expired entries and ``await on_pair(pairs)`` with
+        ``(entry, entry)`` pairs made while players waited.
+        """
+        self._on_expire = on_expire
+        self._on_pair = on_pair
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.ensure_future(self._sweep_loop())
+
+    async def _sweep_loop(self):
+        next_rematch = time.time() + self.rematch_interval
+        while True:
+            self._wake.clear()
+            if len(self._entries) < 2 or self._on_pair is None:
+                next_rematch = time.time() + self.rematch_interval
+                deadlines = [self._next_expiry()]
+            else:
+                deadlines = [self._next_expiry(), next_rematch]
+            deadlines = [deadline for deadline in deadlines if deadline is not None]
+            timeout = max(min(deadlines) - time.time(), 0) if deadlines else None
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+                continue  # Something was queued; recompute the deadline
+            except asyncio.TimeoutError:
+                pass
+
+            try:
+                expired = await self.expire()
+                if expired and self._on_expire is not None:
+                    await self._on_expire(expired)
+                if self._on_pair is not None and time.time() >= next_rematch:
+                    next_rematch = time.time() + self.rematch_interval
+                    pairs = await self.pair_waiting()
+                    if pairs:
+                        await self._on_pair(pairs)
+            except Exception as e:
+                logger.error(f"Error in LFG queue background task: {e}")
+                await asyncio.sleep(5)
+
+    async def close(self):
+        """Stop the sweeper (called on shutdown); the queue stays on disk."""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+
+
+lfg_queue = LFGQueue()
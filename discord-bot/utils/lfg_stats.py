@@ -0,0 +1,126 @@
+"""Append-only LFG event log with incrementally maintained rollups."""
+
+import datetime
+
+# Rollup column for each event kind in lfg_hourly
+EVENT_COLUMNS = {
+    "join": "joins",
+    "pair": "pairs",
+    "expire": "expires",
+    "cancel": "cancels",
+}
+
+# Waits are bucketed by whole minute; everything from here up shares a bucket
+MAX_WAIT_BUCKET = 240
+
+DAY_NAMES = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+HEAT_SHADES = " ░▒▓█"
+
+
+def hour_of_week(timestamp: float) -> int:
+    """0 for Monday 00:00-00:59 (bot's local time) up to 167 for Sunday 23:00."""
+    moment = datetime.datetime.fromtimestamp(timestamp)
+    return moment.weekday() * 24 + moment.hour
+
+
+async def record_events(cur, events):
+    """
+    Append ``(kind, user_id, at, wait)`` events and fold them into the rollups.
+
+    Runs on the caller's cursor, so events are written in the same
+    transaction as the queue change they describe. ``wait`` is the seconds
+    a player spent queued before a ``pair`` event, otherwise ``None``.
+    """
+    events = list(events)
+    if not events:
+        return
+    await cur.executemany(
+        "INSERT INTO lfg_events (kind, user_id, at, wait) VALUES (?, ?, ?, ?)",
+        events,
+    )
+    for kind, _, at, wait in events:
+        column = EVENT_COLUMNS[kind]
+        await cur.execute(
+            f"""INSERT INTO lfg_hourly (slot, {column}) VALUES (?, 1)
+                ON CONFLICT(slot) DO UPDATE SET {column} = {column} + 1""",
+            (hour_of_week(at),),
+        )
+        if kind == "pair" and wait is not None:
+            await cur.execute(
+                """INSERT INTO lfg_waits (minutes, players) VALUES (?, 1)
+                   ON CONFLICT(minutes) DO UPDATE SET players = players + 1""",
+                (min(int(wait // 60), MAX_WAIT_BUCKET),),
+            )
+
+
+async def read_rollups(cur) -> tuple[dict, dict]:
+    """
+    ``({slot: {"joins", "pairs", "expires", "cancels"}}, {minutes: players})``
+    from the rollup tables (at most 168 + 241 rows, however long the log).
+    """
+    await cur.execute("SELECT slot, joins, pairs, expires, cancels FROM lfg_hourly")
+    hourly = {
+        slot: dict(zip(EVENT_COLUMNS.values(), counts))
+        for slot, *counts in await cur.fetchall()
+    }
+    await cur.execute("SELECT minutes, players FROM lfg_waits")
+    waits = dict(await cur.fetchall())
+    return hourly, waits
+
+
+def median_wait(waits: dict) -> float | None:
+    """Median minutes queued before a pairing, from the wait histogram."""
+    total = sum(waits.values())
+    if not total:
+        return None
+    middle = (total - 1) // 2
+    seen = 0
+    for minutes in sorted(waits):
+        seen += waits[minutes]
+        if seen > middle:
+            # Bucket m holds waits in [m, m + 1) minutes
+            return minutes + 0.5 if minutes < MAX_WAIT_BUCKET else float(minutes)
+    return None
+
+
+def peak_slots(hourly: dict, count: int = 3) -> list[tuple[int, int]]:
+    """The ``count`` busiest hour-of-week slots as ``(slot, joins)``."""
+    busy = [(counts["joins"], slot) for slot, counts in hourly.items() if counts["joins"]]
+    return [(slot, joins) for joins, slot in sorted(busy, reverse=True)[:count]]
+
+
+def slot_label(slot: int) -> str:
+    day, hour = divmod(slot, 24)
+    return f"{DAY_NAMES[day]} {hour:02d}:00"
+
+
+def heatmap(hourly: dict) -> str:
+    """Seven rows of 24 shaded cells, darker for more joins in that hour."""
+    busiest = max((counts["joins"] for counts in hourly.values()), default=0)
+    rows = ["    " + "".join(f"{hour:<6}" for hour in range(0, 24, 6))]
+    for day, name in enumerate(DAY_NAMES):
+        cells = []
+        for hour in range(24):
+            joins = hourly.get(day * 24 + hour, {}).get("joins", 0)
+            shade = 0
+            if joins:
+                shade = 1 + (len(HEAT_SHADES) - 2) * joins // busiest
+            cells.append(HEAT_SHADES[shade])
+        rows.append(f"{name} " + "".join(cells))
+    return "\n".join(rows)
+
+
+def summarize(hourly: dict, waits: dict) -> dict:
+    """Totals, peak hours and wait figures for ``!lfgstats``."""
+    totals = {
+        column: sum(counts[column] for counts in hourly.values())
+        for column in EVENT_COLUMNS.values()
+    }
+    paired = sum(waits.values())
+    quick = sum(players for minutes, players in waits.items() if minutes < 15)
+    return {
+        "totals": totals,
+        "peaks": peak_slots(hourly),
+        "median_wait": median_wait(waits),
+        "paired_within_15": quick / paired if paired else None,
+    }
@@ -0,0 +1,149 @@
+"""LFG watch subscriptions indexed by hour of the day."""
+
+import logging
+import re
+import time
+
+from utils.db import DatabaseConnection
+from utils.lfg_queue import LFG_DB
+
+logger = logging.getLogger("discord_bot")
+
+# A subscriber hears about at most one new LFG player per this many seconds
+NOTIFY_COOLDOWN = 30 * 60
+
+_HOUR = re.compile(r"^(\d{1,2})(?::00)?\s*(am|pm)?$")
+
+
+def parse_hour(text: str) -> int | None:
+    """``"19"``, ``"7pm"``, ``"7:00pm"`` or ``"12am"`` -> hour 0-23 (None if invalid)."""
+    match = _HOUR.match(text.strip().lower())
+    if not match:
+        return None
+    hour, suffix = int(match.group(1)), match.group(2)
+    if suffix:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if suffix == "pm" else 0)
+    elif hour == 24:
+        hour = 0
+    return hour if 0 <= hour <= 23 else None
+
+
+def parse_window(text: str) -> tuple[int, int] | None:
+    """
+    ``"7-10pm"``, ``"19-22"`` or ``"10pm-1am"`` -> ``(start, end)`` hours, end
+    exclusive. A suffix on the end only applies to a bare start.
+    """
+    parts = re.split(r"\s*(?:-|–|to)\s*", text.strip().lower())
+    if len(parts) != 2:
+        return None
+    start_text, end_text = parts
+    suffix = re.search(r"(am|pm)$", end_text)
+    if suffix and not re.search(r"(am|pm)$", start_text):
+        start_text += suffix.group(1)
+    start, end = parse_hour(start_text), parse_hour(end_text)
+    if start is None or end is None or start == end:
+        return None
+    return start, end
+
+
+def window_hours(start: int, end: int) -> list[int]:
+    """The hours ``start`` up to ``end`` (exclusive), wrapping past midnight."""
+    return [(start + offset) % 24 for offset in range((end - start) % 24)]
+
+
+def format_window(start: int, end: int) -> str:
+    return f"{start:02d}:00-{end:02d}:00"
+
+
+class WatchList:
+    """
+    Who wants a DM when someone looks for a game during certain hours.
+
+    Each player has at most one daily window of whole hours (bot's local
+    time), stored in ``lfg.db``. In memory a 24-slot index maps every hour
+    to the set of players watching it, so finding who to notify when
+    someone queues is one lookup, proportional to the number of matching
+    subscribers rather than all of them.
+    """
+
+    def __init__(self, db_name: str = LFG_DB, cooldown: float = NOTIFY_COOLDOWN):
+        self.db_name = db_name
+        self.cooldown = cooldown
+        self._windows: dict[int, tuple[int, int]] = {}
+        self._by_hour: list[set[int]] = [set() for _ in range(24)]
+        self._notified: dict[int, float] = {}
+
+    def __len__(self):
+        return len(self._windows)
+
+    def get(self, user_id: int) -> tuple[int, int] | None:
+        return self._windows.get(user_id)
+
+    def _index(self, user_id: int, start: int, end: int):
+        self._unindex(user_id)
+        self._windows[user_id] = (start, end)
+        for hour in window_hours(start, end):
+            self._by_hour[hour].add(user_id)
+
+    def _unindex(self, user_id: int):
+        window = self._windows.pop(user_id, None)
+        if window is not None:
+            for hour in window_hours(*window):
+                self._by_hour[hour].discard(user_id)
+
+    async def load(self):
+        """Rebuild the hour index from the database."""
+        async with DatabaseConnection(self.db_name) as cur:
+            await cur.execute(
+                "SELECT user_id, start_hour, end_hour FROM lfg_subscriptions"
+            )
+            rows = await cur.fetchall()
+        self._windows, self._by_hour = {}, [set() for _ in range(24)]
+        for user_id, start, end in rows:
+            self._index(user_id, start, end)
+        logger.info(f"Loaded {len(self._windows)} LFG watch subscriptions")
+
+    async def watch(self, user_id: int, start: int, end: int):
+        """Set (or replace) a player's daily watch window."""
+        async with DatabaseConnection(self.db_name) as cur:
+            await cur.execute(
+                """INSERT OR REPLACE INTO lfg_subscriptions
+                   (user_id, start_hour, end_hour) VALUES (?, ?, ?)""",
+                (user_id, start, end),
+            )
+        self._index(user_id, start, end)
+
+    async def unwatch(self, user_id: int) -> bool:
+        """Drop a player's subscription; False if they had none."""
+        if user_id not in self._windows:
+            return False
+        async with DatabaseConnection(self.db_name) as cur:
+            await cur.execute(
+                "DELETE FROM lfg_subscriptions WHERE user_id = ?", (user_id,)
+            )
+        self._unindex(user_id)
+        return True
+
+    def subscribers(self, hour: int) -> set[int]:
+        return set(self._by_hour[hour % 24])
+
+    def to_notify(self, hour: int, exclude=(), now: float = None) -> list[int]:
+        """
+        Subscribers watching ``hour`` who haven't been notified within the
+        cooldown, marked as notified now.
+        """
+        now = time.time() if now is None else now
+        targets = [
+            user_id
+            for user_id in self._by_hour[hour % 24]
+            if user_id not in exclude
+            and now - self._notified.get(user_id, 0) >= self.cooldown
+        ]
+        for user_id in targets:
+            self._notified[user_id] = now
+        return targets
+
+
+lfg_watch = WatchList()
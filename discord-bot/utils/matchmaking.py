@@ -0,0 +1,101 @@
+"""Rating-ordered LFG matchmaking with a search window that widens over time."""
+
+import bisect
+import time
+
+# Elo gap accepted straight away, and how much it grows per minute of waiting
+BASE_WINDOW = 100
+WIDEN_PER_MINUTE = 25
+
+
+class Matchmaker:
+    """
+    Queued players sorted by rating, for closest-rating pairing.
+
+    Two players are compatible when their rating gap fits the wider of their
+    two search windows; a window starts at ``base_window`` and grows by
+    ``widen_per_minute`` for every minute the player has waited, so nobody
+    waits forever just because their rating is unusual.
+
+    ``best_match`` bisects to the searcher's rating and walks outwards
+    through the nearest ratings, stopping once the gap is beyond what even
+    the longest-waiting player would accept. Finding a match is O(log n)
+    plus the few close-rated players passed over because they only just
+    joined; adding and removing players is a bisect plus a list insert.
+    """
+
+    def __init__(
+        self,
+        base_window: float = BASE_WINDOW,
+        widen_per_minute: float = WIDEN_PER_MINUTE,
+    ):
+        self.base_window = base_window
+        self.widen_per_minute = widen_per_minute
+        self._sorted: list[tuple[float, int]] = []
+        # user_id -> (rating, joined); dict order is join order
+        self._players: dict[int, tuple[float, float]] = {}
+
+    def __len__(self):
+        return len(self._players)
+
+    def __contains__(self, user_id):
+        return user_id in self._players
+
+    def window(self, waited: float) -> float:
+        """Largest rating gap accepted after waiting ``waited`` seconds."""
+        return self.base_window + self.widen_per_minute * max(waited, 0) / 60
+
+    def add(self, user_id: int, rating: float, joined: float = None):
+        self.discard(user_id)
+        joined = time.time() if joined is None else joined
+        self._players[user_id] = (rating, joined)
+        bisect.insort(self._sorted, (rating, user_id))
+
+    def discard(self, user_id: int):
+        entry = self._players.pop(user_id, None)
+        if entry is None:
+            return
+        index = bisect.bisect_left(self._sorted, (entry[0], user_id))
+        del self._sorted[index]
+
+    def best_match(
+        self,
+        rating: float,
+        waited: float = 0,
+        exclude: int = None,
+        now: float = None,
+        accept=None,
+    ) -> int | None:
+        """
+        The closest-rated compatible player for someone with ``rating`` who
+        has waited ``waited`` seconds (0 for a new arrival). ``accept``, if
+        given, is an extra check on a candidate's user id.
+        """
+        now = time.time() if now is None else now
+        own_window = self.window(waited)
+        oldest = next(iter(self._players.values()), None)
+        if oldest is None:
+            return None
+        limit = max(own_window, self.window(now - oldest[1]))
+
+        index = bisect.bisect_left(self._sorted, (rating, -1))
+        low, high = index - 1, index
+        while low >= 0 or high < len(self._sorted):
+            below = rating - self._sorted[low][0] if low >= 0 else None
+            above = self._sorted[high][0] - rating if high < len(self._sorted) else None
+            if above is None or (below is not None and below <= above):
+                gap, user_id = below, self._sorted[low][1]
+                low -= 1
+            else:
+                gap, user_id = above, self._sorted[high][1]
+                high += 1
+            if gap > limit:
+                return None
+            if user_id == exclude:
+                continue
+            joined = self._players[user_id][1]
+            if gap <= max(own_window, self.window(now - joined)) and (
+                accept is None or accept(user_id)
+            ):
+                return user_id
+        return None
@@ -0,0 +1,309 @@
+"""Versioned schema migrations, run once at startup.
+
+Each database tracks the last migration it has applied in
+``PRAGMA user_version``. A migration is either a list of SQL statements or
+an ``async def step(cur)``; every step runs in its own transaction together
+with the version bump, so an interrupted upgrade resumes where it stopped.
+
+To change a schema, append a new step to the database's list. Never edit a
+step that has already shipped.
+"""
+
+import logging
+
+from utils.db import DatabaseConnection
+
+logger = logging.getLogger("discord_bot")
+
+
+async def _add_deck_id_columns(cur):
+    """Match rows reference cached decks by id (older files may already have it)."""
+    for table in ("match_records", "solo_match_reports"):
+        await cur.execute(f"PRAGMA table_info({table})")
+        if "deck_id" not in [column[1] for column in await cur.fetchall()]:
+            await cur.execute(f"ALTER TABLE {table} ADD COLUMN deck_id TEXT")
+
+
+async def _backfill_deck_cache(cur):
+    """Move inline deck JSON copies into deck_cache."""
+    from utils.deck_cache import backfill_deck_cache
+
+    await backfill_deck_cache("match_records.db")
+
+
+async def _import_legacy_tournaments(cur):
+    """Copy data/tournaments.json into the new tables."""
+    from utils.tournaments import import_legacy_tournaments
+
+    await import_legacy_tournaments(cur)
+
+
+MIGRATIONS = {
+    "match_records.db": [
+        # 1: baseline schema
+        [
+            """CREATE TABLE IF NOT EXISTS match_records
+               (reporter_id INTEGER,
+                winner_id INTEGER,
+                winner_display_name TEXT,
+                losser_id INTEGER,
+                losser_display_name TEXT,
+                did_win BOOLEAN,
+                timestamp TEXT,
+                first_player TEXT,
+                match_time INTEGER,
+                curiosa_url TEXT,
+                match_comment TEXT,
+                json_deck_data TEXT
+               )""",
+            """CREATE TABLE IF NOT EXISTS solo_match_reports
+               (reporter_id INTEGER,
+                reporter_name TEXT,
+                opponent_name TEXT,
+                is_winner BOOLEAN,
+                first_player TEXT,
+                match_time INTEGER,
+                curiosa_link TEXT,
+                match_comment TEXT,
+                report_date DATETIME,
+                json_deck_data TEXT
+               )""",
+            """CREATE TABLE IF NOT EXISTS challenge_matches
+               (match_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                challenger_id INTEGER NOT NULL,
+                challenged_id INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                match_time DATETIME NOT NULL,
+                winner_id INTEGER,
+                curiosa_url TEXT,
+                match_comment TEXT,
+                json_deck_data TEXT
+               )""",
+        ],
+        # 2: decks are stored once and referenced from match rows by deck_id
+        [
+            """CREATE TABLE IF NOT EXISTS deck_cache
+               (deck_id TEXT PRIMARY KEY,
+                json_deck_data TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                fetched_at TEXT NOT NULL
+               )""",
+        ],
+        # 3: match rows point at deck_cache
+        _add_deck_id_columns,
+        # 4: data migration for rows reported before the deck cache existed
+        _backfill_deck_cache,
+        # 5: indexes for per-player history lookups
+        [
+            "CREATE INDEX IF NOT EXISTS idx_match_records_reporter "
+            "ON match_records (reporter_id)",
+            "CREATE INDEX IF NOT EXISTS idx_match_records_winner "
+            "ON match_records (winner_id, timestamp)",
+            "CREATE INDEX IF NOT EXISTS idx_match_records_losser "
+            "ON match_records (losser_id, timestamp)",
+            "CREATE INDEX IF NOT EXISTS idx_match_records_timestamp "
+            "ON match_records (timestamp)",
+            "CREATE INDEX IF NOT EXISTS idx_solo_match_reports_reporter "
+            "ON solo_match_reports (reporter_id)",
+        ],
+    ],
+    "elo.db": [
+        # 1: baseline schema
+        [
+            """CREATE TABLE IF NOT EXISTS overall_standings
+               (user_id INTEGER PRIMARY KEY,
+                user_display_name TEXT,
+                elo INTEGER DEFAULT 1500
+               )""",
+        ],
+        # 2: leaderboard ordering
+        [
+            "CREATE INDEX IF NOT EXISTS idx_overall_standings_elo "
+            "ON overall_standings (elo)",
+        ],
+    ],
+    "fart_scores.db": [
+        # 1: baseline schema
+        [
+            """CREATE TABLE IF NOT EXISTS fart_scores
+               (user_id INTEGER PRIMARY KEY,
+                user_display_name TEXT,
+                date_last_updated TEXT,
+                score INTEGER
+               )""",
+            """CREATE TABLE IF NOT EXISTS fart_history
+               (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                username TEXT NOT NULL,
+                fart_type TEXT NOT NULL,
+                roll INTEGER NOT NULL,
+                timestamp TEXT NOT NULL
+               )""",
+            """CREATE TABLE IF NOT EXISTS command_usage
+               (user_id INTEGER,
+                command_name TEXT,
+                last_used TEXT,
+                PRIMARY KEY (user_id, command_name)
+               )""",
+            """CREATE TABLE IF NOT EXISTS fart_leader_only_once
+               (user_id INTEGER PRIMARY KEY,
+                user_display_name TEXT
+               )""",
+        ],
+        # 2: shop items
+        [
+            """CREATE TABLE IF NOT EXISTS protection_status
+               (user_id INTEGER PRIMARY KEY,
+                protected_until TIMESTAMP
+               )""",
+            """CREATE TABLE IF NOT EXISTS lucky_charms
+               (user_id INTEGER PRIMARY KEY,
+                activated_at TEXT
+               )""",
+            """CREATE TABLE IF NOT EXISTS lucky_charm_usage
+               (user_id INTEGER,
+                command_name TEXT,
+                last_used TEXT,
+                PRIMARY KEY (user_id, command_name)
+               )""",
+        ],
+        # 3: leaderboard ordering and last-fart lookups
+        [
+            "CREATE INDEX IF NOT EXISTS idx_fart_scores_score ON fart_scores (score)",
+            "CREATE INDEX IF NOT EXISTS idx_fart_history_user "
+            "ON fart_history (user_id, timestamp)",
+        ],
+    ],
+    "tournaments.db": [
+        # 1: baseline schema (replaces data/tournaments.json)
+        [
+            """CREATE TABLE IF NOT EXISTS tournaments
+               (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                format TEXT,
+                max_players INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                winner_id INTEGER,
+                created_at TEXT NOT NULL
+               )""",
+            """CREATE TABLE IF NOT EXISTS tournament_players
+               (tournament_id INTEGER NOT NULL,
+                user_id INTEGER NOT NULL,
+                joined_at TEXT NOT NULL,
+                PRIMARY KEY (tournament_id, user_id)
+               )""",
+            """CREATE TABLE IF NOT EXISTS tournament_matches
+               (tournament_id INTEGER NOT NULL,
+                match_id INTEGER NOT NULL,
+                round INTEGER NOT NULL,
+                player1_id INTEGER,
+                player2_id INTEGER,
+                winner_id INTEGER,
+                status TEXT NOT NULL,
+                details TEXT,
+                PRIMARY KEY (tournament_id, match_id)
+               )""",
+            "CREATE INDEX IF NOT EXISTS idx_tournaments_name "
+            "ON tournaments (name COLLATE NOCASE)",
+            "CREATE INDEX IF NOT EXISTS idx_tournament_players_user "
+            "ON tournament_players (user_id)",
+            "CREATE INDEX IF NOT EXISTS idx_tournament_matches_round "
+            "ON tournament_matches (tournament_id, round, status)",
+            "CREATE INDEX IF NOT EXISTS idx_tournament_matches_player1 "
+            "ON tournament_matches (player1_id, status)",
+            "CREATE INDEX IF NOT EXISTS idx_tournament_matches_player2 "
+            "ON tournament_matches (player2_id, status)",
+        ],
+        # 2: data migration from the old JSON file
+        _import_legacy_tournaments,
+        # 3: precomputed elimination brackets (where each winner goes next)
+        [
+            "ALTER TABLE tournament_matches ADD COLUMN next_match_id INTEGER",
+            "ALTER TABLE tournament_matches ADD COLUMN next_slot INTEGER",
+        ],
+    ],
+    "lfg.db": [
+        # 1: baseline schema (the queue used to live in memory only)
+        [
+            """CREATE TABLE IF NOT EXISTS lfg_queue
+               (user_id INTEGER PRIMARY KEY,
+                joined_at TEXT NOT NULL,
+                minutes INTEGER NOT NULL,
+                expires_at REAL NOT NULL
+               )""",
+        ],
+        # 2: availability windows that can start later than the join
+        [
+            "ALTER TABLE lfg_queue ADD COLUMN available_from REAL",
+            "UPDATE lfg_queue SET available_from = expires_at - minutes * 60",
+        ],
+        # 3: append-only event log and its hour-of-week / wait rollups
+        [
+            """CREATE TABLE IF NOT EXISTS lfg_events
+               (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                user_id INTEGER NOT NULL,
+                at REAL NOT NULL,
+                wait REAL
+               )""",
+            """CREATE TABLE IF NOT EXISTS lfg_hourly
+               (slot INTEGER PRIMARY KEY,
+                joins INTEGER NOT NULL DEFAULT 0,
+                pairs INTEGER NOT NULL DEFAULT 0,
+                expires INTEGER NOT NULL DEFAULT 0,
+                cancels INTEGER NOT NULL DEFAULT 0
+               )""",
+            """CREATE TABLE IF NOT EXISTS lfg_waits
+               (minutes INTEGER PRIMARY KEY,
+                players INTEGER NOT NULL DEFAULT 0
+               )""",
+        ],
+        # 4: !lfgwatch subscriptions (daily hour windows, end exclusive)
+        [
+            """CREATE TABLE IF NOT EXISTS lfg_subscriptions
+               (user_id INTEGER PRIMARY KEY,
+                start_hour INTEGER NOT NULL,
+                end_hour INTEGER NOT NULL
+               )""",
+        ],
+    ],
+}
+
+
+async def migrate(db_name: str, steps: list) -> int:
+    """Apply the steps a database hasn't seen yet. Returns how many ran."""
+    async with DatabaseConnection(db_name) as cur:
+        await cur.execute("PRAGMA user_version")
+        version = (await cur.fetchone())[0]
+
+    if version > len(steps):
+        logger.warning(
+            f"{db_name} is at schema version {version}, newer than this bot "
+            f"knows about ({len(steps)})"
+        )
+        return 0
+
+    for target, step in enumerate(steps[version:], start=version + 1):
+        async with DatabaseConnection(db_name) as cur:
+            await cur.execute("BEGIN")
+            if callable(step):
+                await step(cur)
+            else:
+                for statement in step:
+                    await cur.execute(statement)
+            # PRAGMA doesn't take bound parameters
+            await cur.execute(f"PRAGMA user_version = {int(target)}")
+        logger.info(f"Migrated {db_name} to schema version {target}")
+
+    applied = len(steps) - version
+    if applied:
+        # Reclaim space freed by data migrations; VACUUM can't run in a transaction
+        async with DatabaseConnection(db_name) as cur:
+            await cur.execute("VACUUM")
+    return applied
+
+
+async def run_migrations(migrations: dict = MIGRATIONS):
+    """Bring every database up to date. Called once before the bot connects."""
+    for db_name, steps in migrations.items():
+        await migrate(db_name, steps)
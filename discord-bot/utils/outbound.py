@@ -0,0 +1,106 @@
+"""Paced delivery of bulk Discord messages (DMs, announcements)."""
+
+import asyncio
+import logging
+import time
+
+import discord
+
+logger = logging.getLogger("discord_bot")
+
+# Discord's limit on message content length
+MESSAGE_LIMIT = 2000
+
+
+def pack_messages(lines, limit: int = MESSAGE_LIMIT) -> list[str]:
+    """
+    Join lines into as few messages as fit under Discord's length limit.
+
+    A single line longer than ``limit`` is split on its own.
+    """
+    messages = []
+    current = ""
+    for line in lines:
+        while len(line) > limit:
+            if current:
+                messages.append(current)
+                current = ""
+            messages.append(line[:limit])
+            line = line[limit:]
+        if current and len(current) + 1 + len(line) > limit:
+            messages.append(current)
+            current = ""
+        current = f"{current}\n{line}" if current else line
+    if current:
+        messages.append(current)
+    return messages
+
+
+class OutboundQueue:
+    """
+    Sends messages in the background at a steady rate.
+
+    ``send()`` returns immediately; a single worker delivers queued messages
+    at most ``rate`` per ``per`` seconds so a burst (every player in a
+    tournament getting a DM) doesn't run into Discord's rate limits.
+    Failures, e.g. a user with DMs closed, are logged and dropped.
+    """
+
+    def __init__(self, rate: int = 5, per: float = 5.0, max_size: int = 1000):
+        self.rate = rate
+        self.per = per
+        self._queue: asyncio.Queue = asyncio.Queue(max_size)
+        self._sent: list[float] = []
+        self._worker = None
+
+    def __len__(self):
+        return self._queue.qsize()
+
+    def send(self, destination: discord.abc.Messageable, *args, **kwargs):
+        """
+        Queue ``destination.send(*args, **kwargs)``.
+
+        Returns:
+            asyncio.Future: resolves to the sent message, or None on failure
+        """
+        future = asyncio.get_event_loop().create_future()
+        try:
+            self._queue.put_nowait((destination, args, kwargs, future))
+        except asyncio.QueueFull:
+            logger.warning(f"Outbound queue full; dropping message to {destination}")
+            future.set_result(None)
+            return future
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.ensure_future(self._run())
+        return future
+
+    async def _wait_for_slot(self):
+        now = time.monotonic()
+        self._sent = [t for t in self._sent if now - t < self.per]
+        if len(self._sent) >= self.rate:
+            await asyncio.sleep(self.per - (now - self._sent[0]))
+        self._sent.append(time.monotonic())
+
+    async def _run(self):
+        while True:
+            destination, args, kwargs, future = await self._queue.get()
+            await self._wait_for_slot()
+            try:
+                message = await destination.send(*args, **kwargs)
+            except discord.Forbidden:
+                logger.warning(f"Could not message {destination} - DMs might be disabled")
+                message = None
+            except Exception as e:
+                logger.error(f"Error sending queued message to {destination}: {e}")
+                message = None
+            if not future.done():
+                future.set_result(message)
+
+    async def close(self):
+        """Stop the worker (called on shutdown); unsent messages are dropped."""
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+
+
+outbound = OutboundQueue()
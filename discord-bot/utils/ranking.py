@@ -0,0 +1,239 @@
+"""In-memory leaderboards over a score column, kept in sync with SQLite."""
+
+import bisect
+import logging
+import random
+from collections import Counter
+
+from utils.db import DatabaseConnection
+
+logger = logging.getLogger("discord_bot")
+
+# Elo of a player who hasn't reported a match yet (the elo column's default)
+DEFAULT_ELO = 1500
+
+
+class FenwickTree:
+    """Binary indexed tree of counts: point updates and prefix sums in O(log n)."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._tree = [0] * (size + 1)
+
+    def add(self, index: int, delta: int):
+        index += 1
+        while index <= self.size:
+            self._tree[index] += delta
+            index += index & -index
+
+    def prefix_sum(self, index: int) -> int:
+        """Sum of counts at positions ``0..index`` inclusive."""
+        index = min(index, self.size - 1) + 1
+        total = 0
+        while index > 0:
+            total += self._tree[index]
+            index -= index & -index
+        return total
+
+    def find(self, k: int) -> int:
+        """Smallest position whose prefix sum exceeds ``k`` (0-based order statistic)."""
+        position = 0
+        step = 1 << self.size.bit_length()
+        while step:
+            nxt = position + step
+            if nxt <= self.size and self._tree[nxt] <= k:
+                position = nxt
+                k -= self._tree[nxt]
+            step >>= 1
+        return position
+
+
+class ScoreIndex:
+    """
+    Ordered leaderboard for one ``(user_id, score)`` table without querying
+    SQLite.
+
+    Scores are integers, so each score gets its own bucket in a Fenwick tree;
+    the bucket range starts at ``[0, span)`` and doubles whenever a score
+    lands outside it. Each bucket also keeps its members sorted by user id,
+    which gives a total order (score descending, then user id) for
+    positional queries: ``top_n``, ``neighbor_above``/``neighbor_below`` and
+    ``random_ahead``/``random_behind``.
+
+    ``rank_of`` matches the old ``SELECT COUNT(*) ... WHERE score > ?`` + 1
+    semantics, so tied players share a rank; ``position_of`` does not.
+
+    Every write to the table must be followed by ``refresh()`` for the users
+    it touched, ideally inside the same ``DatabaseConnection`` block.
+    """
+
+    def __init__(
+        self,
+        db_name: str,
+        table: str,
+        column: str,
+        name_column: str = "user_display_name",
+        span: int = 1024,
+    ):
+        self.db_name = db_name
+        self.table = table
+        self.column = column
+        self.name_column = name_column
+        self._span = span
+        self._scores: dict[int, int] = {}
+        self._names: dict[int, str] = {}
+        self._members: dict[int, list[int]] = {}
+        self._rebuild(0, span)
+
+    def _rebuild(self, low: int, size: int):
+        self._low = low
+        self._tree = FenwickTree(size)
+        for score, count in Counter(self._scores.values()).items():
+            self._tree.add(score - low, count)
+
+    def _ensure_range(self, score: int):
+        low, high = self._low, self._low + self._tree.size
+        if low <= score < high:
+            return
+        size = self._tree.size
+        while not (low <= score < low + size):
+            size *= 2
+            if score < low:
+                low = min(score, high - size)
+        self._rebuild(low, size)
+
+    def __len__(self):
+        return len(self._scores)
+
+    def __contains__(self, user_id):
+        return user_id in self._scores
+
+    def score_of(self, user_id: int) -> int | None:
+        return self._scores.get(user_id)
+
+    def name_of(self, user_id: int) -> str | None:
+        return self._names.get(user_id)
+
+    def set(self, user_id: int, score: int | None, name: str | None = None):
+        """Record a user's current score (``None`` removes them)."""
+        old = self._scores.pop(user_id, None)
+        if old is not None:
+            self._tree.add(old - self._low, -1)
+            members = self._members[old]
+            members.pop(bisect.bisect_left(members, user_id))
+            if not members:
+                del self._members[old]
+        if score is None:
+            self._names.pop(user_id, None)
+            return
+        score = int(score)
+        self._ensure_range(score)
+        self._scores[user_id] = score
+        self._tree.add(score - self._low, 1)
+        bisect.insort(self._members.setdefault(score, []), user_id)
+        if name is not None:
+            self._names[user_id] = name
+
+    def discard(self, user_id: int):
+        self.set(user_id, None)
+
+    def count_above(self, score: int) -> int:
+        """Number of users with a strictly higher score."""
+        if score < self._low:
+            return len(self._scores)
+        return len(self._scores) - self._tree.prefix_sum(score - self._low)
+
+    def rank_of(self, user_id: int) -> int | None:
+        """1-based rank of a user, or None if they have no score."""
+        score = self._scores.get(user_id)
+        if score is None:
+            return None
+        return self.count_above(score) + 1
+
+    def position_of(self, user_id: int) -> int | None:
+        """0-based position in leaderboard order, or None if unranked."""
+        score = self._scores.get(user_id)
+        if score is None:
+            return None
+        members = self._members[score]
+        return self.count_above(score) + bisect.bisect_left(members, user_id)
+
+    def user_at(self, position: int) -> tuple[int, int] | None:
+        """``(user_id, score)`` at a 0-based leaderboard position."""
+        if not 0 <= position < len(self._scores):
+            return None
+        # The tree counts from the lowest score up
+        from_bottom = len(self._scores) - 1 - position
+        bucket = self._tree.find(from_bottom)
+        score = bucket + self._low
+        members = self._members[score]
+        offset = from_bottom - (self._tree.prefix_sum(bucket - 1) if bucket else 0)
+        return members[len(members) - 1 - offset], score
+
+    def leader(self) -> tuple[int, int] | None:
+        return self.user_at(0)
+
+    def top_n(self, n: int) -> list[tuple[int, int]]:
+        """The first ``n`` ``(user_id, score)`` pairs, highest score first."""
+        return [self.user_at(i) for i in range(min(n, len(self._scores)))]
+
+    def neighbor_above(self, user_id: int) -> tuple[int, int] | None:
+        position = self.position_of(user_id)
+        return self.user_at(position - 1) if position else None
+
+    def neighbor_below(self, user_id: int) -> tuple[int, int] | None:
+        position = self.position_of(user_id)
+        return self.user_at(position + 1) if position is not None else None
+
+    def random_ahead(self, user_id: int) -> tuple[int, int] | None:
+        position = self.position_of(user_id)
+        return self.user_at(random.randrange(position)) if position else None
+
+    def random_behind(self, user_id: int) -> tuple[int, int] | None:
+        position = self.position_of(user_id)
+        if position is None or position == len(self._scores) - 1:
+            return None
+        return self.user_at(random.randrange(position + 1, len(self._scores)))
+
+    async def load(self):
+        """Rebuild the index from the table."""
+        async with DatabaseConnection(self.db_name) as cur:
+            await cur.execute(
+                f"SELECT user_id, {self.column}, {self.name_column} FROM {self.table} "
+                f"WHERE {self.column} IS NOT NULL"
+            )
+            rows = await cur.fetchall()
+
+        self._scores, self._names, self._members = {}, {}, {}
+        self._rebuild(0, self._span)
+        for user_id, score, name in rows:
+            self.set(user_id, score, name)
+        logger.info(f"Loaded {len(self._scores)} {self.table} scores into rank index")
+
+    async def refresh(self, *user_ids: int):
+        """Re-read the given users' scores after a write."""
+        user_ids = {user_id for user_id in user_ids if user_id is not None}
+        if not user_ids:
+            return
+        placeholders = ",".join("?" * len(user_ids))
+        async with DatabaseConnection(self.db_name) as cur:
+            await cur.execute(
+                f"SELECT user_id, {self.column}, {self.name_column} FROM {self.table} "
+                f"WHERE user_id IN ({placeholders})",
+                tuple(user_ids),
+            )
+            rows = await cur.fetchall()
+
+        found = {user_id: (score, name) for user_id, score, name in rows}
+        for user_id in user_ids:
+            self.set(user_id, *found.get(user_id, (None, None)))
+
+
+fart_ranks = ScoreIndex("fart_scores.db", "fart_scores", "score")
+elo_ranks = ScoreIndex("elo.db", "overall_standings", "elo")
+
+
+async def load_rankings():
+    """Populate the leaderboards at startup (after migrations)."""
+    await fart_ranks.load()
+    await elo_ranks.load()
@@ -0,0 +1,112 @@
+"""Keeps the fart leader role on whoever tops the leaderboard."""
+
+import asyncio
+import logging
+
+import discord
+
+from utils.ranking import ScoreIndex, fart_ranks
+
+logger = logging.getLogger("discord_bot")
+
+
+class LeaderRoleSync:
+    """
+    Moves a role to the current leader only when leadership changes.
+
+    ``request()`` is cheap to call after every score write: if the leader is
+    the one we last synced it returns immediately, otherwise it schedules a
+    sync ``delay`` seconds later so a burst of writes (taxes, bob-ombs)
+    results in one round of role edits. A sync only touches
+    ``role.members`` instead of scanning the whole guild.
+    """
+
+    def __init__(
+        self,
+        bot,
+        guild_id: int,
+        role_id: int,
+        leaderboard: ScoreIndex = fart_ranks,
+        delay: float = 2.0,
+    ):
+        self.bot = bot
+        self.guild_id = guild_id
+        self.role_id = role_id
+        self.leaderboard = leaderboard
+        self.delay = delay
+        self._current_leader_id = None
+        self._task = None
+
+    def _leader_id(self):
+        leader = self.leaderboard.leader()
+        return leader[0] if leader else None
+
+    def request(self):
+        """Ask for a sync; no-op if the leader hasn't changed."""
+        if self._leader_id() == self._current_leader_id:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._sync_later())
+
+    async def _sync_later(self):
+        await asyncio.sleep(self.delay)
+        # Changes that land while we're editing roles schedule a fresh sync
+        self._task = None
+        try:
+            await self.sync()
+        except Exception as e:
+            logger.error(f"Error syncing leader role: {e}")
+
+    async def sync(self):
+        """Give the role to the current leader and take it from anyone else."""
+        guild = self.bot.get_guild(self.guild_id)
+        if not guild:
+            logger.warning("Guild not found.")
+            return
+
+        leader_role = guild.get_role(self.role_id)
+        if not leader_role:
+            logger.warning("Leader role not found.")
+            return
+
+        leader_id = self._leader_id()
+        if leader_id is None:
+            logger.info("No fart scores found.")
+            return
+
+        new_leader = guild.get_member(leader_id)
+        if not new_leader:
+            logger.warning("New leader not found in the guild.")
+            return
+
+        for member in leader_role.members:
+            if member.id == leader_id:
+                continue
+            try:
+                await member.remove_roles(leader_role)
+                logger.info(f"Removed leader role from {member.display_name}.")
+            except discord.errors.Forbidden:
+                logger.warning(
+                    f"Missing permissions to remove role from {member.display_name}."
+                )
+            except Exception as e:
+                logger.error(
+                    f"An error occurred removing role from {member.display_name}: {e}"
+                )
+
+        if leader_role not in new_leader.roles:
+            try:
+                await new_leader.add_roles(leader_role)
+                logger.info(f"Assigned leader role to {new_leader.display_name}.")
+            except discord.errors.Forbidden:
+                logger.warning(
+                    f"Missing permissions to assign role to {new_leader.display_name}."
+                )
+                return
+            except Exception as e:
+                logger.error(
+                    f"An error occurred assigning role to {new_leader.display_name}: {e}"
+                )
+                return
+
+        self._current_leader_id = leader_id
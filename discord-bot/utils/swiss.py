@@ -0,0 +1,536 @@
+"""Swiss-system standings and pairings."""
+
+import math
+
+# A bye is recorded as a match whose second player is None
+BYE = None
+
+
+def max_weight_matching(edges, maxcardinality: bool = False) -> list[int]:
+    """
+    Maximum-weight matching in a general graph (Edmonds' blossom algorithm).
+
+    Follows Joris van Rantwijk's public-domain ``mwmatching.py``; runs in
+    O(n^3). Weights must be integers.
+
+    Args:
+        edges: ``(i, j, weight)`` tuples over vertices ``0..n-1``
+        maxcardinality: Only consider matchings of maximum size
+
+    Returns:
+        list[int]: ``mate[v]`` is v's partner, or -1 if unmatched
+    """
+    if not edges:
+        return []
+
+    # Doubling keeps every dual variable and slack even, so halving is exact
+    edges = [(i, j, 2 * w) for i, j, w in edges]
+    nedge = len(edges)
+    nvertex = 1 + max(max(i, j) for i, j, _ in edges)
+    maxweight = max(0, max(w for _, _, w in edges))
+
+    endpoint = [edges[p // 2][p % 2] for p in range(2 * nedge)]
+    neighbend = [[] for _ in range(nvertex)]
+    for k, (i, j, _) in enumerate(edges):
+        neighbend[i].append(2 * k + 1)
+        neighbend[j].append(2 * k)
+
+    mate = [-1] * nvertex
+    label = [0] * (2 * nvertex)
+    labelend = [-1] * (2 * nvertex)
+    inblossom = list(range(nvertex))
+    blossomparent = [-1] * (2 * nvertex)
+    blossomchilds = [None] * (2 * nvertex)
+    blossombase = list(range(nvertex)) + [-1] * nvertex
+    blossomendps = [None] * (2 * nvertex)
+    bestedge = [-1] * (2 * nvertex)
+    blossombestedges = [None] * (2 * nvertex)
+    unusedblossoms = list(range(nvertex, 2 * nvertex))
+    dualvar = [maxweight] * nvertex + [0] * nvertex
+    allowedge = [False] * nedge
+    queue = []
+
+    def slack(k):
+        i, j, w = edges[k]
+        return dualvar[i] + dualvar[j] - 2 * w
+
+    def blossom_leaves(b):
+        if b < nvertex:
+            yield b
+        else:
+            for t in blossomchilds[b]:
+                if t < nvertex:
+                    yield t
+                else:
+                    yield from blossom_leaves(t)
+
+    def assign_label(w, t, p):
+        b = inblossom[w]
+        label[w] = label[b] = t
+        labelend[w] = labelend[b] = p
+        bestedge[w] = bestedge[b] = -1
+        if t == 1:
+            queue.extend(blossom_leaves(b))
+        elif t == 2:
+            base = blossombase[b]
+            assign_label(endpoint[mate[base]], 1, mate[base] ^ 1)
+
+    def scan_blossom(v, w):
+        """Trace back from v and w; return the new blossom's base or -1."""
+        path = []
+        base = -1
+        while v != -1 or w != -1:
+            b = inblossom[v]
+            if label[b] & 4:
+                base = blossombase[b]
+                break
+            path.append(b)
+            label[b] = 5
+            if labelend[b] == -1:
+                v = -1
+            else:
+                v = endpoint[labelend[b]]
+                b = inblossom[v]
+                v = endpoint[labelend[b]]
+            if w != -1:
+                v, w = w, v
+        for b in path:
+            label[b] = 1
+        return base
+
+    def add_blossom(base, k):
+        v, w, _ = edges[k]
+        bb = inblossom[base]
+        bv = inblossom[v]
+        bw = inblossom[w]
+        b = unusedblossoms.pop()
+        blossombase[b] = base
+        blossomparent[b] = -1
+        blossomparent[bb] = b
+        blossomchilds[b] = path = []
+        blossomendps[b] = endps = []
+        while bv != bb:
+            blossomparent[bv] = b
+            path.append(bv)
+            endps.append(labelend[bv])
+            v = endpoint[labelend[bv]]
+            bv = inblossom[v]
+        path.append(bb)
+        path.reverse()
+        endps.reverse()
+        endps.append(2 * k)
+        while bw != bb:
+            blossomparent[bw] = b
+            path.append(bw)
+            endps.append(labelend[bw] ^ 1)
+            w = endpoint[labelend[bw]]
+            bw = inblossom[w]
+        label[b] = 1
+        labelend[b] = labelend[bb]
+        dualvar[b] = 0
+        for v in blossom_leaves(b):
+            if label[inblossom[v]] == 2:
+                queue.append(v)
+            inblossom[v] = b
+
+        bestedgeto = [-1] * (2 * nvertex)
+        for bv in path:
+            if blossombestedges[bv] is None:
+                nblists = [
+                    [p // 2 for p in neighbend[v]] for v in blossom_leaves(bv)
+                ]
+            else:
+                nblists = [blossombestedges[bv]]
+            for nblist in nblists:
+                for k in nblist:
+                    i, j, _ = edges[k]
+                    if inblossom[j] == b:
+                        i, j = j, i
+                    bj = inblossom[j]
+                    if (
+                        bj != b
+                        and label[bj] == 1
+                        and (bestedgeto[bj] == -1 or slack(k) < slack(bestedgeto[bj]))
+                    ):
+                        bestedgeto[bj] = k
+            blossombestedges[bv] = None
+            bestedge[bv] = -1
+        blossombestedges[b] = [k for k in bestedgeto if k != -1]
+        bestedge[b] = -1
+        for k in blossombestedges[b]:
+            if bestedge[b] == -1 or slack(k) < slack(bestedge[b]):
+                bestedge[b] = k
+
+    def expand_blossom(b, endstage):
+        for s in blossomchilds[b]:
+            blossomparent[s] = -1
+            if s < nvertex:
+                inblossom[s] = s
+            elif endstage and dualvar[s] == 0:
+                expand_blossom(s, endstage)
+            else:
+                for v in blossom_leaves(s):
+                    inblossom[v] = s
+
+        if not endstage and label[b] == 2:
+            # Relabel the sub-blossoms along the path through the expanded one
+            entrychild = inblossom[endpoint[labelend[b] ^ 1]]
+            j = blossomchilds[b].index(entrychild)
+            if j & 1:
+                j -= len(blossomchilds[b])
+                jstep = 1
+                endptrick = 0
+            else:
+                jstep = -1
+                endptrick = 1
+            p = labelend[b]
+            while j != 0:
+                label[endpoint[p ^ 1]] = 0
+                label[endpoint[blossomendps[b][j - endptrick] ^ endptrick ^ 1]] = 0
+                assign_label(endpoint[p ^ 1], 2, p)
+                allowedge[blossomendps[b][j - endptrick] // 2] = True
+                j += jstep
+                p = blossomendps[b][j - endptrick] ^ endptrick
+                allowedge[p // 2] = True
+                j += jstep
+            bv = blossomchilds[b][j]
+            label[endpoint[p ^ 1]] = label[bv] = 2
+            labelend[endpoint[p ^ 1]] = labelend[bv] = p
+            bestedge[bv] = -1
+            j += jstep
+            while blossomchilds[b][j] != entrychild:
+                bv = blossomchilds[b][j]
+                if label[bv] == 1:
+                    j += jstep
+                    continue
+                for v in blossom_leaves(bv):
+                    if label[v] != 0:
+                        break
+                if label[v] != 0:
+                    label[v] = 0
+                    label[endpoint[mate[blossombase[bv]]]] = 0
+                    assign_label(v, 2, labelend[v])
+                j += jstep
+
+        label[b] = labelend[b] = -1
+        blossomchilds[b] = blossomendps[b] = None
+        blossombase[b] = -1
+        blossombestedges[b] = None
+        bestedge[b] = -1
+        unusedblossoms.append(b)
+
+    def augment_blossom(b, v):
+        t = v
+        while blossomparent[t] != b:
+            t = blossomparent[t]
+        if t >= nvertex:
+            augment_blossom(t, v)
+        i = j = blossomchilds[b].index(t)
+        if i & 1:
+            j -= len(blossomchilds[b])
+            jstep = 1
+            endptrick = 0
+        else:
+            jstep = -1
+            endptrick = 1
+        while j != 0:
+            j += jstep
+            t = blossomchilds[b][j]
+            p = blossomendps[b][j - endptrick] ^ endptrick
+            if t >= nvertex:
+                augment_blossom(t, endpoint[p])
+            j += jstep
+            t = blossomchilds[b][j]
+            if t >= nvertex:
+                augment_blossom(t, endpoint[p ^ 1])
+            mate[endpoint[p]] = p ^ 1
+            mate[endpoint[p ^ 1]] = p
+        blossomchilds[b] = blossomchilds[b][i:] + blossomchilds[b][:i]
+        blossomendps[b] = blossomendps[b][i:] + blossomendps[b][:i]
+        blossombase[b] = blossombase[blossomchilds[b][0]]
+
+    def augment_matching(k):
+        v, w, _ = edges[k]
+        for s, p in ((v, 2 * k + 1), (w, 2 * k)):
+            while True:
+                bs = inblossom[s]
+                if bs >= nvertex:
+                    augment_blossom(bs, s)
+                mate[s] = p
+                if labelend[bs] == -1:
+                    break
+                t = endpoint[labelend[bs]]
+                bt = inblossom[t]
+                s = endpoint[labelend[bt]]
+                j = endpoint[labelend[bt] ^ 1]
+                if bt >= nvertex:
+                    augment_blossom(bt, j)
+                mate[j] = labelend[bt]
+                p = labelend[bt] ^ 1
+
+    for _ in range(nvertex):
+        label[:] = [0] * (2 * nvertex)
+        bestedge[:] = [-1] * (2 * nvertex)
+        blossombestedges[nvertex:] = [None] * nvertex
+        allowedge[:] = [False] * nedge
+        queue[:] = []
+
+        for v in range(nvertex):
+            if mate[v] == -1 and label[inblossom[v]] == 0:
+                assign_label(v, 1, -1)
+
+        augmented = False
+        while True:
+            while queue and not augmented:
+                v = queue.pop()
+                for p in neighbend[v]:
+                    k = p // 2
+                    w = endpoint[p]
+                    if inblossom[v] == inblossom[w]:
+                        continue
+                    if not allowedge[k]:
+                        kslack = slack(k)
+                        if kslack <= 0:
+                            allowedge[k] = True
+                    if allowedge[k]:
+                        if label[inblossom[w]] == 0:
+                            assign_label(w, 2, p ^ 1)
+                        elif label[inblossom[w]] == 1:
+                            base = scan_blossom(v, w)
+                            if base >= 0:
+                                add_blossom(base, k)
+                            else:
+                                augment_matching(k)
+                                augmented = True
+                                break
+                        elif label[w] == 0:
+                            label[w] = 2
+                            labelend[w] = p ^ 1
+                    elif label[inblossom[w]] == 1:
+                        b = inblossom[v]
+                        if bestedge[b] == -1 or kslack < slack(bestedge[b]):
+                            bestedge[b] = k
+                    elif label[w] == 0:
+                        if bestedge[w] == -1 or kslack < slack(bestedge[w]):
+                            bestedge[w] = k
+
+            if augmented:
+                break
+
+            # No augmenting path with tight edges: adjust the duals
+            deltatype = -1
+            delta = deltaedge = deltablossom = None
+            if not maxcardinality:
+                deltatype = 1
+                delta = min(dualvar[:nvertex])
+            for v in range(nvertex):
+                if label[inblossom[v]] == 0 and bestedge[v] != -1:
+                    d = slack(bestedge[v])
+                    if deltatype == -1 or d < delta:
+                        delta = d
+                        deltatype = 2
+                        deltaedge = bestedge[v]
+            for b in range(2 * nvertex):
+                if blossomparent[b] == -1 and label[b] == 1 and bestedge[b] != -1:
+                    d = slack(bestedge[b]) // 2
+                    if deltatype == -1 or d < delta:
+                        delta = d
+                        deltatype = 3
+                        deltaedge = bestedge[b]
+            for b in range(nvertex, 2 * nvertex):
+                if (
+                    blossombase[b] >= 0
+                    and blossomparent[b] == -1
+                    and label[b] == 2
+                    and (deltatype == -1 or dualvar[b] < delta)
+                ):
+                    delta = dualvar[b]
+                    deltatype = 4
+                    deltablossom = b
+            if deltatype == -1:
+                # Max cardinality reached; finish with an optimum over it
+                deltatype = 1
+                delta = max(0, min(dualvar[:nvertex]))
+
+            for v in range(nvertex):
+                if label[inblossom[v]] == 1:
+                    dualvar[v] -= delta
+                elif label[inblossom[v]] == 2:
+                    dualvar[v] += delta
+            for b in range(nvertex, 2 * nvertex):
+                if blossombase[b] >= 0 and blossomparent[b] == -1:
+                    if label[b] == 1:
+                        dualvar[b] += delta
+                    elif label[b] == 2:
+                        dualvar[b] -= delta
+
+            if deltatype == 1:
+                break
+            elif deltatype == 2:
+                allowedge[deltaedge] = True
+                i, j, _ = edges[deltaedge]
+                if label[inblossom[i]] == 0:
+                    i, j = j, i
+                queue.append(i)
+            elif deltatype == 3:
+                allowedge[deltaedge] = True
+                i, j, _ = edges[deltaedge]
+                queue.append(i)
+            else:
+                expand_blossom(deltablossom, False)
+
+        if not augmented:
+            break
+
+        # Expand top-level S-blossoms whose dual dropped to zero
+        for b in range(nvertex, 2 * nvertex):
+            if (
+                blossomparent[b] == -1
+                and blossombase[b] >= 0
+                and label[b] == 1
+                and dualvar[b] == 0
+            ):
+                expand_blossom(b, True)
+
+    return [endpoint[m] if m >= 0 else -1 for m in mate]
+
+
+def swiss_rounds(player_count: int) -> int:
+    """Rounds needed to find a single undefeated player."""
+    return max(1, math.ceil(math.log2(max(player_count, 2))))
+
+
+def standings(players, results) -> list[dict]:
+    """
+    Current Swiss standings.
+
+    Args:
+        players: Player ids, in registration order (the final tiebreak)
+        results: ``(player1, player2, winner)`` for every finished match;
+            ``player2`` is ``BYE`` for a bye and ``winner`` None for a draw
+
+    Returns:
+        list[dict]: one row per player, best first, with ``player``,
+        ``points``, ``wins``, ``losses``, ``byes``, ``opponents``,
+        ``buchholz`` (sum of opponents' points) and ``omw`` (average
+        opponent match-win rate, each floored at 1/3)
+    """
+    rows = {
+        player: {
+            "player": player,
+            "points": 0.0,
+            "wins": 0,
+            "losses": 0,
+            "byes": 0,
+            "opponents": [],
+        }
+        for player in players
+    }
+
+    for player1, player2, winner in results:
+        if player1 not in rows:
+            continue
+        if player2 is BYE:
+            rows[player1]["points"] += 1
+            rows[player1]["wins"] += 1
+            rows[player1]["byes"] += 1
+            continue
+        if player2 not in rows:
+            continue
+        rows[player1]["opponents"].append(player2)
+        rows[player2]["opponents"].append(player1)
+        if winner is None:
+            rows[player1]["points"] += 0.5
+            rows[player2]["points"] += 0.5
+        else:
+            loser = player2 if winner == player1 else player1
+            rows[winner]["points"] += 1
+            rows[winner]["wins"] += 1
+            rows[loser]["losses"] += 1
+
+    win_rate = {}
+    for player, row in rows.items():
+        played = len(row["opponents"]) + row["byes"]
+        win_rate[player] = max(1 / 3, row["points"] / played) if played else 1 / 3
+
+    for row in rows.values():
+        opponents = row["opponents"]
+        row["buchholz"] = sum(rows[o]["points"] for o in opponents)
+        row["omw"] = (
+            sum(win_rate[o] for o in opponents) / len(opponents) if opponents else 0.0
+        )
+
+    order = {player: index for index, player in enumerate(players)}
+    return sorted(
+        rows.values(),
+        key=lambda row: (
+            -row["points"],
+            -row["buchholz"],
+            -row["omw"],
+            order[row["player"]],
+        ),
+    )
+
+
+def pair_round(players, results) -> tuple[list[tuple[int, int]], int | None]:
+    """
+    Pair the next Swiss round.
+
+    With an odd field the lowest-ranked player who hasn't had a bye sits
+    out. Everyone else is paired by a maximum-weight perfect matching whose
+    weights rank, in order of importance: no rematches, smallest score gap,
+    then Dutch-style top-half-vs-bottom-half pairing inside a score group.
+
+    Returns:
+        tuple: ``([(player1, player2), ...], bye_player_or_None)``, with the
+        higher-ranked player first in each pair
+    """
+    table = standings(players, results)
+    bye = None
+    if len(table) % 2:
+        bye_row = next(
+            (row for row in reversed(table) if row["byes"] == 0), table[-1]
+        )
+        bye = bye_row["player"]
+        table = [row for row in table if row is not bye_row]
+
+    n = len(table)
+    if n == 0:
+        return [], bye
+
+    # Position of each player inside their score group, and the group's size
+    group_position, group_size = [], {}
+    for row in table:
+        group_position.append(group_size.get(row["points"], 0))
+        group_size[row["points"]] = group_position[-1] + 1
+
+    played = {(row["player"], o) for row in table for o in row["opponents"]}
+
+    # Each tier outweighs everything below it summed over n/2 pairs
+    max_gap = int(2 * (table[0]["points"] - table[-1]["points"]))
+    fold_weight = 1
+    gap_weight = fold_weight * (n + 1) * n
+    rematch_weight = gap_weight * (max_gap**2 + 1) * n
+
+    edges = []
+    for i in range(n):
+        for j in range(i + 1, n):
+            a, b = table[i], table[j]
+            gap = int(2 * (a["points"] - b["points"]))
+            if a["points"] == b["points"]:
+                half = group_size[a["points"]] // 2
+                fold = abs(group_position[j] - group_position[i] - half)
+            else:
+                fold = j - i
+            penalty = gap * gap * gap_weight + fold * fold_weight
+            if (a["player"], b["player"]) in played:
+                penalty += rematch_weight
+            edges.append((i, j, rematch_weight * 2 - penalty))
+
+    mate = max_weight_matching(edges, maxcardinality=True)
+    pairs = [
+        (table[i]["player"], table[mate[i]]["player"])
+        for i in range(n)
+        if mate[i] > i
+    ]
+    return pairs, bye
@@ -0,0 +1,501 @@
+"""SQLite-backed tournament storage with an in-memory mirror."""
+
+import asyncio
+import datetime
+import json
+import logging
+import os
+
+from utils.db import DatabaseConnection
+
+logger = logging.getLogger("discord_bot")
+
+TOURNAMENTS_DB = "tournaments.db"
+LEGACY_TOURNAMENTS_FILE = "data/tournaments.json"
+
+
+def _match_row(tournament_id: int, match: dict) -> tuple:
+    details = match.get("details")
+    return (
+        tournament_id,
+        match["id"],
+        match["round"],
+        match["player1"],
+        match["player2"],
+        match["winner"],
+        match["status"],
+        json.dumps(details) if details is not None else None,
+    )
+
+
+async def import_legacy_tournaments(cur, path: str = LEGACY_TOURNAMENTS_FILE) -> int:
+    """
+    One-time copy of the old JSON tournament file into tournaments.db.
+    The file is renamed to ``<path>.migrated`` so this only runs once.
+    """
+    if not os.path.exists(path):
+        return 0
+
+    try:
+        with open(path, "r") as f:
+            tournaments = json.load(f)
+    except json.JSONDecodeError:
+        logger.error(f"Could not parse {path}; leaving it in place")
+        return 0
+
+    now = datetime.datetime.now().isoformat()
+    for tournament_id, tournament in tournaments.items():
+        # JSON object keys are strings
+        tournament_id = int(tournament_id)
+        await cur.execute(
+            """INSERT INTO tournaments
+               (id, name, format, max_players, status, winner_id, created_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            (
+                tournament_id,
+                tournament["name"],
+                tournament.get("format"),
+                tournament["max_players"],
+                tournament["status"],
+                tournament.get("winner"),
+                now,
+            ),
+        )
+        await cur.executemany(
+            """INSERT OR IGNORE INTO tournament_players
+               (tournament_id, user_id, joined_at) VALUES (?, ?, ?)""",
+            [(tournament_id, user_id, now) for user_id in tournament["players"]],
+        )
+        await cur.executemany(
+            """INSERT INTO tournament_matches
+               (tournament_id, match_id, round, player1_id, player2_id,
+                winner_id, status, details)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+            [_match_row(tournament_id, match) for match in tournament["matches"]],
+        )
+
+    os.replace(path, path + ".migrated")
+    logger.info(f"Migrated {len(tournaments)} tournaments from {path}")
+    return len(tournaments)
+
+
+class TournamentStore:
+    """
+    Tournaments, registrations and matches in ``tournaments.db``.
+
+    Reads are served from an in-memory copy loaded at startup, using the
+    same dict layout the tournament cog has always used::
+
+        {"id", "name", "format", "max_players", "players": [user_id, ...],
+         "matches": [{"id", "round", "player1", "player2", "winner",
+                      "status", "details"?, "next_match_id"?,
+                      "next_slot"?}, ...], "status", "winner"}
+
+    Elimination brackets are created whole at the start: later matches
+    have status ``"waiting"`` and empty player slots, and
+    ``next_match_id``/``next_slot`` say where each winner goes, so
+    ``complete_match`` advances the winner with a single row update.
+
+    Every write goes through a method here that updates only the affected
+    rows and then the in-memory copy, so callers must not mutate the dicts
+    themselves.
+
+    Matches are also indexed by id per tournament and by
+    ``(player_id, status)``, so finding a match or a player's pending match
+    is O(1). The indexes are updated together with the copy after the
+    database commit, with no await in between, so other tasks never see
+    them half-updated.
+
+    Every change to a tournament bumps its ``version(tournament_id)``, so
+    anything derived from it (the rendered bracket) can be cached until the
+    number moves.
+
+    Each round also keeps a count of its unfinished matches, so telling
+    whether a report finished the round is O(1).
+
+    Any number of tournaments can run at once. Tournament and match ids are
+    unique across all of them, and ``lock(tournament_id)`` serializes
+    multi-step updates (report, then advance the round) within one event
+    without blocking the others.
+    """
+
+    def __init__(self, db_name: str = TOURNAMENTS_DB):
+        self.db_name = db_name
+        self._tournaments: dict[int, dict] = {}
+        self._by_name: dict[str, list[int]] = {}
+        self._matches: dict[int, dict[int, dict]] = {}
+        self._by_player: dict[tuple[int, str], set[tuple[int, int]]] = {}
+        self._by_round: dict[tuple[int, int], dict[int, dict]] = {}
+        self._open: dict[tuple[int, int], int] = {}
+        self._registrations: dict[int, set[int]] = {}
+        self._locks: dict[int, asyncio.Lock] = {}
+        # Never reset, so a version is never reused even across reloads
+        self._versions: dict[int, int] = {}
+        self._next_match_id = 1
+
+    def __len__(self):
+        return len(self._tournaments)
+
+    def __contains__(self, tournament_id):
+        return tournament_id in self._tournaments
+
+    def get(self, tournament_id: int) -> dict | None:
+        return self._tournaments.get(tournament_id)
+
+    def items(self):
+        return self._tournaments.items()
+
+    def values(self):
+        return self._tournaments.values()
+
+    def version(self, tournament_id: int) -> int:
+        """A number that changes whenever the tournament does."""
+        return self._versions.get(tournament_id, 0)
+
+    def _changed(self, tournament_id: int):
+        self._versions[tournament_id] = self._versions.get(tournament_id, 0) + 1
+
+    def lock(self, tournament_id: int) -> asyncio.Lock:
+        """The lock guarding one tournament's multi-step updates."""
+        return self._locks.setdefault(tournament_id, asyncio.Lock())
+
+    def find_by_name(self, name: str) -> tuple[int, dict] | tuple[None, None]:
+        """
+        Find a tournament by name (case-insensitive).
+
+        Names can repeat (a weekly event); the newest unfinished tournament
+        wins, then the newest finished one.
+        """
+        tournament_ids = self._by_name.get(name.lower())
+        if not tournament_ids:
+            return None, None
+        tournament_id = next(
+            (
+                tournament_id
+                for tournament_id in reversed(tournament_ids)
+                if self._tournaments[tournament_id]["status"] != "completed"
+            ),
+            tournament_ids[-1],
+        )
+        return tournament_id, self._tournaments[tournament_id]
+
+    def unfinished(self) -> list[dict]:
+        """Tournaments in registration or in progress, oldest first."""
+        return [t for t in self._tournaments.values() if t["status"] != "completed"]
+
+    def player_tournaments(self, user_id: int) -> list[dict]:
+        """Unfinished tournaments a user is registered in, oldest first."""
+        return [
+            self._tournaments[tournament_id]
+            for tournament_id in sorted(self._registrations.get(user_id, ()))
+            if self._tournaments[tournament_id]["status"] != "completed"
+        ]
+
+    def get_match(self, tournament_id: int, match_id: int) -> dict | None:
+        return self._matches.get(tournament_id, {}).get(match_id)
+
+    def round_matches(self, tournament_id: int, round_num: int) -> list[dict]:
+        """A round's matches in bracket order (by id)."""
+        matches = self._by_round.get((tournament_id, round_num), {})
+        return [matches[match_id] for match_id in sorted(matches)]
+
+    def open_matches(self, tournament_id: int, round_num: int) -> int:
+        """How many matches in a round are still pending or waiting."""
+        return self._open.get((tournament_id, round_num), 0)
+
+    def player_matches(
+        self, player_id: int, status: str = "pending"
+    ) -> list[tuple[int, dict]]:
+        """``(tournament_id, match)`` for a player's matches with a status."""
+        return [
+            (tournament_id, self._matches[tournament_id][match_id])
+            for tournament_id, match_id in sorted(
+                self._by_player.get((player_id, status), ())
+            )
+        ]
+
+    def active_match(self, player_id: int) -> tuple[int, dict] | tuple[None, None]:
+        """A player's pending match in a running tournament, if any."""
+        for tournament_id, match in self.player_matches(player_id):
+            if self._tournaments[tournament_id]["status"] == "in_progress":
+                return tournament_id, match
+        return None, None
+
+    def _add(self, tournament: dict):
+        self._tournaments[tournament["id"]] = tournament
+        self._changed(tournament["id"])
+        self._matches[tournament["id"]] = {}
+        self._by_name.setdefault(tournament["name"].lower(), []).append(
+            tournament["id"]
+        )
+
+    def _register(self, tournament_id: int, user_id: int):
+        players = self._tournaments[tournament_id]["players"]
+        if user_id not in players:
+            players.append(user_id)
+        self._changed(tournament_id)
+        self._registrations.setdefault(user_id, set()).add(tournament_id)
+
+    def _index_match(self, tournament_id: int, match: dict):
+        self._changed(tournament_id)
+        self._matches[tournament_id][match["id"]] = match
+        self._by_round.setdefault((tournament_id, match["round"]), {})[
+            match["id"]
+        ] = match
+        if match["status"] != "completed":
+            key = (tournament_id, match["round"])
+            self._open[key] = self._open.get(key, 0) + 1
+        self._next_match_id = max(self._next_match_id, match["id"] + 1)
+        for player_id in (match["player1"], match["player2"]):
+            if player_id is not None:
+                self._by_player.setdefault((player_id, match["status"]), set()).add(
+                    (tournament_id, match["id"])
+                )
+
+    def _unindex_match(self, tournament_id: int, match: dict):
+        if match["status"] != "completed":
+            self._open[(tournament_id, match["round"])] -= 1
+        for player_id in (match["player1"], match["player2"]):
+            entries = self._by_player.get((player_id, match["status"]))
+            if entries is not None:
+                entries.discard((tournament_id, match["id"]))
+                if not entries:
+                    del self._by_player[(player_id, match["status"])]
+
+    async def load(self):
+        """Rebuild the in-memory copy from the database."""
+        async with DatabaseConnection(self.db_name) as cur:
+            await cur.execute(
+                "SELECT id, name, format, max_players, status, winner_id "
+                "FROM tournaments ORDER BY id"
+            )
+            tournament_rows = await cur.fetchall()
+            await cur.execute(
+                "SELECT tournament_id, user_id FROM tournament_players "
+                "ORDER BY tournament_id, rowid"
+            )
+            player_rows = await cur.fetchall()
+            await cur.execute(
+                "SELECT tournament_id, match_id, round, player1_id, player2_id, "
+                "winner_id, status, details, next_match_id, next_slot "
+                "FROM tournament_matches "
+                "ORDER BY tournament_id, match_id"
+            )
+            match_rows = await cur.fetchall()
+
+        self._tournaments, self._by_name = {}, {}
+        self._matches, self._by_player, self._registrations = {}, {}, {}
+        self._by_round, self._open = {}, {}
+        self._next_match_id = 1
+        for tournament_id, name, fmt, max_players, status, winner in tournament_rows:
+            self._add(
+                {
+                    "id": tournament_id,
+                    "name": name,
+                    "format": fmt,
+                    "max_players": max_players,
+                    "players": [],
+                    "matches": [],
+                    "status": status,
+                    "winner": winner,
+                }
+            )
+        for tournament_id, user_id in player_rows:
+            self._register(tournament_id, user_id)
+        for (
+            tournament_id,
+            match_id,
+            round_num,
+            player1,
+            player2,
+            winner,
+            status,
+            details,
+            next_match_id,
+            next_slot,
+        ) in match_rows:
+            match = {
+                "id": match_id,
+                "round": round_num,
+                "player1": player1,
+                "player2": player2,
+                "winner": winner,
+                "status": status,
+            }
+            if details is not None:
+                match["details"] = json.loads(details)
+            if next_match_id is not None:
+                match["next_match_id"] = next_match_id
+                match["next_slot"] = next_slot
+            self._tournaments[tournament_id]["matches"].append(match)
+            self._index_match(tournament_id, match)
+        logger.info(f"Loaded {len(self._tournaments)} tournaments")
+
+    async def create(self, name: str, fmt: str, max_players: int) -> dict:
+        """Create a tournament in registration and return it."""
+        async with DatabaseConnection(self.db_name) as cur:
+            await cur.execute(
+                """INSERT INTO tournaments
+                   (name, format, max_players, status, created_at)
+                   VALUES (?, ?, ?, 'registration', ?)""",
+                (name, fmt, max_players, datetime.datetime.now().isoformat()),
+            )
+            tournament_id = cur.lastrowid
+
+        tournament = {
+            "id": tournament_id,
+            "name": name,
+            "format": fmt,
+            "max_players": max_players,
+            "players": [],
+            "matches": [],
+            "status": "registration",
+            "winner": None,
+        }
+        self._add(tournament)
+        return tournament
+
+    async def add_player(self, tournament_id: int, user_id: int):
+        async with DatabaseConnection(self.db_name) as cur:
+            await cur.execute(
+                """INSERT OR IGNORE INTO tournament_players
+                   (tournament_id, user_id, joined_at) VALUES (?, ?, ?)""",
+                (tournament_id, user_id, datetime.datetime.now().isoformat()),
+            )
+        self._register(tournament_id, user_id)
+
+    async def remove_player(self, tournament_id: int, user_id: int):
+        async with DatabaseConnection(self.db_name) as cur:
+            await cur.execute(
+                "DELETE FROM tournament_players WHERE tournament_id = ? AND user_id = ?",
+                (tournament_id, user_id),
+            )
+        players = self._tournaments[tournament_id]["players"]
+        if user_id in players:
+            players.remove(user_id)
+        self._changed(tournament_id)
+        self._registrations.get(user_id, set()).discard(tournament_id)
+
+    def reserve_match_ids(self, count: int) -> range:
+        """
+        Ids for matches that must point at each other before they're added
+        (a precomputed bracket).
+        """
+        start = self._next_match_id
+        self._next_match_id += count
+        return range(start, start + count)
+
+    async def _insert_matches(self, cur, tournament_id: int, matches: list[dict]):
+        for match in matches:
+            if "id" not in match:
+                match["id"] = self._next_match_id
+                self._next_match_id += 1
+        await cur.executemany(
+            """INSERT INTO tournament_matches
+               (tournament_id, match_id, round, player1_id, player2_id,
+                winner_id, status, details, next_match_id, next_slot)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            [
+                _match_row(tournament_id, match)
+                + (match.get("next_match_id"), match.get("next_slot"))
+                for match in matches
+            ],
+        )
+
+    def _add_matches(self, tournament_id: int, matches: list[dict]):
+        self._tournaments[tournament_id]["matches"].extend(matches)
+        for match in matches:
+            self._index_match(tournament_id, match)
+
+    async def add_matches(self, tournament_id: int, matches: list[dict]):
+        """
+        Insert new matches (dicts in the layout above). Matches without an
+        ``"id"`` are given one that is unique across all tournaments.
+        """
+        async with DatabaseConnection(self.db_name) as cur:
+            await self._insert_matches(cur, tournament_id, matches)
+        self._add_matches(tournament_id, matches)
+
+    async def complete_match(
+        self,
+        tournament_id: int,
+        match_id: int,
+        winner: int,
+        details: dict = None,
+        next_round: list[dict] = (),
+        champion: int = None,
+    ) -> dict:
+        """
+        Record a match result and return the updated match.
+
+        In a precomputed bracket the winner is also written into their next
+        match, which becomes ``"pending"`` once both players are known.
+        ``next_round`` (new matches) and ``champion`` (finishes the
+        tournament) are saved in the same transaction as the result, so a
+        crash can't leave a finished round without its successor.
+        """
+        match = self.get_match(tournament_id, match_id)
+        if details is None:
+            details = match.get("details")
+        next_match = self.get_match(tournament_id, match.get("next_match_id"))
+        if next_match is not None:
+            slot = ("player1", "player2")[match["next_slot"]]
+            other = ("player2", "player1")[match["next_slot"]]
+            next_status = "pending" if next_match[other] is not None else "waiting"
+        async with DatabaseConnection(self.db_name) as cur:
+            await cur.execute(
+                """UPDATE tournament_matches
+                   SET winner_id = ?, status = 'completed', details = ?
+                   WHERE tournament_id = ? AND match_id = ?""",
+                (
+                    winner,
+                    json.dumps(details) if details is not None else None,
+                    tournament_id,
+                    match_id,
+                ),
+            )
+            if next_match is not None:
+                await cur.execute(
+                    f"""UPDATE tournament_matches
+                        SET {slot}_id = ?, status = ?
+                        WHERE tournament_id = ? AND match_id = ?""",
+                    (winner, next_status, tournament_id, next_match["id"]),
+                )
+            await self._insert_matches(cur, tournament_id, next_round)
+            if champion is not None:
+                await cur.execute(
+                    "UPDATE tournaments SET status = 'completed', winner_id = ? "
+                    "WHERE id = ?",
+                    (champion, tournament_id),
+                )
+        self._unindex_match(tournament_id, match)
+        match["winner"] = winner
+        match["status"] = "completed"
+        if details is not None:
+            match["details"] = details
+        self._index_match(tournament_id, match)
+        if next_match is not None:
+            self._unindex_match(tournament_id, next_match)
+            next_match[slot] = winner
+            next_match["status"] = next_status
+            self._index_match(tournament_id, next_match)
+        self._add_matches(tournament_id, next_round)
+        if champion is not None:
+            self._tournaments[tournament_id]["status"] = "completed"
+            self._tournaments[tournament_id]["winner"] = champion
+            self._changed(tournament_id)
+        return match
+
+    async def set_status(self, tournament_id: int, status: str, winner: int = None):
+        async with DatabaseConnection(self.db_name) as cur:
+            await cur.execute(
+                "UPDATE tournaments SET status = ?, winner_id = ? WHERE id = ?",
+                (status, winner, tournament_id),
+            )
+        tournament = self._tournaments[tournament_id]
+        tournament["status"] = status
+        tournament["winner"] = winner
+        self._changed(tournament_id)
+
+
+tournament_store = TournamentStore()
@@ -0,0 +1,117 @@
+"""Cached user lookups so display code doesn't spend a REST call per name."""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+
+import discord
+
+logger = logging.getLogger("discord_bot")
+
+
+class UserResolver:
+    """
+    Resolves user ids to ``discord.User``/``discord.Member`` objects.
+
+    Lookups try, in order: the guild's member cache (when a guild is given),
+    the client's gateway user cache, a small LRU cache of users fetched
+    earlier (entries expire after ``ttl`` seconds), and finally
+    ``fetch_user``. At most ``max_concurrency`` REST fetches run at once and
+    concurrent lookups of the same id share one request.
+
+    ``resolve`` raises like ``fetch_user`` (e.g. ``discord.NotFound``);
+    ``resolve_many`` skips ids that can't be fetched.
+    """
+
+    def __init__(
+        self,
+        bot,
+        capacity: int = 512,
+        ttl: float = 3600.0,
+        max_concurrency: int = 4,
+    ):
+        self.bot = bot
+        self.capacity = capacity
+        self.ttl = ttl
+        self._cache: OrderedDict[int, tuple[float, discord.abc.User]] = OrderedDict()
+        self._in_flight: dict[int, asyncio.Future] = {}
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    def get(self, user_id: int, guild: discord.Guild | None = None):
+        """Cached user for an id, or None if it would need a REST call."""
+        if guild is not None:
+            member = guild.get_member(user_id)
+            if member is not None:
+                return member
+
+        user = self.bot.get_user(user_id)
+        if user is not None:
+            return user
+
+        entry = self._cache.get(user_id)
+        if entry is None:
+            return None
+        fetched_at, user = entry
+        if time.monotonic() - fetched_at > self.ttl:
+            del self._cache[user_id]
+            return None
+        self._cache.move_to_end(user_id)
+        return user
+
+    def _remember(self, user):
+        self._cache[user.id] = (time.monotonic(), user)
+        self._cache.move_to_end(user.id)
+        while len(self._cache) > self.capacity:
+            self._cache.popitem(last=False)
+
+    async def _fetch(self, user_id: int):
+        async with self._semaphore:
+            user = await self.bot.fetch_user(user_id)
+        self._remember(user)
+        return user
+
+    async def resolve(self, user_id: int, guild: discord.Guild | None = None):
+        """The user for an id, fetching it over REST only on a cache miss."""
+        user = self.get(user_id, guild)
+        if user is not None:
+            return user
+
+        task = self._in_flight.get(user_id)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(user_id))
+            self._in_flight[user_id] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(user_id, None))
+        return await asyncio.shield(task)
+
+    async def resolve_many(self, user_ids, guild: discord.Guild | None = None) -> dict:
+        """
+        Resolve several ids at once.
+
+        Returns:
+            dict: user_id -> user for every id that could be resolved
+        """
+        user_ids = list(dict.fromkeys(user_id for user_id in user_ids if user_id))
+        results = await asyncio.gather(
+            *(self.resolve(user_id, guild) for user_id in user_ids),
+            return_exceptions=True,
+        )
+
+        users = {}
+        for user_id, result in zip(user_ids, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Could not fetch user {user_id}: {result}")
+                continue
+            users[user_id] = result
+        return users
+
+    def forget(self, user_id: int):
+        self._cache.pop(user_id, None)
+
+
+def get_user_resolver(bot) -> UserResolver:
+    """The bot's shared resolver, created on first use."""
+    resolver = getattr(bot, "user_resolver", None)
+    if resolver is None:
+        resolver = bot.user_resolver = UserResolver(bot)
+    return resolver